@@ -21,6 +21,8 @@ import logging
 from kubernetes.client.rest import ApiException
 import os
 import requests
+import k8s_client
+import watch_continuation
 
 logging_level = os.environ.get("LOGGING", logging.INFO)
 print("Logging set to ", logging_level)
@@ -43,10 +45,10 @@ plural = (
 )
 
 
-# try to recover from broken watchers https://github.com/nolar/kopf/issues/1036
+# watch with bookmarks, recover from broken watchers https://github.com/nolar/kopf/issues/1036
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_):
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
 
 
 @kopf.on.create(GROUP, VERSION, APIS_PLURAL, retries=5)
@@ -129,7 +131,7 @@ def create_or_update_ingress(spec, name, namespace, meta, **kwargs):
         return
     """
 
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     ingress_name = f"apisix-api-route-{name}"
     namespace = "istio-ingress"
     service_name = "istio-ingress"
@@ -610,7 +612,7 @@ def apply_plugins_from_template(namespace, api_name, spec, url):
         logger.warning("No plugins found; applying plugin config with an empty 'spec'.")
 
     # kopf.adopt(plugin_config)Kopf adoption is disabled as referencegrant is still pending for apisix api gateway. will enable adoption once this api gaetway feature enabled for apisix.
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     group, version = plugin_config["apiVersion"].split("/")
     plural = "apisixpluginconfigs"
 
@@ -665,7 +667,7 @@ def patch_apisixroute_with_plugin_config(
     - Uses error handling to manage and log exceptions related to fetching or patching the ApisixRoute, ensuring that all potential issues are reported.
     - The strategic merge patch method is used to ensure that changes are applied correctly without replacing the entire route configuration.
     """
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     group = "apisix.apache.org"
     version = "v2"
     plural = "apisixroutes"
@@ -750,7 +752,7 @@ def delete_api_lifecycle(meta, name, namespace, **kwargs):
     plural_ar = "apisixroutes"
     plural_apc = "apisixpluginconfigs"
 
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
     # Deleting the ApisixRoute
     try:
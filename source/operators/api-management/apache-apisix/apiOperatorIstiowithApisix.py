@@ -19,6 +19,8 @@ import json
 from kubernetes.client.rest import ApiException
 import os
 import re
+import k8s_client
+import watch_continuation
 
 # Setup logging
 logging_level = os.environ.get("LOGGING", logging.INFO)
@@ -73,10 +75,10 @@ if APIOPERATORISTIO_PUBLICHOSTNAME:
         }
 
 
-# try to recover from broken watchers https://github.com/nolar/kopf/issues/1036
+# watch with bookmarks, recover from broken watchers https://github.com/nolar/kopf/issues/1036
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_):
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
 
 
 @kopf.on.create(GROUP, VERSION, APIS_PLURAL, retries=5)
@@ -279,7 +281,7 @@ def createOrPatchDataDogAnnotation(
     client = kubernetes.client
     try:
         # get the service
-        core_api = client.CoreV1Api()
+        core_api = k8s_client.api(client.CoreV1Api)
         service = core_api.read_namespaced_service(spec["implementation"], namespace)
         selector = service.spec.selector
         serviceName = service.metadata.name
@@ -431,7 +433,7 @@ def createOrPatchServiceMonitor(patch, spec, namespace, name, inHandler, compone
 
     client = kubernetes.client
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
         hostname = None
         if "hostname" in spec.keys():
@@ -573,7 +575,7 @@ def createOrPatchVirtualService(
 
     client = kubernetes.client
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
         hostname = None
         if "hostname" in spec.keys():
@@ -809,7 +811,7 @@ def updateImplementationStatus(namespace, name, inHandler, componentName):
         name,
     )
 
-    discovery_api_instance = kubernetes.client.DiscoveryV1Api()
+    discovery_api_instance = k8s_client.api(kubernetes.client.DiscoveryV1Api)
     try:
         api_response = discovery_api_instance.list_namespaced_endpoint_slice(
             namespace, label_selector="kubernetes.io/service-name=" + name
@@ -856,7 +858,7 @@ def updateImplementationStatus(namespace, name, inHandler, componentName):
 #  function to get APISIX Ingress status
 def getApisixIngressStatus(inHandler, name, componentName):
     # Get the Apisix Gateway status
-    core_api_instance = kubernetes.client.CoreV1Api()
+    core_api_instance = k8s_client.api(kubernetes.client.CoreV1Api)
     APISIX_GATEWAY_LABEL = "app.kubernetes.io/service=apisix-gateway"  # Label for the Apisix Gateway service
     APISIX_NAMESPACE = "canvas"
 
@@ -1089,7 +1091,7 @@ def createAPIImplementationStatus(
                 anyEndpointReady = True
                 # find the corresponding API resource and update status
                 # query for api with spec.implementation equal to service name
-                api_instance = kubernetes.client.CustomObjectsApi()
+                api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
                 api_response = api_instance.list_namespaced_custom_object(
                     GROUP, VERSION, namespace, APIS_PLURAL
                 )
@@ -1158,7 +1160,9 @@ async def updateAPIStatus(meta, status, namespace, name, **kwargs):
                 parent_component_name = meta["ownerReferences"][0]["name"]
 
                 try:
-                    custom_objects_api = kubernetes.client.CustomObjectsApi()
+                    custom_objects_api = k8s_client.api(
+                        kubernetes.client.CustomObjectsApi
+                    )
                     parent_component = custom_objects_api.get_namespaced_custom_object(
                         group=GROUP,
                         version=VERSION,
@@ -1295,7 +1299,9 @@ async def updateAPIReady(meta, status, namespace, name, **kwargs):
                 parent_component_name = meta["ownerReferences"][0]["name"]
 
                 try:
-                    custom_objects_api = kubernetes.client.CustomObjectsApi()
+                    custom_objects_api = k8s_client.api(
+                        kubernetes.client.CustomObjectsApi
+                    )
                     parent_component = custom_objects_api.get_namespaced_custom_object(
                         GROUP,
                         VERSION,
@@ -1411,7 +1417,7 @@ async def patchComponent(namespace, name, component, inHandler):
     :meta private:
     """
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
         api_response = custom_objects_api.patch_namespaced_custom_object(
             GROUP, VERSION, namespace, COMPONENTS_PLURAL, name, component
         )
@@ -12,6 +12,7 @@ from azure.mgmt.apimanagement.models import (
     OpenIdConnectProviderContract
 )
 from azure.core.exceptions import AzureError, ResourceNotFoundError
+import k8s_client
 
 # Configure logging level based on environment variable, default to INFO
 logging_level_str = os.environ.get("LOGGING", 'INFO')
@@ -153,7 +154,7 @@ def manage_api_lifecycle(spec, name, namespace, status, meta, **kwargs):
 
     # Update the status of the custom resource to reflect the successful operation
     try:
-        api_client = kubernetes.client.CustomObjectsApi()
+        api_client = k8s_client.api(kubernetes.client.CustomObjectsApi)
         group = GROUP
         version = VERSION
         plural = APIS_PLURAL
@@ -230,7 +231,7 @@ def create_or_update_ingress(spec, name, namespace, meta, **kwargs):
     Returns:
         bool: True if the Ingress was successfully created or updated, False otherwise.
     """
-    api_instance = kubernetes.client.NetworkingV1Api()
+    api_instance = k8s_client.api(kubernetes.client.NetworkingV1Api)
     ingress_name = f"apim-api-ingress-{name}"
     service_name = spec.get("implementation") or name
     service_port = spec.get("port") or 80
@@ -313,7 +314,7 @@ def delete_ingress(name, namespace):
         name (str): The name of the custom resource.
         namespace (str): The namespace where the custom resource was deployed.
     """
-    api_instance = kubernetes.client.NetworkingV1Api()
+    api_instance = k8s_client.api(kubernetes.client.NetworkingV1Api)
     ingress_name = f"apim-api-ingress-{name}"
     ingress_namespace = namespace
 
@@ -532,7 +533,7 @@ def get_ingress_url(api_name, namespace, path):
         ValueError: If the Ingress does not have a load balancer IP or hostname.
     """
     try:
-        api_instance = kubernetes.client.NetworkingV1Api()
+        api_instance = k8s_client.api(kubernetes.client.NetworkingV1Api)
         ingress_name = f"apim-api-ingress-{api_name}"
         ingress_namespace = namespace
 
@@ -19,6 +19,11 @@ import json
 from kubernetes.client.rest import ApiException
 import os
 import re
+import k8s_client
+import status_writer
+import operator_logging
+import watch_continuation
+import work_queue
 
 # Setup logging
 logging_level = os.environ.get("LOGGING", logging.INFO)
@@ -26,6 +31,7 @@ kopf_logger = logging.getLogger()
 kopf_logger.setLevel(logging.WARNING)
 logger = logging.getLogger("APIOperator")
 logger.setLevel(int(logging_level))
+operator_logging.setup()
 logger.info(f"Logging set to %s", logging_level)
 
 CICD_BUILD_TIME = os.getenv("CICD_BUILD_TIME")
@@ -47,6 +53,8 @@ GROUP = "oda.tmforum.org"
 VERSION = "v1"
 APIS_PLURAL = "exposedapis"
 COMPONENTS_PLURAL = "components"
+# the Component status lists with an entry per ExposedAPI
+EXPOSEDAPI_STATUS_FIELDS = ["coreAPIs", "managementAPIs", "securityAPIs"]
 
 # get environment variables
 OPENMETRICS_IMPLEMENTATION = os.environ.get(
@@ -72,10 +80,21 @@ if APIOPERATORISTIO_PUBLICHOSTNAME:
         }
 
 
-# try to recover from broken watchers https://github.com/nolar/kopf/issues/1036
+# watch with bookmarks, recover from broken watchers https://github.com/nolar/kopf/issues/1036
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_):
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
+
+
+# the retry policy, the metrics and the work queue wrap the handlers, in the order of work_queue
+@kopf.on.startup()
+def wrapHandlers(**_):
+    work_queue.wrap_handlers()
+
+
+@kopf.on.cleanup()
+def cleanup(**_):
+    logger.info(f"Status writer statistics %s", status_writer.stats())
 
 
 @kopf.on.create(GROUP, VERSION, APIS_PLURAL, retries=5)
@@ -278,7 +297,7 @@ def createOrPatchDataDogAnnotation(
     client = kubernetes.client
     try:
         # get the service
-        core_api = client.CoreV1Api()
+        core_api = k8s_client.api(client.CoreV1Api)
         service = core_api.read_namespaced_service(spec["implementation"], namespace)
         selector = service.spec.selector
         serviceName = service.metadata.name
@@ -430,7 +449,7 @@ def createOrPatchServiceMonitor(patch, spec, namespace, name, inHandler, compone
 
     client = kubernetes.client
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
         hostname = None
         if "hostname" in spec.keys():
@@ -572,7 +591,7 @@ def createOrPatchVirtualService(
 
     client = kubernetes.client
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
         hostname = None
         if "hostname" in spec.keys():
@@ -808,7 +827,7 @@ def updateImplementationStatus(namespace, name, inHandler, componentName):
         name,
     )
 
-    discovery_api_instance = kubernetes.client.DiscoveryV1Api()
+    discovery_api_instance = k8s_client.api(kubernetes.client.DiscoveryV1Api)
     try:
         api_response = discovery_api_instance.list_namespaced_endpoint_slice(
             namespace, label_selector="kubernetes.io/service-name=" + name
@@ -855,7 +874,7 @@ def updateImplementationStatus(namespace, name, inHandler, componentName):
 # helper function to get Istio Ingress status
 def getIstioIngressStatus(inHandler, name, componentName):
     # get ip or hostname where ingress is exposed from the istio-ingressgateway service
-    core_api_instance = kubernetes.client.CoreV1Api()
+    core_api_instance = k8s_client.api(kubernetes.client.CoreV1Api)
     ISTIO_INGRESSGATEWAY_LABEL = "istio=ingressgateway"
 
     ## should get this by label (as this is what the gareway defines)
@@ -1090,7 +1109,7 @@ def createAPIImplementationStatus(
                 anyEndpointReady = True
                 # find the corresponding API resource and update status
                 # query for api with spec.implementation equal to service name
-                api_instance = kubernetes.client.CustomObjectsApi()
+                api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
                 api_response = api_instance.list_namespaced_custom_object(
                     GROUP, VERSION, namespace, APIS_PLURAL
                 )
@@ -1158,111 +1177,35 @@ async def updateAPIStatus(meta, status, namespace, name, **kwargs):
                 # str | the custom object's name
                 parent_component_name = meta["ownerReferences"][0]["name"]
 
-                try:
-                    custom_objects_api = kubernetes.client.CustomObjectsApi()
-                    parent_component = custom_objects_api.get_namespaced_custom_object(
-                        group=GROUP,
-                        version=VERSION,
-                        namespace=namespace,
-                        plural=COMPONENTS_PLURAL,
-                        name=parent_component_name,
-                    )
-                except ApiException as e:
-                    # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
-                    if e.status == HTTP_NOT_FOUND:
-                        raise kopf.TemporaryError(
-                            "Cannot find parent component " + parent_component_name
-                        )
-                    else:
-                        logger.error(
-                            "Exception when calling custom_objects_api.get_namespaced_custom_object: %s",
-                            e,
-                        )
-
                 logWrapper(
                     logging.DEBUG,
                     "updateAPIStatus",
                     "updateAPIStatus",
                     "api/" + name,
-                    parent_component["metadata"]["name"],
+                    parent_component_name,
                     "Handler called",
                     "",
                 )
 
-                # find the correct array entry to update either in coreAPIs, managementAPIs or securityAPIs
-                if "coreAPIs" in parent_component["status"].keys():
-                    for key in range(len(parent_component["status"]["coreAPIs"])):
-                        if (
-                            parent_component["status"]["coreAPIs"][key]["uid"]
-                            == meta["uid"]
-                        ):
-                            parent_component["status"]["coreAPIs"][key]["url"] = status[
-                                "apiStatus"
-                            ]["url"]
-                            logWrapper(
-                                logging.INFO,
-                                "updateAPIStatus",
-                                "updateAPIStatus",
-                                "api/" + name,
-                                parent_component["metadata"]["name"],
-                                "Updating parent component coreAPIs APIs with url",
-                                status["apiStatus"]["url"],
-                            )
-                            if "developerUI" in status["apiStatus"].keys():
-                                parent_component["status"]["coreAPIs"][key][
-                                    "developerUI"
-                                ] = status["apiStatus"]["developerUI"]
-
-                if "managementAPIs" in parent_component["status"].keys():
-                    for key in range(len(parent_component["status"]["managementAPIs"])):
-                        if (
-                            parent_component["status"]["managementAPIs"][key]["uid"]
-                            == meta["uid"]
-                        ):
-                            parent_component["status"]["managementAPIs"][key]["url"] = (
-                                status["apiStatus"]["url"]
-                            )
-                            logWrapper(
-                                logging.INFO,
-                                "updateAPIStatus",
-                                "updateAPIStatus",
-                                "api/" + name,
-                                parent_component["metadata"]["name"],
-                                "Updating parent component managementAPIs APIs with url",
-                                status["apiStatus"]["url"],
-                            )
-                            if "developerUI" in status["apiStatus"].keys():
-                                parent_component["status"]["managementAPIs"][key][
-                                    "developerUI"
-                                ] = status["apiStatus"]["developerUI"]
-
-                if "securityAPIs" in parent_component["status"].keys():
-                    for key in range(len(parent_component["status"]["securityAPIs"])):
-                        if (
-                            parent_component["status"]["securityAPIs"][key]["uid"]
-                            == meta["uid"]
-                        ):
-                            parent_component["status"]["securityAPIs"][key]["url"] = (
-                                status["apiStatus"]["url"]
-                            )
-                            logWrapper(
-                                logging.INFO,
-                                "updateAPIStatus",
-                                "updateAPIStatus",
-                                "api/" + name,
-                                parent_component["metadata"]["name"],
-                                "Updating parent component securityAPIs APIs with url",
-                                status["apiStatus"]["url"],
-                            )
-                            if "developerUI" in status["apiStatus"].keys():
-                                parent_component["status"]["securityAPIs"][key][
-                                    "developerUI"
-                                ] = status["apiStatus"]["developerUI"]
-
-                await patchComponent(
+                # update the correct array entry in either coreAPIs, managementAPIs or securityAPIs
+                values = {"url": status["apiStatus"]["url"]}
+                if "developerUI" in status["apiStatus"].keys():
+                    values["developerUI"] = status["apiStatus"]["developerUI"]
+                logWrapper(
+                    logging.INFO,
+                    "updateAPIStatus",
+                    "updateAPIStatus",
+                    "api/" + name,
+                    parent_component_name,
+                    "Updating parent component APIs with url",
+                    status["apiStatus"]["url"],
+                )
+                await updateComponentStatus(
                     namespace,
                     parent_component_name,
-                    parent_component,
+                    status_writer.update_entries(
+                        EXPOSEDAPI_STATUS_FIELDS, meta["uid"], values
+                    ),
                     "updateAPIStatus",
                 )
     return None
@@ -1295,116 +1238,47 @@ async def updateAPIReady(meta, status, namespace, name, **kwargs):
                 # str | the custom object's name
                 parent_component_name = meta["ownerReferences"][0]["name"]
 
-                try:
-                    custom_objects_api = kubernetes.client.CustomObjectsApi()
-                    parent_component = custom_objects_api.get_namespaced_custom_object(
-                        GROUP,
-                        VERSION,
-                        namespace,
-                        COMPONENTS_PLURAL,
-                        parent_component_name,
-                    )
-                except ApiException as e:
-                    # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
-                    if e.status == HTTP_NOT_FOUND:
-                        raise kopf.TemporaryError(
-                            "Cannot find parent component " + parent_component_name
-                        )
-                    else:
-                        logger.error(
-                            "Exception when calling custom_objects_api.get_namespaced_custom_object: %s",
-                            e,
-                        )
-
                 logWrapper(
                     logging.DEBUG,
                     "updateAPIReady",
                     "updateAPIReady",
                     "api/" + name,
-                    parent_component["metadata"]["name"],
+                    parent_component_name,
                     "Handler called",
                     "",
                 )
 
-                # find the correct array entry to update either in coreAPIs, managementAPIs or securityAPIs
-                for key in range(len(parent_component["status"]["coreAPIs"])):
-                    if (
-                        parent_component["status"]["coreAPIs"][key]["uid"]
-                        == meta["uid"]
-                    ):
-                        parent_component["status"]["coreAPIs"][key]["ready"] = True
-                        logWrapper(
-                            logging.INFO,
-                            "updateAPIReady",
-                            "updateAPIReady",
-                            "api/" + name,
-                            parent_component["metadata"]["name"],
-                            "Updating component coreAPIs status",
-                            status["implementation"]["ready"],
-                        )
-                        await patchComponent(
-                            namespace,
-                            parent_component_name,
-                            parent_component,
-                            "updateAPIReady",
-                        )
-                        return None
-                for key in range(len(parent_component["status"]["managementAPIs"])):
-                    if (
-                        parent_component["status"]["managementAPIs"][key]["uid"]
-                        == meta["uid"]
-                    ):
-                        parent_component["status"]["managementAPIs"][key][
-                            "ready"
-                        ] = True
-                        logWrapper(
-                            logging.INFO,
-                            "updateAPIReady",
-                            "updateAPIReady",
-                            "api/" + name,
-                            parent_component["metadata"]["name"],
-                            "Updating component managementAPIs status",
-                            status["implementation"]["ready"],
-                        )
-                        await patchComponent(
-                            namespace,
-                            parent_component_name,
-                            parent_component,
-                            "updateAPIReady",
-                        )
-                        return None
-                for key in range(len(parent_component["status"]["securityAPIs"])):
-                    if (
-                        parent_component["status"]["securityAPIs"][key]["uid"]
-                        == meta["uid"]
-                    ):
-                        parent_component["status"]["securityAPIs"][key]["ready"] = True
-                        logWrapper(
-                            logging.INFO,
-                            "updateAPIReady",
-                            "updateAPIReady",
-                            "api/" + name,
-                            parent_component["metadata"]["name"],
-                            "Updating component securityAPIs status",
-                            status["implementation"]["ready"],
-                        )
-                        await patchComponent(
-                            namespace,
-                            parent_component_name,
-                            parent_component,
-                            "updateAPIReady",
-                        )
-                        return None
+                # update the correct array entry in either coreAPIs, managementAPIs or securityAPIs
+                logWrapper(
+                    logging.INFO,
+                    "updateAPIReady",
+                    "updateAPIReady",
+                    "api/" + name,
+                    parent_component_name,
+                    "Updating component APIs status",
+                    status["implementation"]["ready"],
+                )
+                await updateComponentStatus(
+                    namespace,
+                    parent_component_name,
+                    status_writer.update_entries(
+                        EXPOSEDAPI_STATUS_FIELDS, meta["uid"], {"ready": True}
+                    ),
+                    "updateAPIReady",
+                )
     return None
 
 
-async def patchComponent(namespace, name, component, inHandler):
-    """Helper function to patch a component.
+async def updateComponentStatus(namespace, name, update, inHandler):
+    """Helper function to update the status of a component.
+
+    The updates of all the handlers for the same component are coalesced into one patch by the status writer.
 
     Args:
         * namespace (String): The namespace for the Component resource
         * name (String): The name of the Component resource
-        * component (Dict): The component object.
+        * update (Callable): The update of the component status, see ``status_writer.update_entries``
+        * inHandler (String): The name of the calling handler
 
     Returns:
         No return value.
@@ -1412,42 +1286,34 @@ async def patchComponent(namespace, name, component, inHandler):
     :meta private:
     """
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
-        api_response = custom_objects_api.patch_namespaced_custom_object(
-            GROUP, VERSION, namespace, COMPONENTS_PLURAL, name, component
-        )
-        logWrapper(
-            logging.DEBUG,
-            "patchComponent",
-            inHandler,
-            "api/" + name,
-            component["metadata"]["name"],
-            "custom_objects_api.patch_namespaced_custom_object response",
-            api_response,
+        await status_writer.get_writer(GROUP, VERSION, COMPONENTS_PLURAL).update(
+            namespace, name, update
         )
     except ApiException as e:
+        # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
+        if e.status == HTTP_NOT_FOUND:
+            raise kopf.TemporaryError("Cannot find parent component " + name)
         logWrapper(
             logging.DEBUG,
-            "patchComponent",
+            "updateComponentStatus",
             inHandler,
             "api/" + name,
-            component["metadata"]["name"],
-            "Exception when calling api_instance.patch_namespaced_custom_object",
+            name,
+            "Exception when updating the component status",
             e,
         )
         logWrapper(
             logging.INFO,
-            "patchComponent",
+            "updateComponentStatus",
             inHandler,
             "api/" + name,
-            component["metadata"]["name"],
-            "Exception when calling api_instance.patch_namespaced_custom_object - will retry",
+            name,
+            "Exception when updating the component status - will retry",
             "",
         )
 
         raise kopf.TemporaryError(
-            "Exception when calling api_instance.patch_namespaced_custom_object for component "
-            + name
+            "Exception when updating the status of component " + name
         )
 
 
@@ -0,0 +1,255 @@
+"""Priority queue of the kopf handler invocations, with concurrency limits per class of work.
+
+kopf runs the handlers of all objects as soon as their events arrive. After a restart the resume
+handlers of every Component, ExposedAPI and adopted child start at once and compete with the
+handlers of a Component a user has just applied, so a new install can wait minutes. ``setup()``
+wraps the change handlers so that each invocation first takes a slot of a ``WorkQueue``:
+
+* ``change``: create, update and delete of an object, started first
+* ``status``: handlers of a ``status`` field, propagating the status of children to their parent
+* ``resume``: resume handlers, run when nothing more urgent is waiting
+
+The invocations of a class wait in FIFO order. A free slot goes to the highest class that is
+waiting and below its own limit, so the resume handlers after a restart take at most
+``WORK_CONCURRENCY_RESUME`` slots and leave the others to the changes.
+
+Metrics (served by operator_metrics when ``METRICS_PORT`` is set):
+
+* ``oda_operator_work_queue_depth`` (class): handler invocations waiting for a slot
+* ``oda_operator_work_queue_wait_seconds`` (class): time waited for a slot
+* ``oda_operator_work_in_flight`` (class): handler invocations holding a slot
+
+Opt-in: set ``WORK_CONCURRENCY`` to queue the handlers.
+
+The queue, the retry policy and the metrics all wrap the functions of the kopf handlers, and the order
+of the wrappers matters. ``wrap_handlers()`` is the one place that applies them, innermost first:
+
+1. ``retry_policy``: sets the delay of a ``TemporaryError`` raised by the handler
+2. ``operator_metrics``: counts the invocation and its retry, and times the handler without the wait
+   for a slot
+3. the work queue: the handler holds a slot while it runs
+
+Usage::
+
+    @kopf.on.startup()
+    def wrapHandlers(**_):
+        work_queue.wrap_handlers()
+"""
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import functools
+import logging
+import os
+import time
+
+import kopf
+import prometheus_client
+
+import operator_metrics
+import retry_policy
+
+logger = logging.getLogger("WorkQueue")
+
+CHANGE = "change"
+STATUS = "status"
+RESUME = "resume"
+# the classes of work, highest priority first
+PRIORITIES = [CHANGE, STATUS, RESUME]
+
+# maximum number of handler invocations running at the same time, 0 disables the queue
+WORK_CONCURRENCY = int(os.getenv("WORK_CONCURRENCY", "0"))
+# maximum number of status propagation handlers running at the same time
+WORK_CONCURRENCY_STATUS = int(os.getenv("WORK_CONCURRENCY_STATUS", "8"))
+# maximum number of resume handlers running at the same time
+WORK_CONCURRENCY_RESUME = int(os.getenv("WORK_CONCURRENCY_RESUME", "4"))
+
+queue_depth = prometheus_client.Gauge(
+    "oda_operator_work_queue_depth",
+    "kopf handler invocations waiting for a slot of the work queue",
+    ["class"],
+)
+queue_wait = prometheus_client.Histogram(
+    "oda_operator_work_queue_wait_seconds",
+    "Time the kopf handler invocations waited for a slot of the work queue",
+    ["class"],
+)
+work_in_flight = prometheus_client.Gauge(
+    "oda_operator_work_in_flight",
+    "kopf handler invocations holding a slot of the work queue",
+    ["class"],
+)
+
+
+class WorkQueue:
+    """Slots for running work, given to the waiting work by priority class.
+
+    Args:
+        * concurrency (Integer): Maximum number of slots taken at the same time
+        * limits (Dict): Maximum number of slots taken by each class, by default ``concurrency``
+    """
+
+    def __init__(self, concurrency=WORK_CONCURRENCY, limits=None):
+        self.concurrency = max(1, concurrency)
+        self.limits = {cls: self.concurrency for cls in PRIORITIES}
+        self.limits.update(limits or {})
+        self.in_flight = {cls: 0 for cls in PRIORITIES}
+        self._waiting = {cls: collections.deque() for cls in PRIORITIES}
+
+    def depth(self, cls):
+        """Returns the number of waiting invocations of a class."""
+        return len(self._waiting[cls])
+
+    def _can_start(self, cls):
+        return (
+            sum(self.in_flight.values()) < self.concurrency
+            and self.in_flight[cls] < self.limits[cls]
+        )
+
+    def _start(self, cls, queued):
+        self.in_flight[cls] += 1
+        work_in_flight.labels(cls).inc()
+        queue_wait.labels(cls).observe(time.monotonic() - queued)
+
+    def _dispatch(self):
+        for cls in PRIORITIES:
+            waiting = self._waiting[cls]
+            while waiting and self._can_start(cls):
+                future, queued = waiting.popleft()
+                queue_depth.labels(cls).dec()
+                if future.done():  # the waiting invocation was cancelled
+                    continue
+                self._start(cls, queued)
+                future.set_result(None)
+
+    async def acquire(self, cls):
+        """Waits for a slot for work of a class and takes it."""
+        queued = time.monotonic()
+        # a free slot means the waiting work of the higher classes is at its own limit
+        if not self._waiting[cls] and self._can_start(cls):
+            self._start(cls, queued)
+            return
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, queued)
+        self._waiting[cls].append(entry)
+        queue_depth.labels(cls).inc()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(cls)
+            elif entry in self._waiting[cls]:
+                self._waiting[cls].remove(entry)
+                queue_depth.labels(cls).dec()
+            raise
+
+    def release(self, cls):
+        """Gives back a slot of work of a class."""
+        self.in_flight[cls] -= 1
+        work_in_flight.labels(cls).dec()
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, cls):
+        """Holds a slot for work of a class while in the context."""
+        await self.acquire(cls)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+
+def work_class(handler, reason):
+    """Returns the class of work of a handler invocation.
+
+    Args:
+        * handler (kopf.ChangingHandler): The kopf handler
+        * reason (String): The reason of the invocation, e.g. ``create`` or ``resume``
+    """
+    if reason == "resume":
+        return RESUME
+    if handler.field and handler.field[0] == "status":
+        return STATUS
+    return CHANGE
+
+
+def queue_handler(fn, handler, work):
+    """Returns ``fn`` wrapped to run when the work queue gives it a slot.
+
+    A synchronous handler is run in the default executor once it has a slot, so it does not hold a
+    thread of the executor while waiting. The wrapper has no ``__wrapped__``, so that kopf awaits it
+    instead of running it in a thread.
+    """
+    if asyncio.iscoroutinefunction(fn):
+
+        async def queued(*args, **kwargs):
+            async with work.slot(work_class(handler, kwargs.get("reason"))):
+                return await fn(*args, **kwargs)
+
+    else:
+
+        async def queued(*args, **kwargs):
+            async with work.slot(work_class(handler, kwargs.get("reason"))):
+                call = functools.partial(fn, *args, **kwargs)
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(contextvars.copy_context().run, call)
+                )
+
+    functools.update_wrapper(queued, fn)
+    del queued.__wrapped__
+    return queued
+
+
+def setup(concurrency=WORK_CONCURRENCY, limits=None, registry=None):
+    """Queues the invocations of the change handlers of a kopf registry, unless ``concurrency`` is 0.
+
+    Args:
+        * concurrency (Integer): Maximum number of handler invocations running at the same time
+        * limits (Dict): Maximum number of invocations of each class, by default the ``WORK_CONCURRENCY_*`` settings
+        * registry (kopf.OperatorRegistry): The registry, by default the kopf default registry
+
+    Returns:
+        WorkQueue: The work queue, or None if the handlers are not queued.
+    """
+    if not concurrency:
+        return None
+    if limits is None:
+        limits = {STATUS: WORK_CONCURRENCY_STATUS, RESUME: WORK_CONCURRENCY_RESUME}
+    work = WorkQueue(concurrency, limits)
+    registry = registry or kopf.get_default_registry()
+    wrapped = {}
+    for handler in registry._changing.get_all_handlers():
+        # one wrapper per function and id, so kopf still invokes a function only once per cause
+        key = (id(handler.fn), handler.id)
+        if key not in wrapped:
+            wrapped[key] = queue_handler(handler.fn, handler, work)
+        # the kopf handlers are frozen dataclasses
+        object.__setattr__(handler, "fn", wrapped[key])
+    logger.info(
+        f"Queueing the kopf handlers, concurrency %s, limits %s",
+        work.concurrency,
+        work.limits,
+    )
+    return work
+
+
+def wrap_handlers(
+    concurrency=WORK_CONCURRENCY,
+    metrics_port=operator_metrics.METRICS_PORT,
+    registry=None,
+):
+    """Applies the retry policy, the metrics and the work queue to the handlers of a kopf registry, in this order.
+
+    Args:
+        * concurrency (Integer): Maximum number of handler invocations running at the same time, 0 for no queue
+        * metrics_port (Integer): The port of the metrics, 0 for no metrics
+        * registry (kopf.OperatorRegistry): The registry, by default the kopf default registry
+
+    Returns:
+        WorkQueue: The work queue, or None if the handlers are not queued.
+    """
+    retry_policy.setup(registry)
+    operator_metrics.setup(metrics_port, registry)
+    return setup(concurrency, registry=registry)
@@ -21,6 +21,7 @@ from kubernetes.client.rest import ApiException
 import os
 import yaml
 import requests
+import k8s_client
 
 logging_level = os.environ.get("LOGGING", logging.INFO)
 print("Logging set to ", logging_level)
@@ -124,7 +125,7 @@ def create_or_update_ingress(spec, name, namespace, meta, **kwargs):
         return
     """
 
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     ingress_name = f"kong-api-route-{name}"
     namespace = "components"
     service_name = "istio-ingress"
@@ -249,7 +250,7 @@ def manage_ratelimit(spec, name, namespace, meta, **kwargs):
         logger.info(f"Rate limiting not enabled for '{name}'. Plugin creation skipped.")
         return
 
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     plugin_name = f"rate-limit-{name}"
     namespace = "components"
     group = "configuration.konghq.com"
@@ -343,7 +344,7 @@ def manage_apiauthentication(spec, name, namespace, meta, **kwargs):
         )
         return
 
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     plugin_name = f"apiauthentication-{name}"
     namespace = "components"
     group = "configuration.konghq.com"
@@ -434,7 +435,7 @@ def manage_cors(spec, name, namespace, meta, **kwargs):
         logger.info(f"CORS not enabled for '{name}'. Configuration skipped.")
         return
 
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     plugin_name = f"cors-{name}"
     namespace = "components"
     group = "configuration.konghq.com"
@@ -531,7 +532,7 @@ def update_httproute_annotations(name, namespace, annotations):
     Raises:
         ApiException: Error if the update fails.
     """
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     ingress_name = f"kong-api-route-{name}"
     group = "gateway.networking.k8s.io"
     version = "v1"
@@ -635,7 +636,7 @@ def apply_plugins_from_template(templates, namespace, owner_references):
     """
     # Applying the configurations from the template to the Kubernetes cluster
     plugin_names = []
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
     for template in templates:
         # Add ownerReferences to the template
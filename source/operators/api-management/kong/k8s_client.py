@@ -0,0 +1,272 @@
+"""Asynchronous access to the Kubernetes API for the ODA operators.
+
+The official kubernetes python client is synchronous. Calling it directly from an
+``async def`` kopf handler blocks the event loop for the whole HTTP round trip, so every
+other resource handled by the operator has to wait. The helpers in this module run the
+blocking client calls on a bounded thread pool, so that many handlers can talk to the
+API server at the same time while the event loop stays responsive.
+
+It also provides a process-wide pooled ``ApiClient``. Creating a new
+``kubernetes.client.CustomObjectsApi()`` per call builds a new connection pool each
+time, so every request pays for a new TCP connection and TLS handshake with the API
+server. All API objects returned by ``api()`` share one client, so connections are kept
+alive and reused.
+
+Usage::
+
+    custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+    obj = await k8s_client.call(
+        custom_objects_api.get_namespaced_custom_object,
+        group=GROUP, version=VERSION, namespace=namespace, plural=PLURAL, name=name,
+    )
+
+The module is shared by all ODA operators; keep the copies in the operator folders identical.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import kubernetes.client
+import kubernetes.config
+import urllib3
+from kubernetes.client.rest import ApiException
+from urllib3.connection import HTTPConnection
+
+logger = logging.getLogger("K8sClient")
+
+# maximum number of kubernetes API calls that can be in flight at the same time
+K8S_CLIENT_THREADS = int(os.getenv("K8S_CLIENT_THREADS", "16"))
+# maximum number of connections kept open to the API server
+K8S_MAX_CONNECTIONS = int(os.getenv("K8S_MAX_CONNECTIONS", str(K8S_CLIENT_THREADS)))
+# enable TCP keep-alive probes on the pooled connections
+K8S_KEEPALIVE = os.getenv("K8S_KEEPALIVE", "true").lower() == "true"
+# seconds of idle time before the first keep-alive probe is sent
+K8S_KEEPALIVE_IDLE = int(os.getenv("K8S_KEEPALIVE_IDLE", "30"))
+
+_executor = None
+_api_client = None
+_lock = threading.Lock()
+_stats = {"connections_opened": 0, "requests": 0}
+_request_listeners = []
+
+
+def _count(counter, increment=1):
+    with _lock:
+        _stats[counter] = _stats.get(counter, 0) + increment
+
+
+def stats():
+    """Returns a snapshot of the connection pool counters.
+
+    Returns:
+        Dict with ``connections_opened`` (new TCP connections to the API server) and
+        ``requests`` (HTTP requests sent to the API server).
+    """
+    with _lock:
+        return dict(_stats)
+
+
+class _CountingHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    def _new_conn(self):
+        _count("connections_opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    def _new_conn(self):
+        _count("connections_opened")
+        return super()._new_conn()
+
+
+class PooledApiClient(kubernetes.client.ApiClient):
+    """ApiClient that counts the requests it sends to the API server."""
+
+    def request(self, method, url, *args, **kwargs):
+        _count("requests")
+        status = None
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            status = response.status
+            return response
+        except ApiException as e:
+            status = e.status
+            raise
+        finally:
+            for listener in _request_listeners:
+                listener(method, url, status)
+
+
+def add_request_listener(listener):
+    """Registers a function called after every request of the pooled ApiClient, e.g. to export metrics.
+
+    Args:
+        * listener (Callable): Called with the HTTP method, the URL and the HTTP status code (None if there was no
+          response). It runs on the thread of the request and must not block.
+    """
+    _request_listeners.append(listener)
+
+
+def _keepalive_socket_options():
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # the fine grained options are not available on all platforms
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, K8S_KEEPALIVE_IDLE))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3))
+    return options
+
+
+def _create_api_client():
+    configuration = kubernetes.client.Configuration.get_default_copy()
+    configuration.connection_pool_maxsize = K8S_MAX_CONNECTIONS
+    api_client = PooledApiClient(configuration)
+    pool_manager = api_client.rest_client.pool_manager
+    pool_manager.pool_classes_by_scheme = {
+        "http": _CountingHTTPConnectionPool,
+        "https": _CountingHTTPSConnectionPool,
+    }
+    if K8S_KEEPALIVE:
+        pool_manager.connection_pool_kw["socket_options"] = _keepalive_socket_options()
+    logger.info(
+        f"Kubernetes ApiClient created with max %s connections (keep-alive %s)",
+        K8S_MAX_CONNECTIONS,
+        K8S_KEEPALIVE,
+    )
+    return api_client
+
+
+def get_api_client():
+    """Returns the process-wide pooled ApiClient.
+
+    The client is created on first use from the default configuration. kopf loads the cluster credentials only after
+    the startup handlers, so a startup handler (or a task it starts) calls ``load_config()`` first.
+    """
+    global _api_client
+    if _api_client is None:
+        with _lock:
+            if _api_client is None:
+                _api_client = _create_api_client()
+    return _api_client
+
+
+def load_config():
+    """Loads the cluster credentials the same way as the kopf login handler, and drops a pooled ApiClient created
+    without them.
+
+    This is a blocking call, run it with ``call()``.
+    """
+    global _api_client
+    try:
+        kubernetes.config.load_incluster_config()
+    except kubernetes.config.ConfigException:
+        kubernetes.config.load_kube_config()
+    host = kubernetes.client.Configuration.get_default_copy().host
+    with _lock:
+        if _api_client is not None and _api_client.configuration.host != host:
+            logger.warning(
+                f"Kubernetes ApiClient created before the credentials were loaded (host %s), creating it again",
+                _api_client.configuration.host,
+            )
+            _api_client = None
+
+
+def api(api_class):
+    """Returns an instance of a kubernetes API class bound to the pooled ApiClient.
+
+    Args:
+        * api_class (Class): The kubernetes API class, e.g. ``kubernetes.client.CoreV1Api``
+
+    Returns:
+        The API object. It is cheap to create, the connections are held by the shared ApiClient.
+    """
+    return api_class(get_api_client())
+
+
+def apply_namespaced_custom_object(
+    group, version, namespace, plural, name, body, field_manager, subresource=None
+):
+    """Server-side apply of a namespaced custom object.
+
+    The generated ``CustomObjectsApi.patch_namespaced_custom_object`` always sends a merge patch,
+    so the apply request is sent through the pooled ApiClient directly. Conflicts with other field
+    managers are forced, the operator owns the fields it applies. This is a blocking call, run it
+    with ``call()``.
+
+    Args:
+        * group, version, namespace, plural, name (String): The custom object
+        * body (Dict): The fully specified intent, including apiVersion, kind and metadata.name
+        * field_manager (String): The field manager that owns the applied fields
+        * subresource (String): e.g. ``status`` to apply the status subresource
+
+    Returns:
+        Dict: The custom object after the apply.
+    """
+    path = f"/apis/{group}/{version}/namespaces/{namespace}/{plural}/{name}"
+    if subresource:
+        path = path + "/" + subresource
+    return get_api_client().call_api(
+        path,
+        "PATCH",
+        query_params=[("fieldManager", field_manager), ("force", "true")],
+        header_params={
+            "Accept": "application/json",
+            "Content-Type": "application/apply-patch+yaml",
+        },
+        body=body,
+        response_type="object",
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+    )
+
+
+def get_executor():
+    """Returns the shared thread pool used for blocking kubernetes client calls.
+
+    The pool is created lazily, so that importing this module has no side effects.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=K8S_CLIENT_THREADS, thread_name_prefix="k8s-client"
+        )
+        logger.info(
+            f"Kubernetes client thread pool created with %s threads",
+            K8S_CLIENT_THREADS,
+        )
+    return _executor
+
+
+async def call(func, *args, **kwargs):
+    """Run a blocking kubernetes client call without blocking the event loop.
+
+    Args:
+        * func (Callable): The kubernetes client method, e.g. ``api(CustomObjectsApi).get_namespaced_custom_object``
+        * args, kwargs: The arguments passed to ``func``
+
+    Returns:
+        The result of ``func``. Exceptions (e.g. ``ApiException``) are raised to the caller unchanged.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown():
+    """Shut down the thread pool and the pooled ApiClient, e.g. from a kopf cleanup handler."""
+    global _executor, _api_client
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _api_client is not None:
+        logger.info(f"Kubernetes ApiClient statistics %s", stats())
+        _api_client.rest_client.pool_manager.clear()
+        _api_client = None
@@ -7,11 +7,12 @@ operator that takes API custom resources and implements them using Whale Cloud A
 import kopf
 import logging
 import os
-import time
 import json
 from http.client import HTTPConnection
 import kubernetes.client
 from kubernetes.client.rest import ApiException
+import k8s_client
+import retry_policy
 
 # Setup logging
 logging_level = os.environ.get("LOGGING", logging.INFO)
@@ -32,6 +33,10 @@ APIG_DEFAULT_INGRESS = "apig-operator-uportal"
 APIG_DEFAULT_PORT = 8080
 APIG_SUCC_CODE = "0000"
 
+@kopf.on.startup()
+def startRetryPolicy(**_):
+    retry_policy.setup()
+
 # when an oda.tmforum.org api resource is created or updated, bind the apig api
 @kopf.on.create(GROUP, VERSION, APIS_PLURAL)
 @kopf.on.update(GROUP, VERSION, APIS_PLURAL)
@@ -62,10 +67,10 @@ def apigBind(meta, spec, status, body, namespace, labels, name, **kwargs):
             raise kopf.TemporaryError( "Bind apig failed, return %s"%resp )
         # if bind success, update CRD status
         try:
-            customObjectsApi = kubernetes.client.CustomObjectsApi()
+            customObjectsApi = k8s_client.api(kubernetes.client.CustomObjectsApi)
             apiObj = customObjectsApi.get_namespaced_custom_object(GROUP, VERSION, namespace, APIS_PLURAL, meta['name'] )
             
-            ingressApi = kubernetes.client.NetworkingV1beta1Api()
+            ingressApi = k8s_client.api(kubernetes.client.NetworkingV1beta1Api)
             listIngressResp = ingressApi.read_namespaced_ingress( apigIngressName, namespace )
             logging.info("List ingress response: %s\n" % listIngressResp)
             apigIngress = listIngressResp.to_dict()
@@ -150,4 +155,5 @@ def restCall( host, path, spec ):
     except Exception as StrError:
         hConn.close()
         logging.error("Exception when calling restful api: %s\n" % StrError)
-        time.sleep(2)
+        # retried by kopf after the delay of the retry policy, instead of blocking the handler thread
+        raise kopf.TemporaryError("Exception when calling rest api: %s" % StrError)
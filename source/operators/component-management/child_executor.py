@@ -0,0 +1,146 @@
+"""Bounded execution of the child resource writes of the component operator.
+
+A Component can have hundreds of children (ExposedAPIs, DependentAPIs, PublishedNotifications,
+...). Creating them one at a time makes large components slow to converge, creating them all
+at once floods the API server and trips its priority-and-fairness throttling. All creates,
+patches and deletes of children go through one ``ChildExecutor`` that limits both the number of
+writes in flight and their rate (token bucket).
+
+Usage::
+
+    results = await child_executor.get_executor().gather(
+        createAPIResource(logw, api, namespace, name, "coreAPIs") for api in apis
+    )
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger("ChildExecutor")
+
+# maximum number of child creates, patches and deletes in flight at the same time
+CHILD_CONCURRENCY = int(os.getenv("CHILD_CONCURRENCY", "8"))
+# maximum sustained rate of child creates, patches and deletes per second (0 disables the limit)
+CHILD_QPS = float(os.getenv("CHILD_QPS", "20"))
+# number of child writes that can be started at once before the rate limit applies
+CHILD_BURST = int(os.getenv("CHILD_BURST", str(max(1, int(CHILD_QPS)))))
+
+
+class TokenBucket:
+    """Token bucket rate limiter for coroutines.
+
+    Args:
+        * rate (Float): Tokens added per second. A rate of 0 disables the limit.
+        * burst (Integer): Maximum number of tokens in the bucket.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Waits until a token is available and takes it."""
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # the lock makes the waiters take their tokens in order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class ChildExecutor:
+    """Runs child resource writes with a concurrency limit and a rate limit.
+
+    Args:
+        * concurrency (Integer): Maximum number of writes in flight
+        * qps (Float): Maximum number of writes started per second (0 disables the rate limit)
+        * burst (Integer): Number of writes that can be started at once before the rate limit applies
+    """
+
+    def __init__(self, concurrency=CHILD_CONCURRENCY, qps=CHILD_QPS, burst=CHILD_BURST):
+        self.concurrency = max(1, concurrency)
+        self._semaphore = None
+        self._bucket = TokenBucket(qps, burst)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, coro):
+        """Runs one child write.
+
+        The coroutine must not itself submit work to the same executor, or it could wait for a slot it holds.
+
+        Args:
+            * coro (Coroutine): The write, e.g. ``createAPIResource(...)``
+
+        Returns:
+            The result of the coroutine. Exceptions are raised to the caller unchanged.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            coro.close()  # cancelled while waiting, the write is never started
+            raise
+        try:
+            await self._bucket.acquire()
+        except BaseException:
+            self._semaphore.release()
+            coro.close()
+            raise
+        try:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return await coro
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def gather(self, coros):
+        """Runs child writes concurrently within the limits of the executor.
+
+        Args:
+            * coros (Iterable): The write coroutines
+
+        Returns:
+            List: The results in the order of ``coros``. The first exception is raised to the caller, the
+            remaining writes are cancelled.
+        """
+        tasks = [asyncio.ensure_future(self.run(coro)) for coro in coros]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+
+_executor = None
+
+
+def get_executor():
+    """Returns the executor shared by all handlers of the operator."""
+    global _executor
+    if _executor is None:
+        _executor = ChildExecutor()
+        logger.info(
+            f"Child executor created with concurrency %s and %s writes per second",
+            CHILD_CONCURRENCY,
+            CHILD_QPS,
+        )
+    return _executor
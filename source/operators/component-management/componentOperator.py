@@ -16,8 +16,26 @@ import traceback
 from kubernetes.client.rest import ApiException
 import os
 import asyncio
-
-from log_wrapper import LogWrapper, logwrapper
+import functools
+import json
+import time
+
+from log_wrapper import LogWrapper, logwrapper, serve_recent_logs
+import k8s_client
+import exposedapi_diff
+import child_executor
+import resource_cache
+import label_watch
+import watch_checkpoint
+import status_summary
+import deployment_stages
+import deployment_timings
+import operator_metrics
+import spec_checkpoint
+import operator_logging
+import watch_continuation
+import work_queue
+import sharding
 
 # Setup logging
 logging_level = os.environ.get("LOGGING", logging.INFO)
@@ -25,6 +43,7 @@ kopf_logger = logging.getLogger()
 kopf_logger.setLevel(logging.WARNING)
 logger = logging.getLogger("ComponentOperator")
 logger.setLevel(int(logging_level))
+operator_logging.setup()
 logger.info(f"Logging set to %s", logging_level)
 logger.debug("debug logging active")
 
@@ -44,6 +63,54 @@ logger.info(f"Monitoring namespace %s", component_namespace)
 
 componentname_label = os.getenv("COMPONENTNAME_LABEL", "oda.tmforum.org/componentName")
 
+# "handlers" (default) registers one kopf handler per part of the Component envelope.
+# "consolidated" registers a single reconcileComponent handler that diffs all the children
+# in one pass and writes the whole result with a single status patch.
+RECONCILE_MODE = os.getenv("RECONCILE_MODE", "handlers")
+RECONCILE_MODE_CONSOLIDATED = "consolidated"
+logger.info(f"Reconcile mode %s", RECONCILE_MODE)
+
+# skip the resume handlers of the Components whose spec has not changed since it was reconciled
+RESUME_CHECKPOINT = os.getenv("RESUME_CHECKPOINT", "false").lower() == "true"
+logger.info(f"Resume checkpoint %s", RESUME_CHECKPOINT)
+
+# serve the reads of Components and their children from a watch-fed in-memory cache
+RESOURCE_CACHE = os.getenv("RESOURCE_CACHE", "false").lower() == "true"
+logger.info(f"Resource cache %s", RESOURCE_CACHE)
+
+# write child resources with server-side apply (one idempotent request per child) instead of
+# read, compare and create or patch
+SERVER_SIDE_APPLY = os.getenv("SERVER_SIDE_APPLY", "false").lower() == "true"
+FIELD_MANAGER = os.getenv("FIELD_MANAGER", "componentOperator")
+logger.info(
+    f"Server-side apply %s (field manager %s)", SERVER_SIDE_APPLY, FIELD_MANAGER
+)
+
+# adopt the existing resources on startup with one LIST per kind instead of one resume handler per resource
+ADOPTION_SWEEP = os.getenv("ADOPTION_SWEEP", "false").lower() == "true"
+ADOPTION_SWEEP_CONCURRENCY = int(os.getenv("ADOPTION_SWEEP_CONCURRENCY", "10"))
+ADOPTION_SWEEP_RETRIES = 5
+ADOPTION_SWEEP_RETRY_DELAY = 10
+logger.info(f"Adoption sweep on startup %s", ADOPTION_SWEEP)
+
+# "kopf" (default) adopts resources with kopf handlers, which watch all the objects of each kind.
+# "selector" watches only the objects with the component name label (the API server filters them).
+ADOPTION_WATCH = os.getenv("ADOPTION_WATCH", "kopf")
+ADOPTION_WATCH_SELECTOR = "selector"
+# watch the labelled objects in all namespaces instead of only the component namespace
+ADOPTION_WATCH_ALL_NAMESPACES = (
+    os.getenv("ADOPTION_WATCH_ALL_NAMESPACES", "false").lower() == "true"
+)
+# with ADOPTION_WATCH=selector the state of the watches is kept in "memory" (default), or also
+# saved in one "configmap" checkpoint so that a restarted operator continues where it stopped
+ADOPTION_STATE = os.getenv("ADOPTION_STATE", "memory")
+ADOPTION_STATE_CONFIGMAP = "configmap"
+ADOPTION_CHECKPOINT_NAME = os.getenv(
+    "ADOPTION_CHECKPOINT_NAME", "component-operator-adoption-checkpoint"
+)
+ADOPTION_CHECKPOINT_INTERVAL = int(os.getenv("ADOPTION_CHECKPOINT_INTERVAL", "60"))
+logger.info(f"Adoption watch %s (state %s)", ADOPTION_WATCH, ADOPTION_STATE)
+
 # Constants
 HTTP_CONFLICT = 409
 HTTP_NOT_FOUND = 404
@@ -73,11 +140,226 @@ IDENTITY_PROVIDER_NOT_SET = "Not set"
 PUBLISHEDNOTIFICATIONS_PLURAL = "publishednotifications"
 SUBSCRIBEDNOTIFICATIONS_PLURAL = "subscribednotifications"
 
-
-# try to recover from broken watchers https://github.com/nolar/kopf/issues/1036
+# resources kept in the resource cache (all in the oda.tmforum.org group)
+CACHED_PLURALS = [
+    COMPONENTS_PLURAL,
+    EXPOSEDAPIS_PLURAL,
+    DEPENDENTAPI_PLURAL,
+    IDENTITYCONFIG_PLURAL,
+    SECRETSMANAGEMENT_PLURAL,
+    PUBLISHEDNOTIFICATIONS_PLURAL,
+    SUBSCRIBEDNOTIFICATIONS_PLURAL,
+]
+cache = resource_cache.ResourceCache()
+# the shards of the Components this replica handles, with SHARDS > 1
+shards = sharding.ShardOwnership(componentname_label)
+
+
+# watch with bookmarks, recover from broken watchers https://github.com/nolar/kopf/issues/1036
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_):
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
+    shards.configure(settings)
+
+
+@kopf.on.startup()
+async def startSharding(**_):
+    await shards.start()
+
+
+@kopf.on.cleanup()
+async def stopSharding(**_):
+    await shards.stop()
+
+
+# references to the running background tasks, so that they are not garbage collected
+background_tasks = set()
+
+
+def startBackgroundTask(coro):
+    task = asyncio.get_running_loop().create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+# the retry policy, the metrics and the work queue wrap the handlers, in the order of work_queue
+@kopf.on.startup()
+def wrapHandlers(**_):
+    work_queue.wrap_handlers()
+
+
+@kopf.on.startup()
+def startRecentLogs(**_):
+    serve_recent_logs()
+
+
+@kopf.on.startup()
+async def startAdoption(**_):
+    # run in the background, the handlers of the operator start in the meantime
+    if ADOPTION_SWEEP:
+        startBackgroundTask(sweepAdoption())
+    if ADOPTION_WATCH == ADOPTION_WATCH_SELECTOR:
+        startBackgroundTask(watchAdoption())
+
+
+@kopf.on.cleanup()
+def cleanup(**_):
+    if RESOURCE_CACHE:
+        logger.info(f"Resource cache statistics %s", cache.stats())
+    if ADOPTION_WATCH == ADOPTION_WATCH_SELECTOR:
+        logger.info(f"Adoption statistics %s", adoption_stats)
+    logger.info(
+        f"Summary statistics %s, sections computed %s, reused %s",
+        summary_stats,
+        summarizer.computed,
+        summarizer.reused,
+    )
+    k8s_client.shutdown()
+
+
+def cacheResourceEvent(event, resource, **_):
+    """kopf event handler that keeps the resource cache current."""
+    cache.apply_event(resource.plural, event)
+
+
+if RESOURCE_CACHE:
+    for cached_plural in CACHED_PLURALS:
+        kopf.on.event(GROUP, VERSION, cached_plural, id=f"cache_{cached_plural}")(
+            cacheResourceEvent
+        )
+
+
+async def getCustomObject(plural, namespace, name):
+    """Helper function to read an oda.tmforum.org resource, from the resource cache where possible.
+
+    Args:
+        * plural (String): The plural of the resource, e.g. exposedapis
+        * namespace (String): The namespace of the resource
+        * name (String): The name of the resource
+
+    Returns:
+        Dict: The resource, a copy that the caller may modify. Raises ApiException like ``get_namespaced_custom_object``
+        (e.g. status 404 if the resource does not exist).
+
+    :meta private:
+    """
+    if RESOURCE_CACHE:
+        obj = cache.get(plural, namespace, name)
+        if obj is not None:
+            return obj
+    # not cached (yet), e.g. just created and the watch event has not arrived
+    custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+    return await k8s_client.call(
+        custom_objects_api.get_namespaced_custom_object,
+        group=GROUP,
+        version=VERSION,
+        namespace=namespace,
+        plural=plural,
+        name=name,
+    )
+
+
+def cacheWrite(plural, obj):
+    """Helper function to store the response of a write in the resource cache (read your own writes).
+
+    The watch event of the write arrives later, a read in between would return the resource as it was before the write.
+
+    :meta private:
+    """
+    if RESOURCE_CACHE and obj:
+        cache.apply_event(plural, {"type": "MODIFIED", "object": obj})
+
+
+def cacheDelete(plural, namespace, name):
+    """Helper function to remove a deleted resource from the resource cache.
+
+    :meta private:
+    """
+    if RESOURCE_CACHE:
+        cache.apply_event(
+            plural,
+            {
+                "type": "DELETED",
+                "object": {"metadata": {"namespace": namespace, "name": name}},
+            },
+        )
+
+
+async def applyCustomObject(plural, version, namespace, body, subresource=None):
+    """Helper function to server-side apply an oda.tmforum.org resource as the operator's field manager.
+
+    Args:
+        * plural (String): The plural of the resource, e.g. exposedapis
+        * version (String): The version of the resource
+        * namespace (String): The namespace of the resource
+        * body (Dict): The complete resource intent (apiVersion, kind, metadata.name, ...)
+        * subresource (String): Optional subresource, e.g. status
+
+    Returns:
+        Dict: The resource after the apply. Raises ApiException if the request fails.
+
+    :meta private:
+    """
+    obj = await k8s_client.call(
+        k8s_client.apply_namespaced_custom_object,
+        GROUP,
+        version,
+        namespace,
+        plural,
+        body["metadata"]["name"],
+        body,
+        FIELD_MANAGER,
+        subresource,
+    )
+    cacheWrite(plural, obj)
+    return obj
+
+
+def adoption_resume_enabled(**_):
+    """kopf filter for the resume adopt handlers, replaced by the adoption sweep when it is enabled."""
+    return not ADOPTION_SWEEP
+
+
+def separate_handlers_enabled(**_):
+    """kopf filter for the per-part Component handlers (coreAPIs, managementAPIs, ...)."""
+    return RECONCILE_MODE != RECONCILE_MODE_CONSOLIDATED
+
+
+def consolidated_handler_enabled(**_):
+    """kopf filter for the consolidated reconcileComponent handler."""
+    return RECONCILE_MODE == RECONCILE_MODE_CONSOLIDATED
+
+
+def specChanged(handlerId):
+    """Returns a kopf filter for the resume handler ``handlerId``, false if it has already reconciled the spec.
+
+    :meta private:
+    """
+
+    def spec_changed(spec, status, name, **_):
+        if RESUME_CHECKPOINT and spec_checkpoint.is_reconciled(status, handlerId, spec):
+            logger.debug(f"Spec of %s unchanged, %s not resumed", name, handlerId)
+            return False
+        return True
+
+    return spec_changed
+
+
+def specCheckpoint(handler):
+    """Decorator of a Component handler that records the spec it has reconciled, see spec_checkpoint.
+
+    :meta private:
+    """
+
+    @functools.wraps(handler)
+    async def checkpointed(**kwargs):
+        with spec_checkpoint.reconciling(
+            kwargs["patch"], handler.__name__, kwargs["spec"]
+        ):
+            return await handler(**kwargs)
+
+    return checkpointed
 
 
 @logwrapper
@@ -99,16 +381,18 @@ async def deleteExposedAPI(
     """
 
     logw.info(f"Deleting API {deleteExposedAPIName}")
-    custom_objects_api = kubernetes.client.CustomObjectsApi()
+    custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
-        api_response = custom_objects_api.delete_namespaced_custom_object(
+        api_response = await k8s_client.call(
+            custom_objects_api.delete_namespaced_custom_object,
             group=GROUP,
             version=VERSION,
             namespace=namespace,
             plural=EXPOSEDAPIS_PLURAL,
             name=deleteExposedAPIName,
         )
-        logw.debug(f"API response {api_response}")
+        cacheDelete(EXPOSEDAPIS_PLURAL, namespace, deleteExposedAPIName)
+        logw.debug("API response", api_response)
     except ApiException as e:
         logw.error(
             f"Exception when calling CustomObjectsApi->delete_namespaced_custom_object {e}"
@@ -136,16 +420,18 @@ async def deleteDependentAPI(
 
     logw.info(f"Deleting DependentAPI {dependentAPIName}")
 
-    custom_objects_api = kubernetes.client.CustomObjectsApi()
+    custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
-        dependentapi_response = custom_objects_api.delete_namespaced_custom_object(
+        dependentapi_response = await k8s_client.call(
+            custom_objects_api.delete_namespaced_custom_object,
             group=GROUP,
             version=DEPENDENTAPI_VERSION,
             namespace=namespace,
             plural=DEPENDENTAPI_PLURAL,
             name=dependentAPIName,
         )
-        logw.debug(f"DependentAPI response {dependentapi_response}")
+        cacheDelete(DEPENDENTAPI_PLURAL, namespace, dependentAPIName)
+        logw.debug("DependentAPI response", dependentapi_response)
     except ApiException as e:
         logw.error(
             f"Exception when calling CustomObjectsApi->delete_namespaced_custom_object {e}"
@@ -172,16 +458,18 @@ async def deleteSecretsManagement(
     """
 
     logw.info(f"Deleting SecretsManagement {secretsManagementName}")
-    custom_objects_api = kubernetes.client.CustomObjectsApi()
+    custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
-        secretsmanagement_response = custom_objects_api.delete_namespaced_custom_object(
+        secretsmanagement_response = await k8s_client.call(
+            custom_objects_api.delete_namespaced_custom_object,
             group=GROUP,
             version=SECRETSMANAGEMENT_VERSION,
             namespace=namespace,
             plural=SECRETSMANAGEMENT_PLURAL,
             name=secretsManagementName,
         )
-        logs.debug(f"SecretsManagement response {secretsmanagement_response}")
+        cacheDelete(SECRETSMANAGEMENT_PLURAL, namespace, secretsManagementName)
+        logw.debug("SecretsManagement response", secretsmanagement_response)
     except ApiException as e:
         logw.error(
             f"Exception when calling CustomObjectsApi->delete_namespaced_custom_object {e}"
@@ -208,16 +496,18 @@ async def deleteIdentityConfig(
     """
 
     logw.info(f"Deleting IdentityConfig {identityConfigName}")
-    custom_objects_api = kubernetes.client.CustomObjectsApi()
+    custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
-        identityconfig_response = custom_objects_api.delete_namespaced_custom_object(
+        identityconfig_response = await k8s_client.call(
+            custom_objects_api.delete_namespaced_custom_object,
             group=GROUP,
             version=IDENTITYCONFIG_VERSION,
             namespace=namespace,
             plural=IDENTITYCONFIG_PLURAL,
             name=identityConfigName,
         )
-        logs.debug(f"IdentityConfig response {identityconfig_response}")
+        cacheDelete(IDENTITYCONFIG_PLURAL, namespace, identityConfigName)
+        logw.debug("IdentityConfig response", identityconfig_response)
     except ApiException as e:
         logw.error(
             f"Exception when calling CustomObjectsApi->delete_namespaced_custom_object {e}"
@@ -237,9 +527,68 @@ def quick_get_comp_name(body):
     return safe_get(None, body, "metadata", "labels", componentname_label)
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+async def reconcileExposedAPIs(
+    logw: LogWrapper, statusField, segment, spec, status, namespace, name
+):
+    """Helper function to reconcile the ExposedAPI children of one part of a component.
+
+    Compares the **exposedAPIs** of the ``segment`` part of the spec with the ExposedAPI children in the ``statusField``
+    of the status (see ``exposedapi_diff``), patches the existing children, deletes the removed ones and creates the new ones.
+
+    Args:
+        * logw (LogWrapper): The log wrapper of the calling handler
+        * statusField (String): The status field holding the ExposedAPI children, e.g. coreAPIs
+        * segment (String): The part of the spec holding the exposedAPIs, e.g. coreFunction
+        * spec (Dict): The spec from the yaml component envelope showing the intent (or desired state)
+        * status (Dict): The status from the yaml component envelope showing the actual state.
+        * namespace (String): The namespace for the component
+        * name (String): The name of the component
+
+    Returns:
+        List: The status of the patched and created ExposedAPI children.
+
+    :meta private:
+    """
+    oldAPIs = []
+    if status:  # if status exists (i.e. this is not a new component)
+        oldAPIs = safe_get([], status, statusField)
+    newAPIs = spec[segment]["exposedAPIs"]
+    logw.debug("Exposed API list", newAPIs)
+
+    diff = exposedapi_diff.diff_exposed_apis(name, oldAPIs, newAPIs)
+
+    writes = []
+    for newAPI in diff.patch:
+        logw.info(f"Patching ExposedAPI {exposedapi_diff.child_name(name, newAPI)}")
+        writes.append(patchAPIResource(logw, newAPI, namespace, name, statusField))
+    for newAPI in diff.create:
+        logw.info(f"Calling createAPIResource {newAPI['name']}")
+        writes.append(createAPIResource(logw, newAPI, namespace, name, statusField))
+    for oldName in diff.delete:
+        logw.info(f"Deleting ExposedAPI {oldName}")
+        writes.append(
+            deleteExposedAPI(logw, oldName, name, status, namespace, statusField)
+        )
+
+    # the patched and created children are the first results, the deletes return nothing
+    results = await child_executor.get_executor().gather(writes)
+    return results[: len(diff.patch) + len(diff.create)]
+
+
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([separate_handlers_enabled, specChanged("coreAPIs")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def coreAPIs(meta, spec, status, body, namespace, labels, name, **kwargs):
     """Handler function for **core function** part new or updated components.
 
@@ -269,77 +618,35 @@ async def coreAPIs(meta, spec, status, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del meta, labels, kwargs
 
-    apiChildren = (
-        []
-    )  # any existing API children of this component that have been patched
-    oldCoreAPIs = (
-        []
-    )  # existing API children of this component (according to previous status)
+    apiChildren = []  # the ExposedAPI children of this component after the changes
     try:
-
-        # compare desired state (spec) with actual state (status) and initiate changes
-        if status:  # if status exists (i.e. this is not a new component)
-            # update a component - look in old and new to see if we need to delete any API resources
-            if "coreAPIs" in status.keys():
-                oldCoreAPIs = status["coreAPIs"]
-
-            newCoreAPIs = spec["coreFunction"]["exposedAPIs"]
-            # find apis in old that are missing in new
-            deletedAPIs = []
-            for oldAPI in oldCoreAPIs:
-                found = False
-                for newAPI in newCoreAPIs:
-                    logw.debug(
-                        f"Comparing {oldAPI['name']} to {name + '-' + newAPI['name'].lower()}"
-                    )
-                    if oldAPI["name"] == name + "-" + newAPI["name"].lower():
-                        found = True
-                        logw.info(f"Patching ExposedAPI {oldAPI['name']}")
-
-                        resultStatus = await patchAPIResource(
-                            logw, newAPI, namespace, name, "coreAPIs"
-                        )
-                        apiChildren.append(resultStatus)
-                if not found:
-                    logw.info(f"Deleting ExposedAPI {oldAPI['name']}")
-                    await deleteExposedAPI(
-                        logw, oldAPI["name"], name, status, namespace, "coreAPIs"
-                    )
-
-        # get core APIS
-        coreAPIs = spec["coreFunction"]["exposedAPIs"]
-        logw.debug(f"Exposed API list {coreAPIs}")
-
-        for coreAPI in coreAPIs:
-            # check if we have already patched this API
-            alreadyProcessed = False
-            for processedAPI in apiChildren:
-                logw.debug(
-                    f"Comparing {processedAPI['name']} to {name + '-' + coreAPI['name'].lower()}"
-                )
-
-                if processedAPI["name"] == name + "-" + coreAPI["name"].lower():
-                    alreadyProcessed = True
-            if alreadyProcessed == False:
-                logw.info(f"Calling createAPIResource {coreAPI['name']}")
-
-                resultStatus = await createAPIResource(
-                    logw, coreAPI, namespace, name, "coreAPIs"
-                )
-                apiChildren.append(resultStatus)
-
+        apiChildren = await reconcileExposedAPIs(
+            logw, "coreAPIs", "coreFunction", spec, status, namespace, name
+        )
     except kopf.TemporaryError as e:
         raise kopf.TemporaryError(e)  # allow the operator to retry
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
+        spec_checkpoint.mark_failed()  # the result is partial, reconcile again on resume
 
     # Update the parent's status.
     return apiChildren
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([separate_handlers_enabled, specChanged("managementAPIs")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def managementAPIs(meta, spec, status, body, namespace, labels, name, **kwargs):
     """Handler function for **managementFunction** part new or updated components.
 
@@ -369,79 +676,35 @@ async def managementAPIs(meta, spec, status, body, namespace, labels, name, **kw
     # del unused-arguments for linting
     del meta, labels, kwargs
 
-    apiChildren = []
-    oldManagementAPIs = []
+    apiChildren = []  # the ExposedAPI children of this component after the changes
     try:
-
-        # compare desired state (spec) with actual state (status) and initiate changes
-        if status:  # if status exists (i.e. this is not a new component)
-            # update a component - look in old and new to see if we need to delete any API resources
-            if "managementAPIs" in status.keys():
-                oldManagementAPIs = status["managementAPIs"]
-
-            newManagementAPIs = spec["managementFunction"]["exposedAPIs"]
-            # find apis in old that are missing in new
-            deletedAPIs = []
-            for oldAPI in oldManagementAPIs:
-                found = False
-                for newAPI in newManagementAPIs:
-                    logw.debug(
-                        f"Comparing {oldAPI['name']} to {name + '-' + newAPI['name'].lower()}"
-                    )
-
-                    if oldAPI["name"] == name + "-" + newAPI["name"].lower():
-                        found = True
-                        resultStatus = await patchAPIResource(
-                            logw, newAPI, namespace, name, "managementAPIs"
-                        )
-                        logw.info(f"Patching API {oldAPI['name']}")
-
-                        apiChildren.append(resultStatus)
-                if not found:
-                    logw.info(f"Deleting API {oldAPI['name']}")
-
-                    await deleteExposedAPI(
-                        logw, oldAPI["name"], name, status, namespace, "managementAPIs"
-                    )
-
-        # get exposed APIS
-        managementAPIs = spec["managementFunction"]["exposedAPIs"]
-        logw.debug(f"Exposed API list {managementAPIs}")
-
-        for managementAPI in managementAPIs:
-            # check if we have already patched this API
-            alreadyProcessed = False
-            for processedAPI in apiChildren:
-                logger.debug(
-                    f"Comparing {processedAPI['name']} to {name + '-' + managementAPI['name'].lower()}"
-                )
-                logw.debug(
-                    f"Comparing new APIs with status {processedAPI['name']} to {name + '-' + managementAPI['name'].lower()}"
-                )
-
-                if processedAPI["name"] == name + "-" + managementAPI["name"].lower():
-                    alreadyProcessed = True
-
-            if alreadyProcessed == False:
-                logw.info(f"Calling createAPIResource {managementAPI['name']}")
-
-                resultStatus = await createAPIResource(
-                    logw, managementAPI, namespace, name, "managementAPIs"
-                )
-                apiChildren.append(resultStatus)
-
+        apiChildren = await reconcileExposedAPIs(
+            logw, "managementAPIs", "managementFunction", spec, status, namespace, name
+        )
     except kopf.TemporaryError as e:
         raise kopf.TemporaryError(e)  # allow the operator to retry
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
+        spec_checkpoint.mark_failed()  # the result is partial, reconcile again on resume
 
     # Update the parent's status.
     return apiChildren
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([separate_handlers_enabled, specChanged("securityAPIs")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def securityAPIs(meta, spec, status, body, namespace, labels, name, **kwargs):
     """Handler function for **securityFunction** part new or updated components.
 
@@ -471,67 +734,16 @@ async def securityAPIs(meta, spec, status, body, namespace, labels, name, **kwar
     # del unused-arguments for linting
     del meta, labels, kwargs
 
-    apiChildren = []
-    oldSecurityAPIs = []
+    apiChildren = []  # the ExposedAPI children of this component after the changes
     try:
-
-        # compare desired state (spec) with actual state (status) and initiate changes
-        if status:  # if status exists (i.e. this is not a new component)
-            # update a component - look in old and new to see if we need to delete any API resources
-            if "securityAPIs" in status.keys():
-                oldSecurityAPIs = status["securityAPIs"]
-            newSecurityAPIs = spec["securityFunction"]["exposedAPIs"]
-            # find apis in old that are missing in new
-            deletedAPIs = []
-            for oldAPI in oldSecurityAPIs:
-                found = False
-                for newAPI in newSecurityAPIs:
-                    logw.debug(
-                        f"Comparing {oldAPI['name']} to {name + '-' + newAPI['name'].lower()}"
-                    )
-
-                    if oldAPI["name"] == name + "-" + newAPI["name"].lower():
-                        found = True
-                        resultStatus = await patchAPIResource(
-                            logw, newAPI, namespace, name, "securityAPIs"
-                        )
-                        logw.info(f"Patching API {oldAPI['name']}")
-
-                        apiChildren.append(resultStatus)
-                if not found:
-                    logw.info(f"Deleting API {oldAPI['name']}")
-
-                    await deleteExposedAPI(
-                        logw, oldAPI["name"], name, status, namespace, "securityAPIs"
-                    )
-
-        # get exposed APIS
-        securityAPIs = spec["securityFunction"]["exposedAPIs"]
-        logw.debug(f"Exposed API list {securityAPIs}")
-
-        for securityAPI in securityAPIs:
-            # check if we have already patched this API
-            alreadyProcessed = False
-            for processedAPI in apiChildren:
-                logw.debug(
-                    f"Comparing {processedAPI['name']} to {name + '-' + securityAPI['name'].lower()}"
-                )
-
-                if processedAPI["name"] == name + "-" + securityAPI["name"].lower():
-                    alreadyProcessed = True
-
-            if alreadyProcessed == False:
-                logw.debug(f"Calling createAPIResource {securityAPI['name']}")
-
-                resultStatus = await createAPIResource(
-                    logw, securityAPI, namespace, name, "securityAPIs"
-                )
-                apiChildren.append(resultStatus)
-
+        apiChildren = await reconcileExposedAPIs(
+            logw, "securityAPIs", "securityFunction", spec, status, namespace, name
+        )
     except kopf.TemporaryError as e:
         raise kopf.TemporaryError(e)  # allow the operator to retry
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
+        spec_checkpoint.mark_failed()  # the result is partial, reconcile again on resume
 
     # Update the parent's status.
     return apiChildren
@@ -570,9 +782,20 @@ def find_entry_by_name(entries, name):
 # -------------------------------------------------- ---------------- -------------------------------------------------- #
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([separate_handlers_enabled, specChanged("coreDependentAPIs")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def coreDependentAPIs(
     meta, spec, status, body, namespace, labels, name, **kwargs
 ):
@@ -616,17 +839,20 @@ async def coreDependentAPIs(
 
         newCoreDependentAPIs = safe_get([], spec, "coreFunction", "dependentAPIs")
 
+        deletes = []
+        creates = []
         # compare entries by name
         for oldCoreDependentAPI in oldCoreDependentAPIs:
             cr_name = oldCoreDependentAPI["name"]
             dapi_name = cr_name[len(dapi_base_name) + 1 :]
-            print(dapi_name)
             newCoreDependentAPI = find_entry_by_name(newCoreDependentAPIs, dapi_name)
             if not newCoreDependentAPI:
                 logw.info(f"Deleting DependentAPI {cr_name}")
 
-                await deleteDependentAPI(
-                    logw, cr_name, name, status, namespace, "coreDependentAPIs"
+                deletes.append(
+                    deleteDependentAPI(
+                        logw, cr_name, name, status, namespace, "coreDependentAPIs"
+                    )
                 )
             else:
                 # TODO[FH] implement check for update
@@ -636,37 +862,63 @@ async def coreDependentAPIs(
         for newCoreDependentAPI in newCoreDependentAPIs:
             dapi_name = newCoreDependentAPI["name"]
             cr_name = f"{dapi_base_name}-{dapi_name}"
-            print(dapi_name)
             oldCoreDependentAPI = find_entry_by_name(oldCoreDependentAPIs, cr_name)
             if not oldCoreDependentAPI:
                 logw.info(f"Calling createDependentAPI {cr_name}")
-                resultStatus = await createDependentAPIResource(
-                    logw,
-                    newCoreDependentAPI,
-                    namespace,
-                    name,
-                    cr_name,
-                    "coreDependentAPIs",
+                creates.append(
+                    createDependentAPIResource(
+                        logw,
+                        newCoreDependentAPI,
+                        namespace,
+                        name,
+                        cr_name,
+                        "coreDependentAPIs",
+                    )
                 )
-                dependentAPIChildren.append(resultStatus)
             # else: already handled above
 
+        results = await child_executor.get_executor().gather(creates + deletes)
+        dependentAPIChildren.extend(results[: len(creates)])
+
     except kopf.TemporaryError as e:
         raise kopf.TemporaryError(e)  # allow the operator to retry
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
-    logw.info(f"result for status {dependentAPIChildren}")
+        spec_checkpoint.mark_failed()  # the result is partial, reconcile again on resume
+    logw.debugInfo("result for status", dependentAPIChildren)
 
     # Update the parent's status.
     return dependentAPIChildren
 
 
+def identity_config_due(old, new, status, **_):
+    """kopf filter: the identityConfig stage has just started, or the securityFunction has changed after it started.
+
+    ``old`` and ``new`` are the essences kopf compares, ``status`` is the current status of the Component. The
+    essences include the status because the summary handler watches it; without it, every update after the start
+    would be due, which only repeats the idempotent handler.
+    """
+    if not deployment_stages.started(
+        status.get(SUMMARY_STATUS_FIELD, {}).get("stages"), "identityConfig"
+    ):
+        return False
+    old = old or {}
+    new = new or {}
+    previousStages = old.get("status", {}).get(SUMMARY_STATUS_FIELD, {}).get("stages")
+    return not deployment_stages.started(previousStages, "identityConfig") or (
+        old.get("spec", {}).get("securityFunction")
+        != new.get("spec", {}).get("securityFunction")
+    )
+
+
+# runs as soon as the inputs of the identityConfig stage are ready, see deployment_stages, and
+# when the securityFunction changes after that; one handler id, so one progress and result field
 @kopf.on.update(
     GROUP,
     VERSION,
     COMPONENTS_PLURAL,
-    field="status.summary/status.deployment_status",
-    value="In-Progress-IDConfOp",
+    id="identityConfig/stage",
+    when=identity_config_due,
     retries=5,
 )
 async def identityConfig(
@@ -675,6 +927,8 @@ async def identityConfig(
     """Handler function for **identityConfig** part of new or updated components.
 
     Processes the **identityConfig** part of the component envelope and creates the child IdentityConfig resource.
+    It runs when the identityConfig stage starts (alongside the other stages, as soon as the partyRoleManagement API
+    of the component is ready) and when the securityFunction changes after that.
 
     Args:
         * meta (Dict): The metadata from the yaml component envelope
@@ -688,7 +942,7 @@ async def identityConfig(
         * new (Dict): The new component (for updates)
 
     Returns:
-        Dict: The identityConfig status that is put into the component envelope status/identityConfig/status.summary/status.deployment_status field.
+        String: The identityConfig status that is put into the component envelope status/identityConfig/stage field.
     """
     logw = LogWrapper(handler_name="identityconfig", function_name="identityconfig")
     logw.set(
@@ -705,17 +959,13 @@ async def identityConfig(
         identityConfigName = name
         identityConfig = None
 
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
         try:
-            identityConfig = custom_objects_api.get_namespaced_custom_object(
-                group=IDENTITYCONFIG_GROUP,
-                version=IDENTITYCONFIG_VERSION,
-                namespace=namespace,
-                plural=IDENTITYCONFIG_PLURAL,
-                name=identityConfigName,
+            identityConfig = await getCustomObject(
+                IDENTITYCONFIG_PLURAL, namespace, identityConfigName
             )
             logw.info(f"IdentityConfig resource already exists")
-            logw.debug(f"IdentityConfig resource {identityConfig}")
+            logw.debug("IdentityConfig resource", identityConfig)
             identityConfigStatus = "identityConfig resource already exists"
         except ApiException as e:
             if e.status == HTTP_NOT_FOUND:
@@ -765,7 +1015,8 @@ async def identityConfig(
 
             if resourceChanged:
                 try:
-                    identityConfig = custom_objects_api.patch_namespaced_custom_object(
+                    identityConfig = await k8s_client.call(
+                        custom_objects_api.patch_namespaced_custom_object,
                         group=IDENTITYCONFIG_GROUP,
                         version=IDENTITYCONFIG_VERSION,
                         namespace=namespace,
@@ -773,8 +1024,9 @@ async def identityConfig(
                         name=identityConfigName,
                         body=identityConfig,
                     )
+                    cacheWrite(IDENTITYCONFIG_PLURAL, identityConfig)
                     logw.info(f"IdentityConfig resource patched")
-                    logw.debug(f"IdentityConfig resource {identityConfig}")
+                    logw.debug("IdentityConfig resource", identityConfig)
                 except ApiException as e:
                     logw.error(
                         f"Exception when calling CustomObjectsApi->patch_namespaced_custom_object {e}"
@@ -796,17 +1048,12 @@ async def identityConfig(
                 logw.info(f"Adding componentRole statically defined roles")
 
             # check if the component has a partyrole API
-            foundPartyRole = False
-            if "exposedAPIs" in spec["securityFunction"]:
-                for api in spec["securityFunction"]["exposedAPIs"]:
-                    if "partyrole" in api["name"]:
-                        partyRoleAPI = {}
-                        partyRoleAPI["implementation"] = api["implementation"]
-                        partyRoleAPI["path"] = api["path"]
-                        partyRoleAPI["port"] = api["port"]
-                        foundPartyRole = True
-                        break
-            if foundPartyRole:
+            api = deployment_stages.party_role_api(spec)
+            if api is not None:
+                partyRoleAPI = {}
+                partyRoleAPI["implementation"] = api["implementation"]
+                partyRoleAPI["path"] = api["path"]
+                partyRoleAPI["port"] = api["port"]
                 logw.info(f"Adding componentRole dynamically defined roles")
                 # get the partyrole API and add to the identityConfig
                 identityConfigResource["partyRoleAPI"] = partyRoleAPI
@@ -814,7 +1061,7 @@ async def identityConfig(
             # create the identityConfig resource (or patch existing resource if it is present)
             logw.debugInfo(
                 f"Calling createIdentityConfig {identityConfigName}",
-                f"Calling createIdentityConfig with resource {identityConfigResource}",
+                identityConfigResource,
             )
 
             resultStatus = await createIdentityConfigResource(
@@ -830,9 +1077,22 @@ async def identityConfig(
         raise kopf.TemporaryError(e)  # allow the operator to retry
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_(
+        [separate_handlers_enabled, specChanged("securitySecretsManagement")]
+    ),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def securitySecretsManagement(
     meta, spec, status, body, namespace, labels, name, **kwargs
 ):
@@ -873,27 +1133,36 @@ async def securitySecretsManagement(
             oldSecuritySecretsManagement = safe_get(
                 {}, status, "securitySecretsManagement"
             )
-        logw.debug(f"Old SecretsManagement {oldSecuritySecretsManagement}")
+        logw.debug("Old SecretsManagement", oldSecuritySecretsManagement)
 
         newSecuritySecretsManagement = safe_get(
             {}, spec, "securityFunction", "secretsManagement"
         )
-        logw.debug(f"New SecretsManagement {newSecuritySecretsManagement}")
+        logw.debug("New SecretsManagement", newSecuritySecretsManagement)
 
         if oldSecuritySecretsManagement != {} and newSecuritySecretsManagement == {}:
             logw.info(f"Deleting SecretsManagement {sman_name}")
-            await deleteSecretsManagement(
-                logw, sman_name, name, status, namespace, "securitySecretsManagement"
+            await child_executor.get_executor().run(
+                deleteSecretsManagement(
+                    logw,
+                    sman_name,
+                    name,
+                    status,
+                    namespace,
+                    "securitySecretsManagement",
+                )
             )
 
         if oldSecuritySecretsManagement == {} and newSecuritySecretsManagement != {}:
             logw.info(f"Calling createSecretsManagement {sman_name}")
-            resultStatus = await createSecretsManagementResource(
-                logw,
-                newSecuritySecretsManagement,
-                namespace,
-                name,
-                "securitySecretsManagement",
+            resultStatus = await child_executor.get_executor().run(
+                createSecretsManagementResource(
+                    logw,
+                    newSecuritySecretsManagement,
+                    namespace,
+                    name,
+                    "securitySecretsManagement",
+                )
             )
             secretsManagementStatus = resultStatus
 
@@ -906,15 +1175,26 @@ async def securitySecretsManagement(
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
         raise kopf.TemporaryError(e)  # allow the operator to retry
-    logw.info(f"result for status {secretsManagementStatus}")
+    logw.debugInfo("result for status", secretsManagementStatus)
 
     # Update the parent's status.
     return secretsManagementStatus
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([separate_handlers_enabled, specChanged("publishedEvents")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def publishedEvents(meta, spec, status, body, namespace, labels, name, **kwargs):
     """Handler function for **publishedEvents** part of new or updated components.
 
@@ -947,8 +1227,8 @@ async def publishedEvents(meta, spec, status, body, namespace, labels, name, **k
         # get security exposed APIS
         try:
             publishedEvents = spec["eventNotification"]["publishedEvents"]
-            pubChildren = await asyncio.gather(
-                *[
+            pubChildren = await child_executor.get_executor().gather(
+                [
                     createPublishedNotificationResource(
                         logw, publishedEvent, namespace, name, "publishedEvents"
                     )
@@ -962,13 +1242,25 @@ async def publishedEvents(meta, spec, status, body, namespace, labels, name, **k
         raise kopf.TemporaryError(e)  # allow the operator to retry
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
+        spec_checkpoint.mark_failed()  # the result is partial, reconcile again on resume
 
     return pubChildren
 
 
-@kopf.on.resume(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.create(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
-@kopf.on.update(GROUP, VERSION, COMPONENTS_PLURAL, retries=5)
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([separate_handlers_enabled, specChanged("subscribedEvents")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=separate_handlers_enabled
+)
+@specCheckpoint
 async def subscribedEvents(meta, spec, status, body, namespace, labels, name, **kwargs):
     """Handler function for **subscribedEvents** part of new or updated components.
 
@@ -1001,8 +1293,8 @@ async def subscribedEvents(meta, spec, status, body, namespace, labels, name, **
         # get security exposed APIS
         try:
             subscribedEvents = spec["eventNotification"]["subscribedEvents"]
-            subChildren = await asyncio.gather(
-                *[
+            subChildren = await child_executor.get_executor().gather(
+                [
                     createSubscribedNotificationResource(
                         logw, subscribedEvent, namespace, name, "subscribedEvents"
                     )
@@ -1016,20 +1308,191 @@ async def subscribedEvents(meta, spec, status, body, namespace, labels, name, **
         raise kopf.TemporaryError(e)  # allow the operator to retry
     except Exception as e:
         logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
+        spec_checkpoint.mark_failed()  # the result is partial, reconcile again on resume
 
     return subChildren
 
 
-def constructAPIResourcePayload(inExposedAPI):
-    """Helper function to create payloads for API Custom objects.
+# status field of the Component -> part of the Component spec that holds its exposedAPIs
+EXPOSEDAPI_SEGMENTS = {
+    "coreAPIs": "coreFunction",
+    "managementAPIs": "managementFunction",
+    "securityAPIs": "securityFunction",
+}
+
+
+@kopf.on.resume(
+    GROUP,
+    VERSION,
+    COMPONENTS_PLURAL,
+    retries=5,
+    when=kopf.all_([consolidated_handler_enabled, specChanged("reconcileComponent")]),
+)
+@kopf.on.create(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=consolidated_handler_enabled
+)
+@kopf.on.update(
+    GROUP, VERSION, COMPONENTS_PLURAL, retries=5, when=consolidated_handler_enabled
+)
+@specCheckpoint
+async def reconcileComponent(
+    meta, spec, status, body, namespace, labels, name, patch, **kwargs
+):
+    """Handler function that reconciles all the children of new or updated components in one pass.
+
+    Only registered when ``RECONCILE_MODE=consolidated``. It replaces the separate `coreAPIs`, `managementAPIs`,
+    `securityAPIs`, `coreDependentAPIs`, `securitySecretsManagement`, `publishedEvents` and `subscribedEvents` handlers:
+    the desired children are computed once from the spec, diffed once against the children recorded in the status,
+    the child creates, patches and deletes are issued concurrently and the result lands in a single status patch.
 
     Args:
-        * inExposedAPI (Dict): The API spec
+        * meta (Dict): The metadata from the yaml component envelope
+        * spec (Dict): The spec from the yaml component envelope showing the intent (or desired state)
+        * status (Dict): The status from the yaml component envelope showing the actual state.
+        * body (Dict): The entire yaml component envelope
+        * namespace (String): The namespace for the component
+        * labels (Dict): The labels attached to the component. All ODA Components (and their children) should have a oda.tmforum.org/componentName label
+        * name (String): The name of the component
+        * patch (Dict): The kopf patch that is applied to the component after the handler
 
     Returns:
-        API Custom object (Dict)
+        No return value. The status fields are set on the patch.
 
-    :meta private:
+    :meta public:
+    """
+    logw = LogWrapper(
+        handler_name="reconcileComponent", function_name="reconcileComponent"
+    )
+    logw.set(
+        component_name=quick_get_comp_name(body),
+        resource_name=quick_get_comp_name(body),
+    )
+    logw.debugInfo("reconcileComponent handler called", body)
+
+    # del unused-arguments for linting
+    del meta, labels, kwargs
+
+    if not status:
+        status = {}
+    handler = "reconcileComponent"
+    writes = {}  # status field -> list of coroutines returning the status entries
+    deletes = []  # coroutines deleting children that are no longer in the spec
+
+    # ExposedAPIs - patch the ones that still exist, create the new ones, delete the removed ones
+    for statusField, segment in EXPOSEDAPI_SEGMENTS.items():
+        diff = exposedapi_diff.diff_exposed_apis(
+            name,
+            safe_get([], status, statusField),
+            safe_get([], spec, segment, "exposedAPIs"),
+        )
+        writes[statusField] = [
+            patchAPIResource(logw, newAPI, namespace, name, handler)
+            for newAPI in diff.patch
+        ] + [
+            createAPIResource(logw, newAPI, namespace, name, handler)
+            for newAPI in diff.create
+        ]
+        for oldName in diff.delete:
+            deletes.append(
+                deleteExposedAPI(logw, oldName, name, status, namespace, handler)
+            )
+
+    # DependentAPIs - existing ones are kept as they are, see coreDependentAPIs
+    oldDependentAPIs = safe_get([], status, "coreDependentAPIs")
+    newDependentAPIs = safe_get([], spec, "coreFunction", "dependentAPIs")
+    newDependentAPINames = set(f"{name}-{dapi['name']}" for dapi in newDependentAPIs)
+    oldDependentAPINames = set()
+    keptDependentAPIs = []
+    for oldDependentAPI in oldDependentAPIs:
+        oldDependentAPINames.add(oldDependentAPI["name"])
+        if oldDependentAPI["name"] in newDependentAPINames:
+            keptDependentAPIs.append(oldDependentAPI)
+        else:
+            deletes.append(
+                deleteDependentAPI(
+                    logw, oldDependentAPI["name"], name, status, namespace, handler
+                )
+            )
+    writes["coreDependentAPIs"] = [
+        createDependentAPIResource(
+            logw, dapi, namespace, name, f"{name}-{dapi['name']}", handler
+        )
+        for dapi in newDependentAPIs
+        if f"{name}-{dapi['name']}" not in oldDependentAPINames
+    ]
+
+    # SecretsManagement - at most one per component
+    sman_name = f"sman_{name}"
+    oldSecretsManagement = safe_get({}, status, "securitySecretsManagement")
+    newSecretsManagement = safe_get({}, spec, "securityFunction", "secretsManagement")
+    secretsManagementStatus = {}
+    if oldSecretsManagement != {} and newSecretsManagement == {}:
+        deletes.append(
+            deleteSecretsManagement(logw, sman_name, name, status, namespace, handler)
+        )
+    elif oldSecretsManagement == {} and newSecretsManagement != {}:
+        writes["securitySecretsManagement"] = [
+            createSecretsManagementResource(
+                logw, newSecretsManagement, namespace, name, handler
+            )
+        ]
+    elif newSecretsManagement != {}:
+        secretsManagementStatus = newSecretsManagement
+
+    # Published and Subscribed notifications - created if they do not exist yet
+    writes["publishedEvents"] = [
+        createPublishedNotificationResource(logw, event, namespace, name, handler)
+        for event in safe_get([], spec, "eventNotification", "publishedEvents")
+    ]
+    writes["subscribedEvents"] = [
+        createSubscribedNotificationResource(logw, event, namespace, name, handler)
+        for event in safe_get([], spec, "eventNotification", "subscribedEvents")
+    ]
+
+    # fan out all the child writes, the order of the results matches the order of the spec
+    statusFields = list(writes.keys())
+    childWrites = [coro for field in statusFields for coro in writes[field]]
+    countOfChildWrites = len(childWrites) + len(deletes)
+    try:
+        results = await child_executor.get_executor().gather(childWrites + deletes)
+    except kopf.TemporaryError as e:
+        raise e  # allow the operator to retry
+    except Exception as e:
+        logw.error(f"Unhandled exception {e}: {traceback.format_exc()}")
+        raise kopf.TemporaryError(e)  # allow the operator to retry
+
+    newStatus = {}
+    index = 0
+    for field in statusFields:
+        newStatus[field] = results[index : index + len(writes[field])]
+        index = index + len(writes[field])
+    newStatus["coreDependentAPIs"] = keptDependentAPIs + newStatus["coreDependentAPIs"]
+    if "securitySecretsManagement" in newStatus:
+        newStatus["securitySecretsManagement"] = newStatus["securitySecretsManagement"][
+            0
+        ]
+    else:
+        newStatus["securitySecretsManagement"] = secretsManagementStatus
+
+    # the whole result lands in a single status patch
+    for field, value in newStatus.items():
+        patch.status[field] = value
+
+    # to compare the API writes per Component change with the separate handlers
+    operator_metrics.count_writes(handler, countOfChildWrites, status=1)
+    logw.info(f"Reconciled {countOfChildWrites} children with 1 status patch")
+
+
+def constructAPIResourcePayload(inExposedAPI):
+    """Helper function to create payloads for API Custom objects.
+
+    Args:
+        * inExposedAPI (Dict): The API spec
+
+    Returns:
+        API Custom object (Dict)
+
+    :meta private:
     """
     APIResource = {
         "apiVersion": GROUP + "/" + VERSION,
@@ -1149,7 +1612,7 @@ async def patchAPIResource(logw: LogWrapper, inExposedAPI, namespace, name, inHa
 
     :meta private:
     """
-    logw.debug(f"patchAPIResource {inExposedAPI} ")
+    logw.debug("patchAPIResource", inExposedAPI)
 
     APIResource = constructAPIResourcePayload(inExposedAPI)
 
@@ -1157,36 +1620,43 @@ async def patchAPIResource(logw: LogWrapper, inExposedAPI, namespace, name, inHa
     returnAPIObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
-        # only patch if the API resource spec has changed
-
-        # get current api resource and compare it to APIResource
-        apiObj = custom_objects_api.get_namespaced_custom_object(
-            group=GROUP,
-            version=VERSION,
-            namespace=namespace,
-            plural=EXPOSEDAPIS_PLURAL,
-            name=APIResource["metadata"]["name"],
-        )
-
-        if not (APIResource["spec"] == apiObj["spec"]):
-            # log the difference
-            logw.debug(f"Comparing old API {APIResource['spec']}")
-            logw.debug(f"Comparing new API {apiObj['spec']}")
-
-            apiObj = custom_objects_api.patch_namespaced_custom_object(
-                group=GROUP,
-                version=VERSION,
-                namespace=namespace,
-                plural=EXPOSEDAPIS_PLURAL,
-                name=APIResource["metadata"]["name"],
-                body=APIResource,
+        if SERVER_SIDE_APPLY:
+            # a single idempotent request, the API server does not write if nothing has changed
+            apiObj = await applyCustomObject(
+                EXPOSEDAPIS_PLURAL, VERSION, namespace, APIResource
             )
-            apiReadyStatus = apiObj["status"]["implementation"]["ready"]
             logw.debugInfo(
-                f"API Resource patched {APIResource["metadata"]["name"]}", apiObj
+                f"API Resource applied {APIResource["metadata"]["name"]}", apiObj
+            )
+        else:
+            custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+            # only patch if the API resource spec has changed
+
+            # get current api resource and compare it to APIResource
+            apiObj = await getCustomObject(
+                EXPOSEDAPIS_PLURAL, namespace, APIResource["metadata"]["name"]
             )
 
+            if not (APIResource["spec"] == apiObj["spec"]):
+                # log the difference
+                logw.debug("Comparing old API", APIResource["spec"])
+                logw.debug("Comparing new API", apiObj["spec"])
+
+                apiObj = await k8s_client.call(
+                    custom_objects_api.patch_namespaced_custom_object,
+                    group=GROUP,
+                    version=VERSION,
+                    namespace=namespace,
+                    plural=EXPOSEDAPIS_PLURAL,
+                    name=APIResource["metadata"]["name"],
+                    body=APIResource,
+                )
+                cacheWrite(EXPOSEDAPIS_PLURAL, apiObj)
+                apiReadyStatus = apiObj["status"]["implementation"]["ready"]
+                logw.debugInfo(
+                    f"API Resource patched {APIResource["metadata"]["name"]}", apiObj
+                )
+
         if "status" in apiObj.keys() and "apiStatus" in apiObj["status"].keys():
             returnAPIObject = apiObj["status"]["apiStatus"]
             returnAPIObject["uid"] = apiObj["metadata"]["uid"]
@@ -1200,7 +1670,7 @@ async def patchAPIResource(logw: LogWrapper, inExposedAPI, namespace, name, inHa
             }
 
     except ApiException as e:
-        logw.error(f"API Exception patching {APIResource}")
+        logw.error("API Exception patching", APIResource)
 
         raise kopf.TemporaryError("Exception patching API custom resource.")
     return returnAPIObject
@@ -1221,7 +1691,7 @@ async def createAPIResource(logw: LogWrapper, inExposedAPI, namespace, name, inH
 
     :meta private:
     """
-    logw.debug(f"createAPIResource {inExposedAPI} ")
+    logw.debug("createAPIResource", inExposedAPI)
 
     APIResource = constructAPIResourcePayload(inExposedAPI)
 
@@ -1229,16 +1699,26 @@ async def createAPIResource(logw: LogWrapper, inExposedAPI, namespace, name, inH
     returnAPIObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
-        logw.info(f"Creating ExposedAPI Custom Object {APIResource}")
-
-        apiObj = custom_objects_api.create_namespaced_custom_object(
-            group=GROUP,
-            version=VERSION,
-            namespace=namespace,
-            plural=EXPOSEDAPIS_PLURAL,
-            body=APIResource,
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+        logw.debugInfo(
+            f"Creating ExposedAPI Custom Object {APIResource['metadata']['name']}",
+            APIResource,
         )
+
+        if SERVER_SIDE_APPLY:
+            apiObj = await applyCustomObject(
+                EXPOSEDAPIS_PLURAL, VERSION, namespace, APIResource
+            )
+        else:
+            apiObj = await k8s_client.call(
+                custom_objects_api.create_namespaced_custom_object,
+                group=GROUP,
+                version=VERSION,
+                namespace=namespace,
+                plural=EXPOSEDAPIS_PLURAL,
+                body=APIResource,
+            )
+            cacheWrite(EXPOSEDAPIS_PLURAL, apiObj)
         logw.debugInfo(
             f"API Resource created {APIResource["metadata"]["name"]}", apiObj
         )
@@ -1249,7 +1729,7 @@ async def createAPIResource(logw: LogWrapper, inExposedAPI, namespace, name, inH
         }
 
     except ApiException as e:
-        logw.warning(f"API Exception creating {APIResource}")
+        logw.warning("API Exception creating", APIResource)
         logw.warning(f"Exception {e}")
 
         raise kopf.TemporaryError("Exception creating API custom resource.")
@@ -1273,7 +1753,7 @@ async def createDependentAPIResource(
 
     :meta private:
     """
-    logw.debug(f"createDependentAPIResource {inDependentAPI} ")
+    logw.debug("createDependentAPIResource", inDependentAPI)
 
     DependentAPIResource = constructDependentAPIResourcePayload(inDependentAPI, cr_name)
 
@@ -1281,16 +1761,30 @@ async def createDependentAPIResource(
     returnDependentAPIObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
-        logw.info(f"Creating DependentAPI Custom Object {DependentAPIResource}")
-
-        dependentAPIObj = custom_objects_api.create_namespaced_custom_object(
-            group=GROUP,
-            version=DEPENDENTAPI_VERSION,
-            namespace=namespace,
-            plural=DEPENDENTAPI_PLURAL,
-            body=DependentAPIResource,
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+        logw.debugInfo(
+            f"Creating DependentAPI Custom Object {DependentAPIResource['metadata']['name']}",
+            DependentAPIResource,
         )
+
+        if SERVER_SIDE_APPLY:
+            # creates or updates in one request, there is no conflict to handle
+            dependentAPIObj = await applyCustomObject(
+                DEPENDENTAPI_PLURAL,
+                DEPENDENTAPI_VERSION,
+                namespace,
+                DependentAPIResource,
+            )
+        else:
+            dependentAPIObj = await k8s_client.call(
+                custom_objects_api.create_namespaced_custom_object,
+                group=GROUP,
+                version=DEPENDENTAPI_VERSION,
+                namespace=namespace,
+                plural=DEPENDENTAPI_PLURAL,
+                body=DependentAPIResource,
+            )
+            cacheWrite(DEPENDENTAPI_PLURAL, dependentAPIObj)
         logw.debugInfo(
             f"DependentAPI Resource created {DependentAPIResource["metadata"]["name"]}",
             dependentAPIObj,
@@ -1298,7 +1792,7 @@ async def createDependentAPIResource(
 
     except ApiException as e:
         if e.status != HTTP_CONFLICT:
-            logw.warning(f"DependentAPI Exception creating {DependentAPIResource}")
+            logw.warning("DependentAPI Exception creating", DependentAPIResource)
             logw.warning(f"DependentAPI Exception creating {e}")
 
             raise kopf.TemporaryError(
@@ -1306,9 +1800,13 @@ async def createDependentAPIResource(
             )
         else:
             # Conflict = try updating existing cr
-            logw.info(f"DependentAPI already exists {DependentAPIResource}")
+            logw.debugInfo(
+                f"DependentAPI already exists {DependentAPIResource['metadata']['name']}",
+                DependentAPIResource,
+            )
             try:
-                dependentAPIObj = custom_objects_api.patch_namespaced_custom_object(
+                dependentAPIObj = await k8s_client.call(
+                    custom_objects_api.patch_namespaced_custom_object,
                     group=GROUP,
                     version=DEPENDENTAPI_VERSION,
                     namespace=namespace,
@@ -1316,13 +1814,14 @@ async def createDependentAPIResource(
                     name=cr_name,
                     body=DependentAPIResource,
                 )
+                cacheWrite(DEPENDENTAPI_PLURAL, dependentAPIObj)
                 logw.debugInfo(
                     f"DependentAPI Resource updated {DependentAPIResource["metadata"]["name"]}",
                     dependentAPIObj,
                 )
 
             except ApiException as e:
-                logw.warning(f"DependentAPI Exception updating {DependentAPIResource}")
+                logw.warning("DependentAPI Exception updating", DependentAPIResource)
                 logw.warning(f"DependentAPI Exception updating {e}")
                 raise kopf.TemporaryError(
                     "Exception creating DependentAPI custom resource."
@@ -1353,7 +1852,7 @@ async def createSecretsManagementResource(
 
     :meta private:
     """
-    logw.debug(f"createSecretsManagementResource {inSecretsManagement} ")
+    logw.debug("createSecretsManagementResource", inSecretsManagement)
 
     SecretsManagementResource = constructSecretsManagementResourcePayload(
         inSecretsManagement
@@ -1363,18 +1862,29 @@ async def createSecretsManagementResource(
     returnSecretsManagementObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
-        logw.info(
-            f"Creating SecretsManagement Custom Object {SecretsManagementResource}"
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+        logw.debugInfo(
+            f"Creating SecretsManagement Custom Object {SecretsManagementResource['metadata']['name']}",
+            SecretsManagementResource,
         )
 
-        secretsManagementObj = custom_objects_api.create_namespaced_custom_object(
-            group=GROUP,
-            version=SECRETSMANAGEMENT_VERSION,
-            namespace=namespace,
-            plural=SECRETSMANAGEMENT_PLURAL,
-            body=SecretsManagementResource,
-        )
+        if SERVER_SIDE_APPLY:
+            secretsManagementObj = await applyCustomObject(
+                SECRETSMANAGEMENT_PLURAL,
+                SECRETSMANAGEMENT_VERSION,
+                namespace,
+                SecretsManagementResource,
+            )
+        else:
+            secretsManagementObj = await k8s_client.call(
+                custom_objects_api.create_namespaced_custom_object,
+                group=GROUP,
+                version=SECRETSMANAGEMENT_VERSION,
+                namespace=namespace,
+                plural=SECRETSMANAGEMENT_PLURAL,
+                body=SecretsManagementResource,
+            )
+            cacheWrite(SECRETSMANAGEMENT_PLURAL, secretsManagementObj)
         logw.debugInfo(
             f"SecretsManagement Resource created {SecretsManagementResource["metadata"]["name"]}",
             secretsManagementObj,
@@ -1387,9 +1897,7 @@ async def createSecretsManagementResource(
         }
 
     except ApiException as e:
-        logw.warning(
-            f"SecretsManagement Exception creating {SecretsManagementResource}"
-        )
+        logw.warning("SecretsManagement Exception creating", SecretsManagementResource)
         logw.warning(f"SecretsManagement Exception creating {e}")
 
         raise kopf.TemporaryError(
@@ -1412,7 +1920,7 @@ async def createIdentityConfigResource(logw: LogWrapper, inIdentityConfig, names
 
     :meta private:
     """
-    logw.debug(f"createIdentityConfigResource {inIdentityConfig} ")
+    logw.debug("createIdentityConfigResource", inIdentityConfig)
 
     IdentityConfigResource = constructIdentityConfigResourcePayload(inIdentityConfig)
 
@@ -1420,16 +1928,29 @@ async def createIdentityConfigResource(logw: LogWrapper, inIdentityConfig, names
     returnIdentityConfigObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
-        logw.info(f"Creating IdentityConfig Custom Object {IdentityConfigResource}")
-
-        identityConfigObj = custom_objects_api.create_namespaced_custom_object(
-            group=GROUP,
-            version=IDENTITYCONFIG_VERSION,
-            namespace=namespace,
-            plural=IDENTITYCONFIG_PLURAL,
-            body=IdentityConfigResource,
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+        logw.debugInfo(
+            f"Creating IdentityConfig Custom Object {IdentityConfigResource['metadata']['name']}",
+            IdentityConfigResource,
         )
+
+        if SERVER_SIDE_APPLY:
+            identityConfigObj = await applyCustomObject(
+                IDENTITYCONFIG_PLURAL,
+                IDENTITYCONFIG_VERSION,
+                namespace,
+                IdentityConfigResource,
+            )
+        else:
+            identityConfigObj = await k8s_client.call(
+                custom_objects_api.create_namespaced_custom_object,
+                group=GROUP,
+                version=IDENTITYCONFIG_VERSION,
+                namespace=namespace,
+                plural=IDENTITYCONFIG_PLURAL,
+                body=IdentityConfigResource,
+            )
+            cacheWrite(IDENTITYCONFIG_PLURAL, identityConfigObj)
         logw.debugInfo(
             f"IdentityConfig Resource created {IdentityConfigResource["metadata"]["name"]}",
             identityConfigObj,
@@ -1442,7 +1963,7 @@ async def createIdentityConfigResource(logw: LogWrapper, inIdentityConfig, names
         }
 
     except ApiException as e:
-        logw.warning(f"IdentityConfig Exception creating {IdentityConfigResource}")
+        logw.warning("IdentityConfig Exception creating", IdentityConfigResource)
         logw.warning(f"IdentityConfig Exception creating {e}")
 
         raise kopf.TemporaryError("Exception creating IdentityConfig custom resource.")
@@ -1458,124 +1979,166 @@ async def createIdentityConfigResource(logw: LogWrapper, inIdentityConfig, names
 # clusterrole, clusterrolebinding - a component developer should have no need for creating a clusterrole, clusterrolebinding they should be using role, rolebinding
 
 
-@kopf.on.resume("", "v1", "services", retries=5)
-@kopf.on.create("", "v1", "services", retries=5)
+def adoption_handler(group, version, plural):
+    """Registers an adopt handler with kopf, unless the resources are adopted by label-selected watches.
+
+    kopf watches every resource kind it has a handler for, the registration is skipped so that kopf does not watch the kind.
+    """
+
+    def decorator(fn):
+        if ADOPTION_WATCH != ADOPTION_WATCH_SELECTOR:
+            fn = kopf.on.create(group, version, plural, retries=5)(fn)
+            fn = kopf.on.resume(
+                group, version, plural, retries=5, when=adoption_resume_enabled
+            )(fn)
+        return fn
+
+    return decorator
+
+
+# number of adoption patches sent to the API server
+adoption_stats = {"patches": 0}
+
+# resourceType -> kubernetes API class and method to patch the resource when adopting it
+ADOPTABLE_RESOURCES = {
+    "service": (kubernetes.client.CoreV1Api, "patch_namespaced_service"),
+    "persistentvolumeclaim": (
+        kubernetes.client.CoreV1Api,
+        "patch_namespaced_persistent_volume_claim",
+    ),
+    "deployment": (kubernetes.client.AppsV1Api, "patch_namespaced_deployment"),
+    "configmap": (kubernetes.client.CoreV1Api, "patch_namespaced_config_map"),
+    "secret": (kubernetes.client.CoreV1Api, "patch_namespaced_secret"),
+    "job": (kubernetes.client.BatchV1Api, "patch_namespaced_job"),
+    "cronjob": (kubernetes.client.BatchV1Api, "patch_namespaced_cron_job"),
+    "statefulset": (kubernetes.client.AppsV1Api, "patch_namespaced_stateful_set"),
+    "role": (kubernetes.client.RbacAuthorizationV1Api, "patch_namespaced_role"),
+    "rolebinding": (
+        kubernetes.client.RbacAuthorizationV1Api,
+        "patch_namespaced_role_binding",
+    ),
+    "serviceaccount": (
+        kubernetes.client.CoreV1Api,
+        "patch_namespaced_service_account",
+    ),
+}
+
+
+@adoption_handler("", "v1", "services")
 async def adopt_service(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "service"
     )
 
 
-@kopf.on.resume("apps", "v1", "deployments", retries=5)
-@kopf.on.create("apps", "v1", "deployments", retries=5)
+@adoption_handler("apps", "v1", "deployments")
 async def adopt_deployment(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "deployment"
     )
 
 
-@kopf.on.resume("", "v1", "persistentvolumeclaims", retries=5)
-@kopf.on.create("", "v1", "persistentvolumeclaims", retries=5)
+@adoption_handler("", "v1", "persistentvolumeclaims")
 async def adopt_persistentvolumeclaim(
     meta, spec, body, namespace, labels, name, **kwargs
 ):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "persistentvolumeclaim"
     )
 
 
-@kopf.on.resume("batch", "v1", "jobs", retries=5)
-@kopf.on.create("batch", "v1", "jobs", retries=5)
+@adoption_handler("batch", "v1", "jobs")
 async def adopt_job(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(meta, spec, body, namespace, labels, name, "job")
+    return await adopt_kubernetesResource(
+        meta, spec, body, namespace, labels, name, "job"
+    )
 
 
-@kopf.on.resume("batch", "v1", "cronjobs", retries=5)
-@kopf.on.create("batch", "v1", "cronjobs", retries=5)
+@adoption_handler("batch", "v1", "cronjobs")
 async def adopt_cronjob(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "cronjob"
     )
 
 
-@kopf.on.resume("apps", "v1", "statefulsets", retries=5)
-@kopf.on.create("apps", "v1", "statefulsets", retries=5)
+@adoption_handler("apps", "v1", "statefulsets")
 async def adopt_statefulset(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "statefulset"
     )
 
 
-@kopf.on.resume("", "v1", "configmap", retries=5)
-@kopf.on.create("", "v1", "configmap", retries=5)
+@adoption_handler("", "v1", "configmap")
 async def adopt_configmap(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "configmap"
     )
 
 
-@kopf.on.resume("", "v1", "secret", retries=5)
-@kopf.on.create("", "v1", "secret", retries=5)
+@adoption_handler("", "v1", "secret")
 async def adopt_secret(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(meta, spec, body, namespace, labels, name, "secret")
+    return await adopt_kubernetesResource(
+        meta, spec, body, namespace, labels, name, "secret"
+    )
 
 
-@kopf.on.resume("", "v1", "serviceaccount", retries=5)
-@kopf.on.create("", "v1", "serviceaccount", retries=5)
+@adoption_handler("", "v1", "serviceaccount")
 async def adopt_serviceaccount(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "serviceaccount"
     )
 
 
-@kopf.on.resume("rbac.authorization.k8s.io", "v1", "role", retries=5)
-@kopf.on.create("rbac.authorization.k8s.io", "v1", "role", retries=5)
+@adoption_handler("rbac.authorization.k8s.io", "v1", "role")
 async def adopt_role(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(meta, spec, body, namespace, labels, name, "role")
+    return await adopt_kubernetesResource(
+        meta, spec, body, namespace, labels, name, "role"
+    )
 
 
-@kopf.on.resume("rbac.authorization.k8s.io", "v1", "rolebinding", retries=5)
-@kopf.on.create("rbac.authorization.k8s.io", "v1", "rolebinding", retries=5)
+@adoption_handler("rbac.authorization.k8s.io", "v1", "rolebinding")
 async def adopt_rolebinding(meta, spec, body, namespace, labels, name, **kwargs):
     # del unused-arguments for linting
     del kwargs
 
-    return adopt_kubernetesResource(
+    return await adopt_kubernetesResource(
         meta, spec, body, namespace, labels, name, "rolebinding"
     )
 
 
-def adopt_kubernetesResource(meta, spec, body, namespace, labels, name, resourceType):
+async def adopt_kubernetesResource(
+    meta, spec, body, namespace, labels, name, resourceType, parent_component=None
+):
     """Helper function for adopting any kubernetes resource
 
     If the resource has an oda.tmforum.org/componentName label, it makes the resource a child of the named component.
@@ -1590,6 +2153,7 @@ def adopt_kubernetesResource(meta, spec, body, namespace, labels, name, resource
         * labels (Dict): The labels attached to the resource. All ODA Components (and their children) should have a oda.tmforum.org/componentName label
         * name (String): The name of the resource
         * resourceType (String): The type of resource (e.g. service, deployment, persistentvolumeclaim, job, cronjob, statefulset, configmap, secret, serviceaccount, role, rolebinding)
+        * parent_component (Dict): The parent component if the caller has already read it
 
     Returns:
         No return value.
@@ -1617,11 +2181,10 @@ def adopt_kubernetesResource(meta, spec, body, namespace, labels, name, resource
         logw.debugInfo("adopt_" + resourceType + " handler called", body)
 
         try:
-            parent_component = (
-                kubernetes.client.CustomObjectsApi().get_namespaced_custom_object(
-                    GROUP, VERSION, namespace, COMPONENTS_PLURAL, component_name
+            if parent_component is None:
+                parent_component = await getCustomObject(
+                    COMPONENTS_PLURAL, namespace, component_name
                 )
-            )
         except ApiException as e:
             # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
             if e.status == HTTP_NOT_FOUND:
@@ -1633,91 +2196,26 @@ def adopt_kubernetesResource(meta, spec, body, namespace, labels, name, resource
                     f"Exception when calling custom_objects_api.get_namespaced_custom_object {e}"
                 )
 
-        newBody = dict(body)  # cast the service body to a dict
-        kopf.append_owner_reference(newBody, owner=parent_component)
-        try:
-            if resourceType == "service":
-                api_response = kubernetes.client.CoreV1Api().patch_namespaced_service(
-                    newBody["metadata"]["name"],
-                    newBody["metadata"]["namespace"],
-                    newBody,
-                )
-            elif resourceType == "persistentvolumeclaim":
-                api_response = kubernetes.client.CoreV1Api().patch_namespaced_persistent_volume_claim(
-                    newBody["metadata"]["name"],
-                    newBody["metadata"]["namespace"],
-                    newBody,
-                )
-            elif resourceType == "deployment":
-                api_response = (
-                    kubernetes.client.AppsV1Api().patch_namespaced_deployment(
-                        newBody["metadata"]["name"],
-                        newBody["metadata"]["namespace"],
-                        newBody,
-                    )
-                )
-            elif resourceType == "configmap":
-                api_response = (
-                    kubernetes.client.CoreV1Api().patch_namespaced_config_map(
-                        newBody["metadata"]["name"],
-                        newBody["metadata"]["namespace"],
-                        newBody,
-                    )
-                )
-            elif resourceType == "secret":
-                api_response = kubernetes.client.CoreV1Api().patch_namespaced_secret(
-                    newBody["metadata"]["name"],
-                    newBody["metadata"]["namespace"],
-                    newBody,
-                )
-            elif resourceType == "job":
-                api_response = kubernetes.client.BatchV1Api().patch_namespaced_job(
-                    newBody["metadata"]["name"],
-                    newBody["metadata"]["namespace"],
-                    newBody,
-                )
-            elif resourceType == "cronjob":
-                api_response = kubernetes.client.BatchV1Api().patch_namespaced_cron_job(
-                    newBody["metadata"]["name"],
-                    newBody["metadata"]["namespace"],
-                    newBody,
-                )
-            elif resourceType == "statefulset":
-                api_response = (
-                    kubernetes.client.AppsV1Api().patch_namespaced_stateful_set(
-                        newBody["metadata"]["name"],
-                        newBody["metadata"]["namespace"],
-                        newBody,
-                    )
-                )
-            elif resourceType == "role":
-                api_response = (
-                    kubernetes.client.RbacAuthorizationV1Api().patch_namespaced_role(
-                        newBody["metadata"]["name"],
-                        newBody["metadata"]["namespace"],
-                        newBody,
-                    )
-                )
-            elif resourceType == "rolebinding":
-                api_response = kubernetes.client.RbacAuthorizationV1Api().patch_namespaced_role_binding(
-                    newBody["metadata"]["name"],
-                    newBody["metadata"]["namespace"],
-                    newBody,
-                )
-            elif resourceType == "serviceaccount":
-                api_response = (
-                    kubernetes.client.CoreV1Api().patch_namespaced_service_account(
-                        newBody["metadata"]["name"],
-                        newBody["metadata"]["namespace"],
-                        newBody,
-                    )
-                )
-            else:
-                logw.error(f"Unsupported resource type {resourceType}")
+        if resourceType not in ADOPTABLE_RESOURCES:
+            logw.error(f"Unsupported resource type {resourceType}")
 
-                raise kopf.PermanentError(
-                    "Error adopting - unsupported resource type " + resourceType
-                )
+            raise kopf.PermanentError(
+                "Error adopting - unsupported resource type " + resourceType
+            )
+        api_class, patch_method = ADOPTABLE_RESOURCES[resourceType]
+
+        # only send the owner reference - a strategic merge patch merges it into the
+        # existing ownerReferences by uid, the rest of the resource is not re-uploaded
+        patchBody = {"metadata": {}}
+        kopf.append_owner_reference(patchBody, owner=parent_component)
+        try:
+            api_response = await k8s_client.call(
+                getattr(k8s_client.api(api_class), patch_method),
+                name,
+                namespace,
+                patchBody,
+            )
+            adoption_stats["patches"] = adoption_stats["patches"] + 1
             logw.debugInfo(
                 f"Adding component as parent of {resourceType}", api_response
             )
@@ -1729,9 +2227,261 @@ def adopt_kubernetesResource(meta, spec, body, namespace, labels, name, resource
                 logw.warning(f"Exception when calling patch {resourceType}")
 
 
+def hasComponentOwner(item):
+    owners = item["metadata"].get("ownerReferences") or []
+    return any(owner["kind"] == "Component" for owner in owners)
+
+
+async def adoptListedResource(resourceType, item, parent_component=None):
+    """Helper function to adopt a resource from a LIST or WATCH (a raw resource body).
+
+    Args:
+        * resourceType (String): The type of resource, a key of ADOPTABLE_RESOURCES
+        * item (Dict): The raw resource body
+        * parent_component (Dict): The parent component if the caller has already read it
+
+    Returns:
+        Boolean: False if the adoption has failed and should be retried.
+
+    :meta private:
+    """
+    metadata = item["metadata"]
+    try:
+        await adopt_kubernetesResource(
+            metadata,
+            item.get("spec"),
+            item,
+            metadata["namespace"],
+            metadata["labels"],
+            metadata["name"],
+            resourceType,
+            parent_component,
+        )
+        return True
+    except Exception as e:
+        logger.debug(f"Adoption of %s %s failed: %s", resourceType, metadata["name"], e)
+        return False
+
+
+async def listAdoptionCandidates(resourceType, namespace):
+    """Helper function to list the resources of one kind that carry the component name label but have no Component owner.
+
+    Args:
+        * resourceType (String): The type of resource, a key of ADOPTABLE_RESOURCES
+        * namespace (String): The namespace to list
+
+    Returns:
+        Tuple of the number of labelled resources and the list of raw resource bodies that need to be adopted.
+
+    :meta private:
+    """
+    api_class, patch_method = ADOPTABLE_RESOURCES[resourceType]
+    list_method = getattr(
+        k8s_client.api(api_class), patch_method.replace("patch_", "list_")
+    )
+    # raw JSON instead of the client models, only the metadata is used
+    response = await k8s_client.call(
+        list_method,
+        namespace,
+        label_selector=componentname_label,
+        _preload_content=False,
+    )
+    items = json.loads(response.data)["items"]
+    candidates = [item for item in items if not hasComponentOwner(item)]
+    return len(items), candidates
+
+
+async def sweepAdoption():
+    """Adopts all the existing labelled resources on startup.
+
+    Instead of one resume handler (a GET and a PATCH) per resource, the sweep makes one LIST of the Components and one
+    label-selected LIST per kind of resource, and only patches the resources that have no Component owner yet. The patches
+    run in parallel, at most ADOPTION_SWEEP_CONCURRENCY at a time. Resources that fail (e.g. their Component does not exist
+    yet) are retried in the next round. The duration of the sweep is logged. With SHARDS, only the resources of the shards
+    of this replica are adopted.
+
+    Returns:
+        Dict with the number of labelled resources listed, adopted and failed.
+
+    :meta private:
+    """
+    start = time.monotonic()
+    await k8s_client.call(k8s_client.load_config)
+    executor = child_executor.ChildExecutor(
+        concurrency=ADOPTION_SWEEP_CONCURRENCY, qps=child_executor.CHILD_QPS
+    )
+    stats = {"listed": 0, "adopted": 0, "failed": 0}
+    pending = None
+    for attempt in range(ADOPTION_SWEEP_RETRIES):
+        if attempt > 0:
+            await asyncio.sleep(ADOPTION_SWEEP_RETRY_DELAY)
+        try:
+            custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+            components = await k8s_client.call(
+                custom_objects_api.list_namespaced_custom_object,
+                GROUP,
+                VERSION,
+                component_namespace,
+                COMPONENTS_PLURAL,
+            )
+            parents = {
+                component["metadata"]["name"]: component
+                for component in components["items"]
+            }
+            if pending is None:
+                candidates = []
+                for resourceType in ADOPTABLE_RESOURCES:
+                    count, items = await listAdoptionCandidates(
+                        resourceType, component_namespace
+                    )
+                    stats["listed"] = stats["listed"] + count
+                    # the other replicas adopt the resources of their shards
+                    candidates.extend(
+                        (resourceType, item)
+                        for item in items
+                        if shards.owns(item, resourceType)
+                    )
+                pending = candidates
+        except ApiException as e:
+            logger.warning(f"Adoption sweep cannot list resources: %s", e)
+            continue
+
+        async def adopt(resourceType, item):
+            parent = parents.get(item["metadata"]["labels"][componentname_label])
+            if await adoptListedResource(resourceType, item, parent):
+                return None
+            return (resourceType, item)
+
+        results = await executor.gather(adopt(*entry) for entry in pending)
+        failed = [result for result in results if result is not None]
+        stats["adopted"] = stats["adopted"] + len(pending) - len(failed)
+        pending = failed
+        if not pending:
+            break
+
+    stats["failed"] = len(pending) if pending else 0
+    logger.info(
+        f"Adoption sweep finished in %.2fs: %s labelled resources listed, %s adopted, %s failed",
+        time.monotonic() - start,
+        stats["listed"],
+        stats["adopted"],
+        stats["failed"],
+    )
+    return stats
+
+
+# uids of the resources the adoption watches are adopting (including the retries)
+adoptions_in_progress = set()
+
+
+async def adoptWatchedResource(executor, resourceType, item):
+    uid = item["metadata"]["uid"]
+    if uid in adoptions_in_progress:  # e.g. listed again while still retrying
+        return
+    adoptions_in_progress.add(uid)
+    try:
+        # retry like the kopf handlers (retries=5), e.g. until the parent component has been created
+        for attempt in range(ADOPTION_SWEEP_RETRIES):
+            if attempt > 0:
+                await asyncio.sleep(ADOPTION_SWEEP_RETRY_DELAY)
+            if not shards.owns(item, resourceType):  # e.g. the shard has been dropped
+                return
+            if await executor.run(adoptListedResource(resourceType, item)):
+                return
+        logger.warning(
+            f"Adoption of %s %s failed", resourceType, item["metadata"].get("name")
+        )
+    finally:
+        adoptions_in_progress.discard(uid)
+
+
+async def watchAdoption():
+    """Adopts the labelled resources from label-selected watches instead of kopf handlers.
+
+    One ``LabelWatch`` per adoptable kind sends the component name label as label selector, so the API server only streams
+    the labelled resources, in the component namespace (or all namespaces with ADOPTION_WATCH_ALL_NAMESPACES). Resources that
+    are listed on startup or added later, and have no Component owner, are adopted. With SHARDS, only the resources of the
+    shards of this replica are adopted.
+
+    Unlike the kopf handlers, the watches do not write any annotations to the resources, the only writes are the adoption
+    patches. The resourceVersion reached by each watch is kept in memory, with ADOPTION_STATE=configmap it is also saved in
+    one ConfigMap every ADOPTION_CHECKPOINT_INTERVAL seconds, and the watches continue from there after a restart.
+
+    :meta private:
+    """
+    await k8s_client.call(k8s_client.load_config)
+    checkpoint = None
+    resourceVersions = {}
+    if ADOPTION_STATE == ADOPTION_STATE_CONFIGMAP:
+        checkpoint = watch_checkpoint.ConfigMapCheckpoint(
+            ADOPTION_CHECKPOINT_NAME, component_namespace, ADOPTION_CHECKPOINT_INTERVAL
+        )
+        try:
+            resourceVersions = await checkpoint.load()
+            logger.info(f"Adoption watches continue from %s", resourceVersions)
+        except ApiException as e:
+            logger.warning(f"Cannot read the adoption checkpoint, listing all: %s", e)
+    executor = child_executor.ChildExecutor(
+        concurrency=ADOPTION_SWEEP_CONCURRENCY, qps=child_executor.CHILD_QPS
+    )
+
+    async def onEvent(resourceType, event):
+        if (
+            event["type"] in ("LISTED", "ADDED")
+            and not hasComponentOwner(event["object"])
+            and shards.owns(event["object"], resourceType)
+        ):
+            startBackgroundTask(
+                adoptWatchedResource(executor, resourceType, event["object"])
+            )
+
+    watches = []
+    for resourceType, (api_class, patch_method) in ADOPTABLE_RESOURCES.items():
+        # a watch holds its connection for minutes, so it does not use the shared connection pool
+        api = api_class(kubernetes.client.ApiClient())
+        if ADOPTION_WATCH_ALL_NAMESPACES:
+            namespace = None
+            list_method = (
+                patch_method.replace("patch_namespaced_", "list_")
+                + "_for_all_namespaces"
+            )
+        else:
+            namespace = component_namespace
+            list_method = patch_method.replace("patch_", "list_")
+        watches.append(
+            label_watch.LabelWatch(
+                resourceType,
+                getattr(api, list_method),
+                functools.partial(onEvent, resourceType),
+                componentname_label,
+                namespace,
+                resourceVersions.get(resourceType),
+            )
+        )
+
+    def snapshot():
+        logger.info(
+            f"Adoption API writes: %s adoption patches, %s checkpoint writes",
+            adoption_stats["patches"],
+            checkpoint.writes,
+        )
+        return {watch.kind: watch.handled_resource_version for watch in watches}
+
+    if checkpoint:
+        startBackgroundTask(checkpoint.run(snapshot))
+    await asyncio.gather(*[watch.run() for watch in watches])
+
+
+summarizer = status_summary.StatusSummarizer(IDENTITY_PROVIDER_NOT_SET)
+# the status field kopf writes the result of the summary handler to (handler id "summary/status")
+SUMMARY_STATUS_FIELD = "summary/status"
+deploymentTimings = deployment_timings.DeploymentTimings()
+summary_stats = {"written": 0, "skipped": 0}
+
+
 # When Component status changes, update status summary
 @kopf.on.field(GROUP, VERSION, COMPONENTS_PLURAL, field="status", retries=5)
-async def summary(meta, spec, status, body, namespace, labels, name, **kwargs):
+async def summary(meta, spec, status, body, namespace, labels, name, patch, **kwargs):
 
     logw = LogWrapper(handler_name="summary", function_name="summary")
     logw.set(
@@ -1741,103 +2491,56 @@ async def summary(meta, spec, status, body, namespace, labels, name, **kwargs):
     logw.debugInfo("summary handler called", body)
 
     # del unused-arguments for linting
-    del meta, spec, namespace, labels, name, kwargs
-
-    coreAPIsummary = ""
-    coreDependentAPIsummary = ""
-    securitySecretsManagementSummary = ""
-    managementAPIsummary = ""
-    securityAPIsummary = ""
-    developerUIsummary = ""
-    countOfCompleteAPIs = 0
-    countOfDesiredAPIs = 0
-    countOfDesiredDependentAPIs = 0
-    countOfCompleteDependentAPIs = 0
-    countOfDesiredSecretsManagements = 0
-    countOfCompleteSecretsManagements = 0
-    if "coreAPIs" in status.keys():
-        countOfDesiredAPIs = countOfDesiredAPIs + len(status["coreAPIs"])
-        for api in status["coreAPIs"]:
-            if "url" in api.keys():
-                coreAPIsummary = coreAPIsummary + api["url"] + " "
-                if "developerUI" in api.keys():
-                    developerUIsummary = developerUIsummary + api["developerUI"] + " "
-                if "ready" in api.keys():
-                    if api["ready"] == True:
-                        countOfCompleteAPIs = countOfCompleteAPIs + 1
-    if "coreDependentAPIs" in status.keys():
-        countOfDesiredDependentAPIs = countOfDesiredDependentAPIs + len(
-            status["coreDependentAPIs"]
-        )
-        for depapi in status["coreDependentAPIs"]:
-            if "url" in depapi.keys():
-                coreDependentAPIsummary = coreDependentAPIsummary + depapi["url"] + " "
-                if "ready" in depapi.keys():
-                    if depapi["ready"] == True:
-                        countOfCompleteDependentAPIs = countOfCompleteDependentAPIs + 1
-    if "securitySecretsManagement" in status.keys():
-        sman = status["securitySecretsManagement"]
-        if sman != {}:
-            countOfDesiredSecretsManagements = 1
-            securitySecretsManagementSummary = "initializing"
-            if "ready" in sman:
-                if sman["ready"] == True:
-                    countOfCompleteSecretsManagements = (
-                        countOfCompleteSecretsManagements + 1
-                    )
-                    securitySecretsManagementSummary = "ready"
-    if "managementAPIs" in status.keys():
-        countOfDesiredAPIs = countOfDesiredAPIs + len(status["managementAPIs"])
-        for api in status["managementAPIs"]:
-            if "url" in api.keys():
-                managementAPIsummary = managementAPIsummary + api["url"] + " "
-                if "developerUI" in api.keys():
-                    developerUIsummary = developerUIsummary + api["developerUI"] + " "
-                if "ready" in api.keys():
-                    if api["ready"] == True:
-                        countOfCompleteAPIs = countOfCompleteAPIs + 1
-    if "securityAPIs" in status.keys():
-        countOfDesiredAPIs = countOfDesiredAPIs + len(status["securityAPIs"])
-        for api in status["securityAPIs"]:
-            if "url" in api.keys():
-                securityAPIsummary = securityAPIsummary + api["url"] + " "
-                if "developerUI" in api.keys():
-                    developerUIsummary = developerUIsummary + api["developerUI"] + " "
-                if "ready" in api.keys():
-                    if api["ready"] == True:
-                        countOfCompleteAPIs = countOfCompleteAPIs + 1
-
-    status_summary = {}
-    status_summary["coreAPIsummary"] = coreAPIsummary
-    status_summary["coreDependentAPIsummary"] = coreDependentAPIsummary
-    status_summary["securitySecretsManagementSummary"] = (
-        securitySecretsManagementSummary
+    del labels, kwargs
+
+    partyRoleAPI = deployment_stages.party_role_api(spec)
+    status_summary, countOfCompleteAPIs, countOfDesiredAPIs = summarizer.summarize(
+        (namespace, name),
+        status,
+        previous=status.get(SUMMARY_STATUS_FIELD),
+        party_role_api=(
+            exposedapi_diff.child_name(name, partyRoleAPI) if partyRoleAPI else None
+        ),
+        created=meta.get("creationTimestamp"),
     )
-    status_summary["managementAPIsummary"] = managementAPIsummary
-    status_summary["securityAPIsummary"] = securityAPIsummary
-    status_summary["developerUIsummary"] = developerUIsummary
     logw.info(
         f"Creating summary - completed API count{str(countOfCompleteAPIs)}/{str(countOfDesiredAPIs)}"
     )
-
-    status_summary["deployment_status"] = "In-Progress-CompCon"
-    if countOfCompleteAPIs == countOfDesiredAPIs:
-        status_summary["deployment_status"] = "In-Progress-IDConfOp"
-        if ("identityConfig" in status.keys()) and (
-            status["identityConfig"]["identityProvider"] != IDENTITY_PROVIDER_NOT_SET
-        ):
-            status_summary["deployment_status"] = "In-Progress-SecretMan"
-            if countOfCompleteSecretsManagements == countOfDesiredSecretsManagements:
-                status_summary["deployment_status"] = "In-Progress-DepApi"
-                if countOfCompleteDependentAPIs == countOfDesiredDependentAPIs:
-                    status_summary["deployment_status"] = "Complete"
     logw.info(
         f"Creating summary - deployment status {status_summary['deployment_status']}"
     )
 
+    if "creationTimestamp" in meta:
+        timings = deploymentTimings.record(
+            (namespace, name),
+            meta["creationTimestamp"],
+            status.get("timings"),
+            status_summary["deployment_status"],
+            deployment_timings.ready_children(status, IDENTITY_PROVIDER_NOT_SET),
+        )
+        if timings != status.get("timings"):
+            patch.status["timings"] = timings
+
+    # kopf writes the result to the status field named after the handler id, which triggers this
+    # handler again: skip the write when nothing has changed
+    if status.get(SUMMARY_STATUS_FIELD) == status_summary:
+        summary_stats["skipped"] += 1
+        logw.debug("Summary unchanged, not written")
+        return None
+    summary_stats["written"] += 1
     return status_summary
 
 
+# kopf does not call delete handlers for Components deleted without a finalizer, the watch
+# event is the only notice of the delete
+@kopf.on.event(GROUP, VERSION, COMPONENTS_PLURAL, id="componentDeleted")
+def componentDeleted(event, namespace, name, **_):
+    """kopf event handler that removes the cached state of deleted Components."""
+    if event["type"] == "DELETED":
+        summarizer.forget((namespace, name))
+        deploymentTimings.forget((namespace, name))
+
+
 @logwrapper
 async def createPublishedNotificationResource(
     logw: LogWrapper, definition, namespace, name, inHandler
@@ -1855,7 +2558,9 @@ async def createPublishedNotificationResource(
 
     :meta private:
     """
-    logw.info(f"createPublishedNotificationResource {definition} ")
+    logw.debugInfo(
+        f"createPublishedNotificationResource {definition.get('name')}", definition
+    )
 
     PublishedNotificationResource = {
         "apiVersion": GROUP + "/" + VERSION,
@@ -1879,48 +2584,74 @@ async def createPublishedNotificationResource(
     returnPublishedNotificationObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
-        try:
-            custom_objects_api.get_namespaced_custom_object(
-                group=GROUP,
-                version=VERSION,
-                namespace=namespace,
-                plural=PUBLISHEDNOTIFICATIONS_PLURAL,
-                name=newName,
+        if SERVER_SIDE_APPLY:
+            apiObj = await applyCustomObject(
+                PUBLISHEDNOTIFICATIONS_PLURAL,
+                VERSION,
+                namespace,
+                PublishedNotificationResource,
             )
-        except ApiException as e:
-            if e.status == HTTP_NOT_FOUND:
-                apiObj = custom_objects_api.create_namespaced_custom_object(
-                    group=GROUP,
-                    version=VERSION,
-                    namespace=namespace,
-                    plural=PUBLISHEDNOTIFICATIONS_PLURAL,
-                    body=PublishedNotificationResource,
+            if "status" not in apiObj:  # the resource has just been created
+                await applyCustomObject(
+                    PUBLISHEDNOTIFICATIONS_PLURAL,
+                    VERSION,
+                    namespace,
+                    {
+                        "apiVersion": PublishedNotificationResource["apiVersion"],
+                        "kind": PublishedNotificationResource["kind"],
+                        "metadata": {"name": newName},
+                        "status": {"uid": "", "status": "initializing", "error": ""},
+                    },
+                    subresource="status",
                 )
+            logw.info(f"PublishedNotification applied {name}")
+            returnPublishedNotificationObject = {
+                "name": PublishedNotificationResource["metadata"]["name"],
+                "uid": apiObj["metadata"]["uid"],
+            }
+        else:
+            try:
+                await getCustomObject(PUBLISHEDNOTIFICATIONS_PLURAL, namespace, newName)
+            except ApiException as e:
+                if e.status == HTTP_NOT_FOUND:
+                    apiObj = await k8s_client.call(
+                        custom_objects_api.create_namespaced_custom_object,
+                        group=GROUP,
+                        version=VERSION,
+                        namespace=namespace,
+                        plural=PUBLISHEDNOTIFICATIONS_PLURAL,
+                        body=PublishedNotificationResource,
+                    )
+                    cacheWrite(PUBLISHEDNOTIFICATIONS_PLURAL, apiObj)
 
-                logw.info(f"PublishedNotification created {name}")
-                custom_objects_api.patch_namespaced_custom_object_status(
-                    group=GROUP,
-                    version=VERSION,
-                    namespace=namespace,
-                    plural=PUBLISHEDNOTIFICATIONS_PLURAL,
-                    name=newName,
-                    field_manager="componentOperator",
-                    body={"status": {"uid": "", "status": "initializing", "error": ""}},
-                )
+                    logw.info(f"PublishedNotification created {name}")
+                    apiObj = await k8s_client.call(
+                        custom_objects_api.patch_namespaced_custom_object_status,
+                        group=GROUP,
+                        version=VERSION,
+                        namespace=namespace,
+                        plural=PUBLISHEDNOTIFICATIONS_PLURAL,
+                        name=newName,
+                        field_manager="componentOperator",
+                        body={
+                            "status": {"uid": "", "status": "initializing", "error": ""}
+                        },
+                    )
+                    cacheWrite(PUBLISHEDNOTIFICATIONS_PLURAL, apiObj)
 
-                returnPublishedNotificationObject = {
-                    "name": PublishedNotificationResource["metadata"]["name"],
-                    "uid": apiObj["metadata"]["uid"],
-                }
-            else:
-                logw.warning(
-                    f"Exception creating PublishedNotification custom resource - will retry"
-                )
-                raise kopf.TemporaryError(
-                    "Exception creating PublishedNotification custom resource."
-                )
+                    returnPublishedNotificationObject = {
+                        "name": PublishedNotificationResource["metadata"]["name"],
+                        "uid": apiObj["metadata"]["uid"],
+                    }
+                else:
+                    logw.warning(
+                        f"Exception creating PublishedNotification custom resource - will retry"
+                    )
+                    raise kopf.TemporaryError(
+                        "Exception creating PublishedNotification custom resource."
+                    )
     except ApiException as e:
         logw.error(f"PublishedNotification Exception creating {e}")
 
@@ -1947,7 +2678,9 @@ async def createSubscribedNotificationResource(
 
     :meta private:
     """
-    logw.info(f"createSubscribedNotificationResource {definition} ")
+    logw.debugInfo(
+        f"createSubscribedNotificationResource {definition.get('name')}", definition
+    )
 
     SubscribedNotificationResource = {
         "apiVersion": GROUP + "/" + VERSION,
@@ -1970,47 +2703,75 @@ async def createSubscribedNotificationResource(
     returnSubscribedNotificationObject = {}
 
     try:
-        custom_objects_api = kubernetes.client.CustomObjectsApi()
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
 
-        try:
-            custom_objects_api.get_namespaced_custom_object(
-                group=GROUP,
-                version=VERSION,
-                namespace=namespace,
-                plural=SUBSCRIBEDNOTIFICATIONS_PLURAL,
-                name=newName,
+        if SERVER_SIDE_APPLY:
+            apiObj = await applyCustomObject(
+                SUBSCRIBEDNOTIFICATIONS_PLURAL,
+                VERSION,
+                namespace,
+                SubscribedNotificationResource,
             )
-        except ApiException as e:
-            if e.status == HTTP_NOT_FOUND:
-                apiObj = custom_objects_api.create_namespaced_custom_object(
-                    group=GROUP,
-                    version=VERSION,
-                    namespace=namespace,
-                    plural=SUBSCRIBEDNOTIFICATIONS_PLURAL,
-                    body=SubscribedNotificationResource,
-                )
-
-                custom_objects_api.patch_namespaced_custom_object_status(
-                    group=GROUP,
-                    version=VERSION,
-                    namespace=namespace,
-                    plural=SUBSCRIBEDNOTIFICATIONS_PLURAL,
-                    name=newName,
-                    field_manager="componentOperator",
-                    body={"status": {"uid": "", "status": "initializing", "error": ""}},
+            if "status" not in apiObj:  # the resource has just been created
+                await applyCustomObject(
+                    SUBSCRIBEDNOTIFICATIONS_PLURAL,
+                    VERSION,
+                    namespace,
+                    {
+                        "apiVersion": SubscribedNotificationResource["apiVersion"],
+                        "kind": SubscribedNotificationResource["kind"],
+                        "metadata": {"name": newName},
+                        "status": {"uid": "", "status": "initializing", "error": ""},
+                    },
+                    subresource="status",
                 )
-                logw.info(
-                    f"SubscribedNotification created {SubscribedNotificationResource["metadata"]["name"]}"
+            logw.info(f"SubscribedNotification applied {name}")
+            returnSubscribedNotificationObject = {
+                "name": SubscribedNotificationResource["metadata"]["name"],
+                "uid": apiObj["metadata"]["uid"],
+            }
+        else:
+            try:
+                await getCustomObject(
+                    SUBSCRIBEDNOTIFICATIONS_PLURAL, namespace, newName
                 )
+            except ApiException as e:
+                if e.status == HTTP_NOT_FOUND:
+                    apiObj = await k8s_client.call(
+                        custom_objects_api.create_namespaced_custom_object,
+                        group=GROUP,
+                        version=VERSION,
+                        namespace=namespace,
+                        plural=SUBSCRIBEDNOTIFICATIONS_PLURAL,
+                        body=SubscribedNotificationResource,
+                    )
+                    cacheWrite(SUBSCRIBEDNOTIFICATIONS_PLURAL, apiObj)
 
-                returnSubscribedNotificationObject = {
-                    "name": SubscribedNotificationResource["metadata"]["name"],
-                    "uid": apiObj["metadata"]["uid"],
-                }
-            else:
-                raise kopf.TemporaryError(
-                    "Exception creating SubscribedNotification custom resource."
-                )
+                    apiObj = await k8s_client.call(
+                        custom_objects_api.patch_namespaced_custom_object_status,
+                        group=GROUP,
+                        version=VERSION,
+                        namespace=namespace,
+                        plural=SUBSCRIBEDNOTIFICATIONS_PLURAL,
+                        name=newName,
+                        field_manager="componentOperator",
+                        body={
+                            "status": {"uid": "", "status": "initializing", "error": ""}
+                        },
+                    )
+                    cacheWrite(SUBSCRIBEDNOTIFICATIONS_PLURAL, apiObj)
+                    logw.info(
+                        f"SubscribedNotification created {SubscribedNotificationResource["metadata"]["name"]}"
+                    )
+
+                    returnSubscribedNotificationObject = {
+                        "name": SubscribedNotificationResource["metadata"]["name"],
+                        "uid": apiObj["metadata"]["uid"],
+                    }
+                else:
+                    raise kopf.TemporaryError(
+                        "Exception creating SubscribedNotification custom resource."
+                    )
     except ApiException as e:
         logw.error(f"SubscribedNotification Exception creating {e}")
 
@@ -0,0 +1,83 @@
+"""Deployment stages of a Component as a dependency graph.
+
+A Component is deployed in stages: its ExposedAPIs become ready, the IdentityConfig is created and
+configured by the identity config operator, the SecretsManagement and the DependentAPIs become
+ready. Each stage only depends on the inputs it actually needs, so independent stages progress at
+the same time. The IdentityConfig only needs the partyRoleManagement API of the component (the
+identity config operator registers a listener on it), not all the other ExposedAPIs.
+
+The ``deployment_status`` keeps its meaning: it names the first stage, in the order below, that is
+not ready yet, and is ``Complete`` when all the stages are ready.
+
+For each stage the time it could start (its inputs were ready) and the time it became ready are
+recorded in ``stages`` of the summary, so the time to complete of a Component can be broken down.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timezone
+
+COMPLETE = "Complete"
+# input of the identityConfig stage, ready when there is no partyRoleManagement API
+PARTY_ROLE_API = "partyRoleAPI"
+
+Stage = namedtuple("Stage", ["name", "deployment_status", "requires"])
+
+# in the order of the deployment_status they report
+STAGES = [
+    Stage("exposedAPIs", "In-Progress-CompCon", []),
+    Stage("identityConfig", "In-Progress-IDConfOp", [PARTY_ROLE_API]),
+    Stage("secretsManagement", "In-Progress-SecretMan", []),
+    Stage("dependentAPIs", "In-Progress-DepApi", []),
+]
+
+
+def timestamp(now=None):
+    """Returns a UTC timestamp in the format of the Kubernetes metadata timestamps."""
+    now = now or datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def party_role_api(spec):
+    """Returns the partyRoleManagement API from the securityFunction of a Component spec, or None."""
+    for api in spec.get("securityFunction", {}).get("exposedAPIs", []):
+        if "partyrole" in api["name"]:
+            return api
+    return None
+
+
+def evaluate(ready, previous=None, created=None, now=None):
+    """Evaluates the stages of a Component.
+
+    Args:
+        * ready (Dict): Stage and input names to whether they are ready, e.g. ``{"exposedAPIs": True}``
+        * previous (Dict): The ``stages`` of the previous summary, to keep the recorded timestamps
+        * created (String): The creationTimestamp of the Component, the start of the stages without inputs
+        * now (String): The timestamp of the evaluation
+
+    Returns:
+        Tuple: The deployment_status and the ``stages`` with a ``started`` and ``ready`` timestamp for each stage
+        that has started or become ready.
+    """
+    previous = previous or {}
+    now = now or timestamp()
+    deployment_status = COMPLETE
+    stages = {}
+    for stage in STAGES:
+        recorded = previous.get(stage.name, {})
+        entry = {}
+        if "started" in recorded:
+            entry["started"] = recorded["started"]
+        elif all(ready.get(name, False) for name in stage.requires):
+            entry["started"] = (created if not stage.requires else None) or now
+        if ready.get(stage.name, False):
+            entry["ready"] = recorded.get("ready", now)
+        elif deployment_status == COMPLETE:
+            deployment_status = stage.deployment_status
+        if entry:
+            stages[stage.name] = entry
+    return deployment_status, stages
+
+
+def started(stages, name):
+    """Returns whether a stage has started, i.e. its inputs have been ready."""
+    return "started" in (stages or {}).get(name, {})
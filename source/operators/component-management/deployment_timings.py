@@ -0,0 +1,145 @@
+"""Deployment latency of Components.
+
+Records how long after its creation a Component reached each ``deployment_status`` and each of
+its children (ExposedAPIs, DependentAPIs, SecretsManagement, IdentityConfig) became ready. The
+timings are kept in ``status.timings`` of the Component (seconds since its creationTimestamp) and
+observed once in the Prometheus histograms of this module, so the slow stage or operator can be
+found in production.
+
+The creationTimestamp only has a resolution of one second and the wall clock can jump, so the
+elapsed time of a Component is anchored once per process and then measured with the monotonic
+clock.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from prometheus_client import Histogram
+
+BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+deployment_status_seconds = Histogram(
+    "oda_component_deployment_status_seconds",
+    "Seconds from the creation of a Component until it reaches a deployment_status",
+    ["deployment_status"],
+    buckets=BUCKETS,
+)
+child_ready_seconds = Histogram(
+    "oda_component_child_ready_seconds",
+    "Seconds from the creation of a Component until a child is ready",
+    ["kind"],
+    buckets=BUCKETS,
+)
+
+# timings with an entry per child, the others are a single value
+CHILD_LISTS = ["exposedAPIs", "dependentAPIs"]
+
+
+def parse_timestamp(value):
+    """Returns the POSIX time of a Kubernetes metadata timestamp."""
+    return (
+        datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+        .replace(tzinfo=timezone.utc)
+        .timestamp()
+    )
+
+
+def ready_children(status, identity_provider_not_set):
+    """Returns the ready children of a Component, in the form expected by ``DeploymentTimings.record``.
+
+    Args:
+        * status (Dict): The status of the Component
+        * identity_provider_not_set (String): The identityProvider of an identityConfig that is not configured yet
+    """
+    identityProvider = status.get("identityConfig", {}).get("identityProvider")
+    return {
+        "exposedAPIs": [
+            entry["name"]
+            for field in ["coreAPIs", "managementAPIs", "securityAPIs"]
+            for entry in status.get(field, [])
+            if entry.get("ready") == True and "name" in entry
+        ],
+        "dependentAPIs": [
+            entry["name"]
+            for entry in status.get("coreDependentAPIs", [])
+            if entry.get("ready") == True and "name" in entry
+        ],
+        "secretsManagement": status.get("securitySecretsManagement", {}).get("ready")
+        == True,
+        "identityConfig": identityProvider not in (None, identity_provider_not_set),
+    }
+
+
+class DeploymentTimings:
+    """Measures and records the deployment timings of Components."""
+
+    def __init__(self):
+        self._anchors = {}  # component key -> (monotonic time, seconds since creation)
+
+    def elapsed(self, key, created):
+        """Returns the seconds since the creation of a Component.
+
+        Args:
+            * key (Hashable): Identifies the Component, e.g. (namespace, name)
+            * created (String): The creationTimestamp of the Component
+        """
+        anchor = self._anchors.get(key)
+        if anchor is None:
+            anchor = (
+                time.monotonic(),
+                max(0.0, time.time() - parse_timestamp(created)),
+            )
+            self._anchors[key] = anchor
+        return anchor[1] + time.monotonic() - anchor[0]
+
+    def forget(self, key):
+        """Removes the creation anchor of a Component, e.g. when it is deleted.
+
+        Args:
+            * key (Hashable): Identifies the Component, e.g. (namespace, name)
+        """
+        self._anchors.pop(key, None)
+
+    def record(self, key, created, timings, deployment_status, ready):
+        """Adds the deployment_status and the children that are reached for the first time to the timings.
+
+        Args:
+            * key (Hashable): Identifies the Component, e.g. (namespace, name)
+            * created (String): The creationTimestamp of the Component
+            * timings (Dict): The current ``status.timings`` of the Component
+            * deployment_status (String): The current deployment_status
+            * ready (Dict): ``exposedAPIs`` and ``dependentAPIs`` to the names of the ready children,
+              ``secretsManagement`` and ``identityConfig`` to whether they are ready
+
+        Returns:
+            Dict: The new ``status.timings``, equal to ``timings`` if nothing was reached for the first time.
+        """
+        timings = {
+            field: dict(value) if isinstance(value, dict) else value
+            for field, value in (timings or {}).items()
+        }
+        seconds = None
+
+        def now():
+            nonlocal seconds
+            if seconds is None:
+                seconds = round(self.elapsed(key, created), 1)
+            return seconds
+
+        deployment = timings.setdefault("deployment", {})
+        if deployment_status not in deployment:
+            deployment[deployment_status] = now()
+            deployment_status_seconds.labels(deployment_status).observe(now())
+        for kind, value in ready.items():
+            if kind in CHILD_LISTS:
+                children = timings.setdefault(kind, {})
+                for name in value:
+                    if name not in children:
+                        children[name] = now()
+                        child_ready_seconds.labels(kind).observe(now())
+                if not children:
+                    del timings[kind]
+            elif value and kind not in timings:
+                timings[kind] = now()
+                child_ready_seconds.labels(kind).observe(now())
+        return timings
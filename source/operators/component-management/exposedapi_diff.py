@@ -0,0 +1,59 @@
+"""Diff of the exposed APIs of a Component against its ExposedAPI children.
+
+The ``coreAPIs``, ``managementAPIs`` and ``securityAPIs`` handlers compare the
+``exposedAPIs`` in the spec (desired state) with the ExposedAPI children recorded in the
+status (actual state). ExposedAPI children are named ``<component name>-<api name>``
+in lower case. Both sides are indexed by that child name, so the diff is linear in the
+number of APIs instead of comparing every old API with every new API.
+"""
+
+from collections import namedtuple
+
+ExposedAPIDiff = namedtuple("ExposedAPIDiff", ["create", "patch", "delete"])
+ExposedAPIDiff.__doc__ = """Result of ``diff_exposed_apis``.
+
+* create (List): exposedAPIs from the spec without an ExposedAPI child
+* patch (List): exposedAPIs from the spec with an existing ExposedAPI child
+* delete (List): names of the ExposedAPI children that are no longer in the spec
+"""
+
+
+def child_name(component_name, api):
+    """Returns the name of the ExposedAPI child for an exposedAPI of the component spec.
+
+    Args:
+        * component_name (String): The name of the component
+        * api (Dict): The exposedAPI entry from the component spec
+
+    Returns:
+        String: The ExposedAPI resource name
+    """
+    return component_name + "-" + api["name"].lower()
+
+
+def diff_exposed_apis(component_name, old_apis, new_apis):
+    """Computes the ExposedAPI children to create, patch and delete.
+
+    Args:
+        * component_name (String): The name of the component
+        * old_apis (List): The ExposedAPI entries of the component status (each with the child ``name``)
+        * new_apis (List): The exposedAPIs of the component spec
+
+    Returns:
+        ExposedAPIDiff: The create and patch lists keep the order of the spec, the delete list the order of the status.
+        An API that appears more than once in the spec is only processed once.
+    """
+    old_names = dict.fromkeys(api["name"] for api in old_apis)
+    desired = {}
+    for api in new_apis:
+        desired.setdefault(child_name(component_name, api), api)
+
+    create = []
+    patch = []
+    for name, api in desired.items():
+        if name in old_names:
+            patch.append(api)
+        else:
+            create.append(api)
+    delete = [name for name in old_names if name not in desired]
+    return ExposedAPIDiff(create, patch, delete)
@@ -0,0 +1,182 @@
+"""List and watch of one kind of Kubernetes resource, filtered by a label selector on the API server.
+
+kopf watches every object of a kind and only applies label filters in Python, so an operator that
+only cares about labelled objects still receives, parses and drops the events of all the others
+(e.g. every Secret rotation in the namespace). A ``LabelWatch`` sends the label selector with the
+LIST and WATCH requests, so the API server only streams the matching objects. Events are parsed
+as plain JSON, without building the kubernetes client models.
+
+The blocking watch stream runs on its own thread, the events are handed to a coroutine on the
+event loop.
+
+Usage::
+
+    watch = label_watch.LabelWatch(
+        "services", core_api.list_namespaced_service, on_event,
+        label_selector="oda.tmforum.org/componentName", namespace="components",
+    )
+    await watch.run()
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger("LabelWatch")
+
+HTTP_GONE = 410
+# internal event after the objects of a list, not passed to on_event
+SYNCED = "SYNCED"
+
+# server side timeout of one WATCH request, the watch is then continued from the last resourceVersion
+WATCH_TIMEOUT = 10 * 60
+# delay before listing again after an error
+ERROR_DELAY = 5
+
+
+class LabelWatch:
+    """List and watch of the objects of one kind that match a label selector.
+
+    Args:
+        * kind (String): Name of the kind, for logging
+        * list_func (Callable): The kubernetes client list method, e.g. ``CoreV1Api.list_namespaced_service``
+        * on_event (Coroutine function): Called with each event dict (``type``, ``object``). The objects of the
+          initial list are passed with type ``LISTED``.
+        * label_selector (String): The label selector sent to the API server
+        * namespace (String): The namespace for a ``list_namespaced_*`` method, None for a ``list_*_for_all_namespaces`` method
+        * resource_version (String): Continue watching from this resourceVersion (e.g. from a checkpoint) instead of
+          listing first. If it has expired, the objects are listed.
+    """
+
+    def __init__(
+        self,
+        kind,
+        list_func,
+        on_event,
+        label_selector,
+        namespace=None,
+        resource_version=None,
+    ):
+        self.kind = kind
+        self.list_func = list_func
+        self.on_event = on_event
+        self.label_selector = label_selector
+        self.namespace = namespace
+        self.resource_version = resource_version
+        # resourceVersion up to which all the events have been passed to on_event
+        self.handled_resource_version = resource_version
+        self.stats = {"lists": 0, "watches": 0, "events": 0}
+        self._stopped = threading.Event()
+
+    def _call(self, **kwargs):
+        args = [] if self.namespace is None else [self.namespace]
+        return self.list_func(
+            *args, label_selector=self.label_selector, _preload_content=False, **kwargs
+        )
+
+    def _list(self, emit):
+        response = self._call()
+        result = json.loads(response.data)
+        self.stats["lists"] += 1
+        for item in result["items"]:
+            emit({"type": "LISTED", "object": item})
+        self.resource_version = result["metadata"]["resourceVersion"]
+        emit({"type": SYNCED, "resourceVersion": self.resource_version})
+
+    def _watch(self, emit):
+        """Runs one WATCH request until it times out. Returns False if the resourceVersion has expired."""
+        response = self._call(
+            watch=True,
+            resource_version=self.resource_version,
+            timeout_seconds=WATCH_TIMEOUT,
+            _request_timeout=WATCH_TIMEOUT + 30,
+        )
+        self.stats["watches"] += 1
+        try:
+            buffer = b""
+            for chunk in response.stream(amt=None, decode_content=False):
+                buffer = buffer + chunk
+                lines = buffer.split(b"\n")
+                buffer = lines.pop()
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event["type"] == "ERROR":
+                        if event["object"].get("code") == HTTP_GONE:
+                            return False
+                        raise ApiException(
+                            status=event["object"].get("code"),
+                            reason=event["object"].get("message"),
+                        )
+                    self.resource_version = event["object"]["metadata"][
+                        "resourceVersion"
+                    ]
+                    self.stats["events"] += 1
+                    emit(event)
+                if self._stopped.is_set():
+                    return True
+        finally:
+            response.release_conn()
+        return True
+
+    def _run_blocking(self, emit):
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list(emit)
+                if not self._watch(emit):
+                    logger.info(f"Watch of %s expired, listing again", self.kind)
+                    self.resource_version = None
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                logger.warning(f"Watch of %s failed, listing again: %s", self.kind, e)
+                self.resource_version = None
+                time.sleep(ERROR_DELAY)
+
+    async def run(self):
+        """Lists and watches until ``stop()`` is called, passing every event to ``on_event``."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def emit(event):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        thread = threading.Thread(
+            target=self._run_blocking,
+            args=(emit,),
+            name=f"watch-{self.kind}",
+            daemon=True,
+        )
+        thread.start()
+        logger.info(
+            f"Watching %s with label selector %s in namespace %s",
+            self.kind,
+            self.label_selector,
+            self.namespace or "(all)",
+        )
+        try:
+            while not self._stopped.is_set():
+                event = await queue.get()
+                if event["type"] == SYNCED:
+                    self.handled_resource_version = event["resourceVersion"]
+                    continue
+                try:
+                    await self.on_event(event)
+                except Exception as e:
+                    logger.error(f"Handling %s event failed: %s", self.kind, e)
+                if event["type"] != "LISTED":
+                    self.handled_resource_version = event["object"]["metadata"][
+                        "resourceVersion"
+                    ]
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stops the watch after the current WATCH request."""
+        self._stopped.set()
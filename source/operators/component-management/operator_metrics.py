@@ -0,0 +1,185 @@
+"""Prometheus metrics of the ODA operators.
+
+Opt-in: set ``METRICS_PORT`` to serve the metrics, and call ``setup()`` from a kopf startup
+handler. It instruments every handler registered with kopf and the requests of the pooled
+kubernetes ApiClient (see k8s_client), and starts the HTTP endpoint. Without ``METRICS_PORT``
+nothing is instrumented.
+
+Usage::
+
+    @kopf.on.startup()
+    def startMetrics(**_):
+        operator_metrics.setup()
+
+Metrics:
+
+* ``oda_operator_handler_invocations_total`` (handler): handler invocations
+* ``oda_operator_handler_duration_seconds`` (handler): handler latency
+* ``oda_operator_handler_retries_total`` (handler): handler invocations that raised ``kopf.TemporaryError``
+* ``oda_operator_handlers_in_flight`` (handler): handler invocations in progress
+* ``oda_operator_kubernetes_requests_total`` (verb, resource, code): requests to the Kubernetes API server
+* ``oda_operator_child_writes_total`` (handler): child resource creates, patches and deletes of a reconcile
+* ``oda_operator_status_patches_total`` (handler): status patches of a reconcile
+
+The write counters are incremented with ``count_writes()`` by the handlers that reconcile the children of a
+resource in one pass, so that the API writes per change can be compared with the per-part handlers.
+
+The module is shared by all ODA operators; keep the copies in the operator folders identical.
+"""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import re
+import time
+
+import kopf
+import prometheus_client
+
+import k8s_client
+
+logger = logging.getLogger("OperatorMetrics")
+
+# serve the Prometheus metrics on this port, 0 disables the metrics
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+handler_invocations = prometheus_client.Counter(
+    "oda_operator_handler_invocations_total",
+    "Invocations of the kopf handlers",
+    ["handler"],
+)
+handler_duration = prometheus_client.Histogram(
+    "oda_operator_handler_duration_seconds",
+    "Duration of the kopf handler invocations",
+    ["handler"],
+)
+handler_retries = prometheus_client.Counter(
+    "oda_operator_handler_retries_total",
+    "kopf handler invocations that raised a TemporaryError and are retried",
+    ["handler"],
+)
+handlers_in_flight = prometheus_client.Gauge(
+    "oda_operator_handlers_in_flight",
+    "kopf handler invocations in progress",
+    ["handler"],
+)
+kubernetes_requests = prometheus_client.Counter(
+    "oda_operator_kubernetes_requests_total",
+    "Requests to the Kubernetes API server",
+    ["verb", "resource", "code"],
+)
+child_writes = prometheus_client.Counter(
+    "oda_operator_child_writes_total",
+    "Creates, patches and deletes of child resources issued by the reconciles of a kopf handler",
+    ["handler"],
+)
+status_patches = prometheus_client.Counter(
+    "oda_operator_status_patches_total",
+    "Status patches written by the reconciles of a kopf handler",
+    ["handler"],
+)
+
+# the kopf registries with handlers invoked for resources; the activities (startup, login, ...) are not instrumented
+REGISTRIES = ["_changing", "_watching", "_spawning", "_webhooks", "_indexing"]
+
+# /api/v1/namespaces/ns/services/name or /apis/group/version/namespaces/ns/plural/name/status
+_RESOURCE_PATH = re.compile(
+    r"^/(?:api/[^/]+|apis/[^/]+/[^/]+)(?:/namespaces/[^/]+)?/(?P<resource>[^/?]+)"
+)
+
+
+def resource_of(url):
+    """Returns the resource (plural) of a Kubernetes API URL, e.g. ``services``."""
+    path = re.sub(r"^[a-z]+://[^/]+", "", url)
+    match = _RESOURCE_PATH.match(path)
+    if match is None:
+        return "other"
+    return match.group("resource")
+
+
+def observe_request(method, url, status):
+    """k8s_client request listener that counts the requests by verb, resource and status code."""
+    kubernetes_requests.labels(
+        method, resource_of(url), str(status) if status else "error"
+    ).inc()
+
+
+def count_writes(handler, children, status=1):
+    """Counts the API writes of one reconcile of a handler.
+
+    Args:
+        * handler (String): The id of the kopf handler
+        * children (Integer): Number of child resource creates, patches and deletes
+        * status (Integer): Number of status patches
+    """
+    child_writes.labels(handler).inc(children)
+    status_patches.labels(handler).inc(status)
+
+
+@contextlib.contextmanager
+def observe_handler(handler):
+    handler_invocations.labels(handler).inc()
+    handlers_in_flight.labels(handler).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except kopf.TemporaryError:
+        handler_retries.labels(handler).inc()
+        raise
+    finally:
+        handlers_in_flight.labels(handler).dec()
+        handler_duration.labels(handler).observe(time.perf_counter() - start)
+
+
+def instrument_handler(fn, handler):
+    """Returns ``fn`` wrapped to record the metrics of the kopf handler ``handler``."""
+    if asyncio.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def instrumented(*args, **kwargs):
+            with observe_handler(handler):
+                return await fn(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(fn)
+        def instrumented(*args, **kwargs):
+            with observe_handler(handler):
+                return fn(*args, **kwargs)
+
+    return instrumented
+
+
+def instrument(registry=None):
+    """Instruments all the handlers of a kopf registry.
+
+    A function registered with several decorators (e.g. create, update and resume) is wrapped once, so kopf still
+    invokes it only once per cause.
+
+    Args:
+        * registry (kopf.OperatorRegistry): The registry, by default the kopf default registry
+    """
+    registry = registry or kopf.get_default_registry()
+    wrapped = {}
+    count = 0
+    for name in REGISTRIES:
+        for handler in getattr(registry, name).get_all_handlers():
+            key = (id(handler.fn), handler.id)
+            if key not in wrapped:
+                wrapped[key] = instrument_handler(handler.fn, handler.id)
+            # the kopf handlers are frozen dataclasses
+            object.__setattr__(handler, "fn", wrapped[key])
+            count += 1
+    logger.info(f"Instrumented %s kopf handlers", count)
+
+
+def setup(port=METRICS_PORT, registry=None):
+    """Instruments the handlers and the Kubernetes API requests and serves the metrics, if ``port`` is set."""
+    if not port:
+        return
+    instrument(registry)
+    k8s_client.add_request_listener(observe_request)
+    prometheus_client.start_http_server(port)
+    logger.info(f"Serving Prometheus metrics on port %s", port)
@@ -0,0 +1,129 @@
+"""In-memory cache of the resources watched by the component operator.
+
+The component operator reads a child resource (ExposedAPI, PublishedNotification, ...) before
+every write to decide whether it has to be created or patched, and reads the parent Component
+whenever a resource has to be adopted. The ``ResourceCache`` is kept current by the kopf watch
+events of those kinds (informer style), so these reads are served locally and the API server
+only sees the writes.
+
+The cache lags the API server by the watch latency, so a miss (e.g. for an object created a
+moment ago) has to be answered by the API server. The operator also stores the responses of its
+own writes (read your own writes), so that a read just after a patch does not return the spec
+from before the patch. An event or response older than the cached object, by resourceVersion,
+is ignored. A deleted object leaves a tombstone with its last resourceVersion, so that an older
+event still on its way cannot insert it again.
+"""
+
+import collections
+import copy
+import threading
+
+
+def _resource_version(body):
+    """Returns the resourceVersion of a resource as an integer, or None if it is not an integer.
+
+    The resourceVersion is opaque in the Kubernetes API, but it is an integer on etcd backed API servers.
+    """
+    try:
+        return int(body.get("metadata", {}).get("resourceVersion"))
+    except (TypeError, ValueError):
+        return None
+
+
+# tombstones kept at most, the oldest are forgotten first
+MAX_TOMBSTONES = 10000
+
+
+class ResourceCache:
+    """Store of watched resources, by kind, namespace and name.
+
+    Args:
+        * max_tombstones (Integer): Number of deleted resources whose resourceVersion is remembered
+    """
+
+    def __init__(self, max_tombstones=MAX_TOMBSTONES):
+        self._objects = {}  # (kind, namespace, name) -> body
+        self._tombstones = (
+            collections.OrderedDict()
+        )  # (kind, namespace, name) -> resourceVersion
+        self.max_tombstones = max_tombstones
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def _is_stale(self, key, body):
+        version = _resource_version(body)
+        if version is None:
+            return False
+        cached = self._objects.get(key)
+        if cached is None:
+            # not newer than the delete, e.g. a change before the delete whose event arrives late
+            deleted_version = self._tombstones.get(key)
+            return deleted_version is not None and version <= deleted_version
+        cached_version = _resource_version(cached)
+        return cached_version is not None and version < cached_version
+
+    def _bury(self, key, body):
+        version = _resource_version(body)
+        if version is None:
+            # a delete of the operator, the last known version is the cached one
+            version = _resource_version(self._objects.get(key) or {})
+        self._objects.pop(key, None)
+        if version is None:
+            return
+        self._tombstones.pop(key, None)
+        self._tombstones[key] = version
+        if len(self._tombstones) > self.max_tombstones:
+            self._tombstones.popitem(last=False)
+
+    def apply_event(self, kind, event):
+        """Applies a kopf watch event, or the response of a write of the operator, to the cache.
+
+        Args:
+            * kind (String): The plural of the resource, e.g. exposedapis
+            * event (Dict): The raw watch event with ``type`` and ``object``
+        """
+        body = event["object"]
+        metadata = body.get("metadata", {})
+        key = (kind, metadata.get("namespace"), metadata.get("name"))
+        with self._lock:
+            if self._is_stale(key, body):
+                # e.g. the watch event of a change older than the response of a write
+                self.stale += 1
+                return
+            if event.get("type") == "DELETED":
+                self._bury(key, body)
+                return
+            self._tombstones.pop(key, None)
+            self._objects[key] = body
+
+    def get(self, kind, namespace, name):
+        """Returns a copy of a cached resource.
+
+        Args:
+            * kind (String): The plural of the resource, e.g. exposedapis
+            * namespace (String): The namespace of the resource
+            * name (String): The name of the resource
+
+        Returns:
+            Dict: A deep copy of the resource, or None if it is not in the cache.
+        """
+        with self._lock:
+            body = self._objects.get((kind, namespace, name))
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(body)
+
+    def stats(self):
+        """Returns the number of cached resources and tombstones and the hit, miss and stale event counters."""
+        with self._lock:
+            return {
+                "objects": len(self._objects),
+                "tombstones": len(self._tombstones),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+            }
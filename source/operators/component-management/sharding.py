@@ -0,0 +1,405 @@
+"""Sharding of the Components across the replicas of the component operator.
+
+One operator process reconciles all the Components, kopf peering keeps the other replicas on
+standby. With ``SHARDS`` > 1 every replica is active and owns a subset of the shards: a Component
+belongs to shard ``sha256(key) % SHARDS``, where the key is its name (``SHARD_KEY=name``) or its
+namespace (``SHARD_KEY=namespace``). The children of a Component (ExposedAPIs, adopted resources,
+...) belong to the shard of the Component named by their component name label.
+
+The shards are coordinated with ``coordination.k8s.io`` Leases in ``SHARD_LEASE_NAMESPACE``:
+
+* each replica holds a member Lease ``<prefix>-member-<identity>``, the live members are the ones
+  renewed within ``SHARD_LEASE_DURATION``;
+* each shard has a Lease ``<prefix>-<shard>``. A replica renews the shards it holds, up to its fair
+  share ``ceil(SHARDS / members)``, releases the shards beyond it (when a replica joins) and takes
+  free or expired shards below it (when a replica leaves or a shard is released).
+
+kopf stores the state of handled objects on the objects themselves, so a replica must not even see
+the objects of the other shards: the watch-streams drop their events before kopf processes them.
+When the owned shards change, the watch-streams are paused and resumed, so that kopf lists the
+objects again and resumes the ones of the new shards.
+
+Usage::
+
+    shards = sharding.ShardOwnership(component_label=componentname_label)
+
+    @kopf.on.startup()
+    def configure(settings: kopf.OperatorSettings, **_):
+        shards.configure(settings)
+
+    @kopf.on.startup()
+    async def startSharding(**_):
+        await shards.start()
+"""
+
+import asyncio
+import datetime
+import hashlib
+import logging
+import math
+import os
+import socket
+
+import kubernetes.client
+from kubernetes.client.rest import ApiException
+
+import k8s_client
+
+logger = logging.getLogger("Sharding")
+
+KEY_NAME = "name"
+KEY_NAMESPACE = "namespace"
+
+# number of shards of the Components, 0 or 1 for a single active replica (kopf peering)
+SHARDS = int(os.getenv("SHARDS", "0"))
+# the Components are sharded by name or by namespace
+SHARD_KEY = os.getenv("SHARD_KEY", KEY_NAME).lower()
+# identity of the replica in the Leases, the pod name set by the downward API
+SHARD_IDENTITY = os.getenv("POD_NAME", socket.gethostname())
+SHARD_LEASE_NAMESPACE = os.getenv(
+    "SHARD_LEASE_NAMESPACE", os.getenv("POD_NAMESPACE", "canvas")
+)
+SHARD_LEASE_PREFIX = os.getenv("SHARD_LEASE_PREFIX", "component-operator-shard")
+# seconds after which a Lease that is not renewed has expired
+SHARD_LEASE_DURATION = int(os.getenv("SHARD_LEASE_DURATION", "15"))
+# seconds between two renewals of the Leases
+SHARD_RENEW_INTERVAL = float(os.getenv("SHARD_RENEW_INTERVAL", "5"))
+# seconds the watch-streams are paused to list the objects again after a change of the shards
+SHARD_RELIST_PAUSE = 1
+
+HTTP_NOT_FOUND = 404
+HTTP_CONFLICT = 409
+
+GROUP_LABEL = "oda.tmforum.org/shard-group"
+ROLE_LABEL = "oda.tmforum.org/shard-role"
+ROLE_MEMBER = "member"
+ROLE_SHARD = "shard"
+
+try:
+    from kopf._cogs.clients import watching
+except ImportError:  # another version of kopf, the watch-streams cannot be filtered
+    watching = None
+
+
+def shard_of(key, shards):
+    """Returns the shard of a key, the same in every replica (unlike ``hash()``)."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class ShardOwnership:
+    """The shards owned by this replica, kept with Leases.
+
+    Args:
+        * component_label (String): The label with the name of the Component of a child resource
+        * shards (Integer): Number of shards, 0 or 1 to disable the sharding
+        * key (String): ``name`` or ``namespace``
+        * identity (String): Identity of the replica
+        * namespace (String): Namespace of the Leases
+        * prefix (String): Prefix of the names of the Leases
+        * lease_duration (Integer): Seconds after which a Lease that is not renewed has expired
+        * renew_interval (Float): Seconds between two renewals
+        * component_plural (String): Plural of the Components, keyed by their own name
+    """
+
+    def __init__(
+        self,
+        component_label,
+        shards=SHARDS,
+        key=SHARD_KEY,
+        identity=SHARD_IDENTITY,
+        namespace=SHARD_LEASE_NAMESPACE,
+        prefix=SHARD_LEASE_PREFIX,
+        lease_duration=SHARD_LEASE_DURATION,
+        renew_interval=SHARD_RENEW_INTERVAL,
+        component_plural="components",
+    ):
+        self.component_label = component_label
+        self.shards = shards
+        self.key = key
+        self.identity = identity
+        self.namespace = namespace
+        self.prefix = prefix
+        self.lease_duration = lease_duration
+        self.renew_interval = renew_interval
+        self.component_plural = component_plural
+        self.owned = frozenset()
+        # when the owned shards were last confirmed, they are dropped one renewal before their Leases expire
+        self._renewed = None
+        self._toggle = None
+        self._toggle_lock = asyncio.Lock()
+        self._task = None
+
+    @property
+    def enabled(self):
+        return self.shards > 1
+
+    def key_of(self, body, plural):
+        """Returns the sharding key of an object (a raw body) of a resource plural."""
+        meta = body.get("metadata") or {}
+        if self.key == KEY_NAMESPACE:
+            return meta.get("namespace") or ""
+        if plural == self.component_plural:
+            return meta.get("name", "")
+        labels = meta.get("labels") or {}
+        if labels.get(self.component_label):
+            return labels[self.component_label]
+        for owner in meta.get("ownerReferences") or []:
+            if owner.get("kind") == "Component":
+                return owner.get("name", "")
+        return meta.get("name", "")
+
+    def owns(self, body, plural):
+        """Returns whether this replica handles an object (a raw body) of a resource plural."""
+        if not self.enabled:
+            return True
+        return shard_of(self.key_of(body, plural), self.shards) in self.owned
+
+    def configure(self, settings):
+        """Runs every replica without peering and filters the kopf watch-streams, if sharded."""
+        if not self.enabled:
+            return
+        if watching is None or not hasattr(watching, "infinite_watch"):
+            raise RuntimeError("This version of kopf does not support SHARDS")
+        settings.peering.standalone = True
+        if not getattr(watching.infinite_watch, "sharded", False):
+            watching.infinite_watch = self._filtered_watch(watching.infinite_watch)
+        logger.info(
+            "Sharding the Components by %s in %s shards as %s",
+            self.key,
+            self.shards,
+            self.identity,
+        )
+
+    def _filtered_watch(self, infinite_watch):
+        async def sharded_watch(*, resource, operator_paused=None, **kwargs):
+            if operator_paused is not None:
+                await self._attach(operator_paused)
+            async for raw_event in infinite_watch(
+                resource=resource, operator_paused=operator_paused, **kwargs
+            ):
+                if isinstance(raw_event, dict) and not self.owns(
+                    raw_event.get("object") or {}, resource.plural
+                ):
+                    continue
+                yield raw_event
+
+        sharded_watch.sharded = True
+        return sharded_watch
+
+    async def _attach(self, operator_paused):
+        async with self._toggle_lock:
+            if self._toggle is None:
+                self._toggle = await operator_paused.make_toggle(
+                    False, name="shard rebalancing"
+                )
+
+    async def _relist(self):
+        """Pauses and resumes the kopf watch-streams, so that they list all the objects again."""
+        if self._toggle is None:
+            return
+        await self._toggle.turn_to(True)
+        await asyncio.sleep(SHARD_RELIST_PAUSE)
+        await self._toggle.turn_to(False)
+
+    def _lease(self, name, role, holder, resource_version=None, transitions=0):
+        now = _now()
+        return kubernetes.client.V1Lease(
+            metadata=kubernetes.client.V1ObjectMeta(
+                name=name,
+                namespace=self.namespace,
+                labels={GROUP_LABEL: self.prefix, ROLE_LABEL: role},
+                resource_version=resource_version,
+            ),
+            spec=kubernetes.client.V1LeaseSpec(
+                holder_identity=holder,
+                lease_duration_seconds=self.lease_duration,
+                acquire_time=now,
+                renew_time=now,
+                lease_transitions=transitions,
+            ),
+        )
+
+    def _expired(self, lease, now):
+        spec = lease.spec
+        if not spec.holder_identity or spec.renew_time is None:
+            return True
+        duration = spec.lease_duration_seconds or self.lease_duration
+        return spec.renew_time + datetime.timedelta(seconds=duration) < now
+
+    async def _write(self, lease, name, role, holder):
+        """Creates or replaces a Lease. Returns False if another replica has changed it meanwhile."""
+        coordination_api = k8s_client.api(kubernetes.client.CoordinationV1Api)
+        try:
+            if lease is None:
+                await k8s_client.call(
+                    coordination_api.create_namespaced_lease,
+                    self.namespace,
+                    self._lease(name, role, holder),
+                )
+            else:
+                body = self._lease(
+                    name,
+                    role,
+                    holder,
+                    lease.metadata.resource_version,
+                    (lease.spec.lease_transitions or 0)
+                    + (lease.spec.holder_identity != holder),
+                )
+                if lease.spec.holder_identity == holder:
+                    body.spec.acquire_time = lease.spec.acquire_time
+                await k8s_client.call(
+                    coordination_api.replace_namespaced_lease,
+                    name,
+                    self.namespace,
+                    body,
+                )
+            return True
+        except ApiException as e:
+            if e.status in (HTTP_CONFLICT, HTTP_NOT_FOUND):
+                return False
+            raise
+
+    async def reconcile(self):
+        """Renews, releases and takes the Leases once.
+
+        Returns:
+            Boolean: True if the owned shards have changed.
+        """
+        coordination_api = k8s_client.api(kubernetes.client.CoordinationV1Api)
+        leases = await k8s_client.call(
+            coordination_api.list_namespaced_lease,
+            self.namespace,
+            label_selector=f"{GROUP_LABEL}={self.prefix}",
+        )
+        now = _now()
+        by_name = {lease.metadata.name: lease for lease in leases.items}
+
+        member_name = f"{self.prefix}-member-{self.identity}"
+        await self._write(
+            by_name.get(member_name), member_name, ROLE_MEMBER, self.identity
+        )
+        members = {self.identity} | {
+            lease.spec.holder_identity
+            for lease in leases.items
+            if lease.metadata.labels.get(ROLE_LABEL) == ROLE_MEMBER
+            and not self._expired(lease, now)
+        }
+        fair_share = math.ceil(self.shards / len(members))
+
+        held = [
+            shard
+            for shard in range(self.shards)
+            if f"{self.prefix}-{shard}" in by_name
+            and by_name[f"{self.prefix}-{shard}"].spec.holder_identity == self.identity
+            and not self._expired(by_name[f"{self.prefix}-{shard}"], now)
+        ]
+        owned = set()
+        for shard in held:
+            name = f"{self.prefix}-{shard}"
+            if len(owned) < fair_share:
+                if await self._write(by_name[name], name, ROLE_SHARD, self.identity):
+                    owned.add(shard)
+            else:
+                # beyond the fair share, e.g. a replica has joined: release it for the others
+                await self._write(by_name[name], name, ROLE_SHARD, None)
+        # start at a different shard in every replica, so that they do not compete for the same ones
+        start = shard_of(self.identity, self.shards)
+        for offset in range(self.shards):
+            if len(owned) >= fair_share:
+                break
+            shard = (start + offset) % self.shards
+            name = f"{self.prefix}-{shard}"
+            lease = by_name.get(name)
+            if shard in owned or (lease is not None and not self._expired(lease, now)):
+                continue
+            if await self._write(lease, name, ROLE_SHARD, self.identity):
+                owned.add(shard)
+
+        self._renewed = now
+        changed = frozenset(owned) != self.owned
+        if changed:
+            logger.info(
+                "Owning shards %s of %s (%s replicas)",
+                sorted(owned),
+                self.shards,
+                len(members),
+            )
+        self.owned = frozenset(owned)
+        return changed
+
+    async def release(self):
+        """Releases the shards and the member Lease, so that the other replicas take them at once."""
+        coordination_api = k8s_client.api(kubernetes.client.CoordinationV1Api)
+        owned, self.owned = self.owned, frozenset()
+        for shard in owned:
+            name = f"{self.prefix}-{shard}"
+            try:
+                lease = await k8s_client.call(
+                    coordination_api.read_namespaced_lease, name, self.namespace
+                )
+                if lease.spec.holder_identity == self.identity:
+                    await self._write(lease, name, ROLE_SHARD, None)
+            except Exception as e:
+                # the Lease expires without renewals
+                logger.warning("Cannot release the shard %s: %s", shard, e)
+        try:
+            await k8s_client.call(
+                coordination_api.delete_namespaced_lease,
+                f"{self.prefix}-member-{self.identity}",
+                self.namespace,
+            )
+        except ApiException as e:
+            if e.status != HTTP_NOT_FOUND:
+                logger.warning("Cannot delete the member Lease: %s", e)
+        except Exception as e:
+            logger.warning("Cannot delete the member Lease: %s", e)
+
+    def _expiring(self):
+        """Returns whether the owned shards may expire before the next renewal."""
+        margin = datetime.timedelta(seconds=self.lease_duration - self.renew_interval)
+        return self._renewed is None or _now() - self._renewed > margin
+
+    async def run(self):
+        """Keeps the Leases until cancelled, then releases them."""
+        try:
+            while True:
+                await asyncio.sleep(self.renew_interval)
+                try:
+                    changed = await self.reconcile()
+                except Exception as e:
+                    # e.g. an ApiException, or a connection error while the API server is unreachable
+                    logger.warning("Cannot renew the shard Leases: %s", e)
+                    # without renewals the other replicas take over the shards, stop handling them
+                    # before the Leases expire
+                    changed = bool(self.owned) and self._expiring()
+                    if changed:
+                        logger.warning("Dropping shards %s", sorted(self.owned))
+                        self.owned = frozenset()
+                if changed:
+                    await self._relist()
+        finally:
+            await self.release()
+
+    async def start(self):
+        """Takes the first shards before kopf starts watching, then keeps them in the background."""
+        if not self.enabled:
+            return
+        # kopf loads the credentials after the startup handlers
+        await k8s_client.call(k8s_client.load_config)
+        await self.reconcile()
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Stops keeping the Leases and releases them."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
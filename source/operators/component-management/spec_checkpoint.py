@@ -0,0 +1,78 @@
+"""Spec checkpoint of Components, to skip the resume handlers of unchanged Components.
+
+The Component handlers (coreAPIs, managementAPIs, ..., reconcileComponent) are also kopf resume
+handlers, so every restart of the operator reconciles all the children of every Component again.
+After a handler has reconciled a Component, the hash of the spec it reconciled is recorded in
+``status.reconciledSpec`` (one entry per handler). With ``RESUME_CHECKPOINT=true``, a handler is
+skipped on resume if the hash of the current spec is the recorded one. It is off by default, as a
+skipped Component does not repair children that drifted while the operator was down.
+
+The spec is only recorded after a clean success: not if the handler raises, and not if it logs an
+error and returns a partial result, which it signals with ``mark_failed``.
+
+The hash includes the version of the operator (``GIT_COMMIT_SHA``), so a new version of the
+operator still reconciles every Component once.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+
+STATUS_FIELD = "reconciledSpec"
+OPERATOR_VERSION = os.getenv("GIT_COMMIT_SHA", "")
+
+# whether the running handler has failed, set by mark_failed
+_failed = contextvars.ContextVar("spec_checkpoint_failed", default=False)
+
+
+def spec_hash(spec, version=OPERATOR_VERSION):
+    """Returns the content hash of a Component spec, independent of the order of the keys."""
+    content = json.dumps(
+        [version, dict(spec or {})], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def is_reconciled(status, handler_id, spec):
+    """Returns whether a handler has already reconciled this spec of a Component.
+
+    Args:
+        * status (Dict): The status of the Component
+        * handler_id (String): The id of the kopf handler, e.g. ``coreAPIs``
+        * spec (Dict): The spec of the Component
+    """
+    recorded = (status or {}).get(STATUS_FIELD) or {}
+    return recorded.get(handler_id) == spec_hash(spec)
+
+
+def record(patch, handler_id, spec):
+    """Records in the kopf patch of a Component that a handler has reconciled its spec."""
+    patch.status.setdefault(STATUS_FIELD, {})[handler_id] = spec_hash(spec)
+
+
+def mark_failed():
+    """Marks the running handler as failed, so that ``reconciling`` does not record its spec.
+
+    For handlers that catch an error and return a partial result instead of raising it.
+    """
+    _failed.set(True)
+
+
+@contextlib.contextmanager
+def reconciling(patch, handler_id, spec):
+    """Context manager around a handler, records its spec if it succeeds.
+
+    Args:
+        * patch (kopf.Patch): The patch of the Component
+        * handler_id (String): The id of the kopf handler, e.g. ``coreAPIs``
+        * spec (Dict): The spec of the Component
+    """
+    token = _failed.set(False)
+    try:
+        yield
+        if not _failed.get():
+            record(patch, handler_id, spec)
+    finally:
+        _failed.reset(token)
@@ -0,0 +1,159 @@
+"""Summary of the status of a Component.
+
+The ``summary`` handler of the component operator runs on every change of the Component status
+(which the API operators, the identity config operator, ... update all the time) and aggregates
+the status of all the ExposedAPIs, DependentAPIs and the SecretsManagement into
+``status.summary``. The ``StatusSummarizer`` remembers the summary of each section of each
+Component, and only recomputes the sections whose inputs (url, developerUI, ready) have changed.
+"""
+
+from collections import namedtuple
+
+import deployment_stages
+
+IDENTITY_PROVIDER_NOT_SET = "Not set"
+
+SectionSummary = namedtuple(
+    "SectionSummary", ["summary", "developerUIs", "desired", "complete"]
+)
+
+# status field -> summary field, whether the developerUIs are part of the developerUIsummary
+SECTIONS = [
+    ("coreAPIs", "coreAPIsummary", True),
+    ("coreDependentAPIs", "coreDependentAPIsummary", False),
+    ("managementAPIs", "managementAPIsummary", True),
+    ("securityAPIs", "securityAPIsummary", True),
+]
+# the sections that count towards the completion of the ExposedAPIs
+SECTIONS_WITH_APIS = ["coreAPIs", "managementAPIs", "securityAPIs"]
+
+
+def summarize_section(entries, with_developer_ui):
+    """Summarizes the entries of one status section.
+
+    Args:
+        * entries (List): The status entries, e.g. status.coreAPIs
+        * with_developer_ui (Boolean): Collect the developerUI of the entries
+
+    Returns:
+        SectionSummary: The url of each entry followed by a space, the developerUIs, the number of entries and the number
+        of entries that are ready.
+    """
+    urls = []
+    developerUIs = []
+    complete = 0
+    for entry in entries:
+        if "url" in entry:
+            urls.append(entry["url"] + " ")
+            if with_developer_ui and "developerUI" in entry:
+                developerUIs.append(entry["developerUI"] + " ")
+            if entry.get("ready") == True:
+                complete = complete + 1
+    return SectionSummary("".join(urls), developerUIs, len(entries), complete)
+
+
+def fingerprint(entries):
+    return tuple(
+        (entry.get("url"), entry.get("developerUI"), entry.get("ready"))
+        for entry in entries
+    )
+
+
+class StatusSummarizer:
+    """Builds Component status summaries, reusing the unchanged sections of the previous summary.
+
+    Args:
+        * identity_provider_not_set (String): The identityProvider of an identityConfig that is not configured yet
+    """
+
+    def __init__(self, identity_provider_not_set=IDENTITY_PROVIDER_NOT_SET):
+        self.identity_provider_not_set = identity_provider_not_set
+        self._sections = (
+            {}
+        )  # (component key, status field) -> (fingerprint, SectionSummary)
+        self.computed = 0
+        self.reused = 0
+
+    def section(self, key, field, entries, with_developer_ui):
+        """Returns the SectionSummary of one section, recomputed only if its entries have changed."""
+        entriesFingerprint = fingerprint(entries)
+        cached = self._sections.get((key, field))
+        if cached is not None and cached[0] == entriesFingerprint:
+            self.reused = self.reused + 1
+            return cached[1]
+        result = summarize_section(entries, with_developer_ui)
+        self._sections[(key, field)] = (entriesFingerprint, result)
+        self.computed = self.computed + 1
+        return result
+
+    def forget(self, key):
+        """Removes the cached sections of a Component, e.g. when it is deleted.
+
+        Args:
+            * key (Hashable): Identifies the Component, e.g. (namespace, name)
+        """
+        for cached in [cached for cached in self._sections if cached[0] == key]:
+            del self._sections[cached]
+
+    def summarize(self, key, status, previous=None, party_role_api=None, created=None):
+        """Builds the summary of a Component status.
+
+        Args:
+            * key (Hashable): Identifies the Component, e.g. (namespace, name)
+            * status (Dict): The status of the Component
+            * previous (Dict): The previous summary, its stage timestamps are kept
+            * party_role_api (String): The name of the partyRoleManagement ExposedAPI of the Component, None if it has none
+            * created (String): The creationTimestamp of the Component
+
+        Returns:
+            Tuple: The summary for status.summary including the deployment_status and the stages, the number of ready
+            ExposedAPIs and the number of ExposedAPIs.
+        """
+        summary = {}
+        developerUIs = []
+        sections = {}
+        for field, summaryField, with_developer_ui in SECTIONS:
+            result = self.section(key, field, status.get(field, []), with_developer_ui)
+            sections[field] = result
+            summary[summaryField] = result.summary
+            developerUIs.extend(result.developerUIs)
+
+        sman = status.get("securitySecretsManagement", {})
+        desiredSecretsManagements = 0
+        completeSecretsManagements = 0
+        summary["securitySecretsManagementSummary"] = ""
+        if sman != {}:
+            desiredSecretsManagements = 1
+            summary["securitySecretsManagementSummary"] = "initializing"
+            if sman.get("ready") == True:
+                completeSecretsManagements = 1
+                summary["securitySecretsManagementSummary"] = "ready"
+        summary["developerUIsummary"] = "".join(developerUIs)
+
+        apiSections = [sections[field] for field in SECTIONS_WITH_APIS]
+        desiredAPIs = sum(section.desired for section in apiSections)
+        completeAPIs = sum(section.complete for section in apiSections)
+        dependentAPIs = sections["coreDependentAPIs"]
+
+        identityProvider = status.get("identityConfig", {}).get("identityProvider")
+        ready = {
+            "exposedAPIs": completeAPIs == desiredAPIs,
+            "identityConfig": identityProvider
+            not in (
+                None,
+                self.identity_provider_not_set,
+            ),
+            "secretsManagement": completeSecretsManagements
+            == desiredSecretsManagements,
+            "dependentAPIs": dependentAPIs.complete == dependentAPIs.desired,
+            deployment_stages.PARTY_ROLE_API: party_role_api is None
+            or any(
+                entry.get("name") == party_role_api and entry.get("ready") == True
+                for field in SECTIONS_WITH_APIS
+                for entry in status.get(field, [])
+            ),
+        }
+        summary["deployment_status"], summary["stages"] = deployment_stages.evaluate(
+            ready, (previous or {}).get("stages"), created
+        )
+        return summary, completeAPIs, desiredAPIs
@@ -0,0 +1,60 @@
+"""Microbenchmark of the ExposedAPI diff against the nested loop diff it replaced.
+
+Run with ``python test/benchmark_exposedapi_diff.py [number of APIs]``.
+"""
+
+import os
+import sys
+import timeit
+
+try:
+    import exposedapi_diff
+except ModuleNotFoundError:
+    # allow running without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import exposedapi_diff
+
+
+def nested_loop_diff(name, oldAPIs, newAPIs):
+    # the algorithm used by the coreAPIs, managementAPIs and securityAPIs handlers before
+    patch, delete, create, apiChildren = [], [], [], []
+    for oldAPI in oldAPIs:
+        found = False
+        for newAPI in newAPIs:
+            if oldAPI["name"] == name + "-" + newAPI["name"].lower():
+                found = True
+                patch.append(newAPI)
+                apiChildren.append({"name": name + "-" + newAPI["name"].lower()})
+        if not found:
+            delete.append(oldAPI["name"])
+    for newAPI in newAPIs:
+        alreadyProcessed = False
+        for processedAPI in apiChildren:
+            if processedAPI["name"] == name + "-" + newAPI["name"].lower():
+                alreadyProcessed = True
+        if alreadyProcessed == False:
+            create.append(newAPI)
+            apiChildren.append({"name": name + "-" + newAPI["name"].lower()})
+    return create, patch, delete
+
+
+def main(count):
+    name = "benchmark"
+    # half of the APIs are kept, a quarter removed and a quarter added
+    oldAPIs = [{"name": f"{name}-api{i}"} for i in range(count)]
+    newAPIs = [{"name": f"API{i}"} for i in range(count // 4, count + count // 4)]
+
+    for label, func in [
+        ("nested loops", nested_loop_diff),
+        ("indexed", exposedapi_diff.diff_exposed_apis),
+    ]:
+        timer = timeit.Timer(lambda: func(name, oldAPIs, newAPIs))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        print(f"{label:>12}: {best * 1000:10.3f} ms per diff of {count} APIs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,65 @@
+"""Microbenchmark of the per-call overhead of the @logwrapper decorator.
+
+Compares a plain call, a call through @logwrapper and a call through the decorator as it was before,
+which looked up the ``logw`` argument with ``inspect.getfullargspec()`` on every call.
+
+Run with ``python test/benchmark_log_wrapper.py``.
+"""
+
+import inspect
+import os
+import sys
+import timeit
+
+try:
+    import log_wrapper
+except ModuleNotFoundError:
+    # allow running without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import log_wrapper
+from log_wrapper import LogWrapper, logwrapper
+
+
+def introspecting_logwrapper(func):
+    # the decorator before: the argument spec of the function is read on every call
+    def inject_logw(*args, **kwargs):
+        arg_names = inspect.getfullargspec(func).args
+        if "logw" in arg_names:
+            logw_idx = arg_names.index("logw")
+            args2 = list(args)
+            args2[logw_idx] = log_wrapper.create_child_log(
+                args[logw_idx], {"function_name": func.__name__}
+            )
+            args = tuple(args2)
+        return func(*args, **kwargs)
+
+    return inject_logw
+
+
+def helper(logw, namespace, name, inHandler):
+    return name
+
+
+def per_call(func, logw):
+    timer = timeit.Timer(lambda: func(logw, "components", "api", "benchmark"))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main():
+    logw = LogWrapper(handler_name="benchmark", component_name="benchmark")
+    plain = per_call(helper, logw)
+    for label, func in [
+        ("@logwrapper", logwrapper(helper)),
+        ("introspecting", introspecting_logwrapper(helper)),
+    ]:
+        best = per_call(func, logw)
+        print(
+            f"{label:>13}: {best * 1e6:8.3f} us per call, {(best - plain) * 1e6:8.3f} us more than a plain call"
+        )
+
+
+if __name__ == "__main__":
+    main()
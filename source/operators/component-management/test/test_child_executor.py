@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+import time
+
+try:
+    import child_executor
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import child_executor
+
+
+async def write(result, duration=0.01):
+    await asyncio.sleep(duration)
+    return result
+
+
+def test_gather_keeps_order_and_limits_concurrency():
+    executor = child_executor.ChildExecutor(concurrency=4, qps=0)
+    results = asyncio.run(executor.gather(write(i) for i in range(20)))
+    assert results == list(range(20))
+    assert executor.max_in_flight == 4
+    assert executor.in_flight == 0
+
+
+def test_rate_limit():
+    executor = child_executor.ChildExecutor(concurrency=100, qps=50, burst=5)
+
+    async def run():
+        start = time.monotonic()
+        await executor.gather(write(i, 0) for i in range(15))
+        return time.monotonic() - start
+
+    # 5 writes start at once, the other 10 at 50 per second
+    assert asyncio.run(run()) >= 10 / 50 * 0.9
+
+
+def test_exception_cancels_remaining_writes():
+    executor = child_executor.ChildExecutor(concurrency=1, qps=0)
+    completed = []
+
+    async def failing():
+        raise ValueError("boom")
+
+    async def tracked(i):
+        await asyncio.sleep(0.01)
+        completed.append(i)
+
+    async def run():
+        try:
+            await executor.gather([failing()] + [tracked(i) for i in range(5)])
+            assert False, "exception expected"
+        except ValueError as e:
+            assert str(e) == "boom"
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert completed == []
@@ -0,0 +1,564 @@
+import asyncio
+import copy
+import itertools
+import json
+import logging
+import os
+import sys
+import types
+
+import kopf
+import prometheus_client
+import pytest
+import kubernetes.client
+import kubernetes.config
+from kopf._core.actions import execution
+from kopf._core.intents import causes
+from kubernetes.client.rest import ApiException
+
+if sys.version_info < (3, 12):
+    pytest.skip(
+        "componentOperator needs Python 3.12 (f-string syntax)",
+        allow_module_level=True,
+    )
+
+try:
+    import componentOperator
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import componentOperator
+
+import child_executor
+import resource_cache
+
+NAMESPACE = "components"
+COMPONENT = "ctk-productcatalog"
+LABEL = "oda.tmforum.org/componentName"
+
+
+class FakeCustomObjectsApi:
+    """Custom objects of a fake API server, with the writes it has received."""
+
+    def __init__(self):
+        self.objects = {}  # (plural, name) -> body
+        self.writes = []
+        self.uids = itertools.count(1)
+        self.versions = itertools.count(100)
+
+    def get_namespaced_custom_object(self, group, version, namespace, plural, name):
+        if (plural, name) not in self.objects:
+            raise ApiException(status=404)
+        return copy.deepcopy(self.objects[(plural, name)])
+
+    def create_namespaced_custom_object(self, group, version, namespace, plural, body):
+        self.writes.append(("create", plural, body["metadata"]["name"]))
+        if (plural, body["metadata"]["name"]) in self.objects:
+            raise ApiException(status=409)
+        created = copy.deepcopy(body)
+        created["metadata"]["uid"] = f"uid-{next(self.uids)}"
+        created["metadata"]["resourceVersion"] = str(next(self.versions))
+        self.objects[(plural, body["metadata"]["name"])] = created
+        return copy.deepcopy(created)
+
+    def patch_namespaced_custom_object(
+        self, group, version, namespace, plural, name, body
+    ):
+        self.writes.append(("patch", plural, name))
+        if (plural, name) not in self.objects:
+            raise ApiException(status=404)
+        patched = self.objects[(plural, name)]
+        patched["spec"] = copy.deepcopy(body["spec"])
+        patched["metadata"]["resourceVersion"] = str(next(self.versions))
+        return copy.deepcopy(patched)
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural):
+        items = [body for (listed, _), body in self.objects.items() if listed == plural]
+        return {"items": copy.deepcopy(items)}
+
+    def delete_namespaced_custom_object(self, group, version, namespace, plural, name):
+        self.writes.append(("delete", plural, name))
+        if self.objects.pop((plural, name), None) is None:
+            raise ApiException(status=404)
+
+
+class FakeLabelledResourceApi:
+    """Labelled resources (services, deployments, ...) of a fake API server, with the patches it has received.
+
+    Serves the ``list_namespaced_<kind>`` and ``patch_namespaced_<kind>`` methods of all the kinds.
+    """
+
+    def __init__(self):
+        self.resources = {}  # (kind, name) -> body
+        self.patches = []
+        self.errors = (
+            {}
+        )  # name -> statuses of the ApiExceptions raised by the next patches
+
+    def add(self, kind, name, component_name, owners=()):
+        self.resources[(kind, name)] = {
+            "metadata": {
+                "name": name,
+                "namespace": NAMESPACE,
+                "uid": f"{kind}-{name}",
+                "labels": {LABEL: component_name},
+                "ownerReferences": list(owners),
+            },
+            "spec": {"replicas": 1},
+        }
+
+    def __getattr__(self, method):
+        verb, kind = method.split("_namespaced_")
+        if verb == "list":
+
+            def list_resources(namespace, label_selector, _preload_content):
+                items = [
+                    copy.deepcopy(body)
+                    for (listed, _), body in self.resources.items()
+                    if listed == kind
+                ]
+                return types.SimpleNamespace(data=json.dumps({"items": items}))
+
+            return list_resources
+
+        def patch_resource(name, namespace, body):
+            self.patches.append((kind, name, copy.deepcopy(body)))
+            errors = self.errors.get(name)
+            if errors:
+                raise ApiException(status=errors.pop(0))
+            metadata = self.resources[(kind, name)]["metadata"]
+            metadata["ownerReferences"] += body["metadata"]["ownerReferences"]
+            return copy.deepcopy(self.resources[(kind, name)])
+
+        return patch_resource
+
+
+@pytest.fixture
+def custom_objects_api(monkeypatch):
+    api = FakeCustomObjectsApi()
+    monkeypatch.setattr(componentOperator.k8s_client, "api", lambda api_class: api)
+
+    async def call(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(componentOperator.k8s_client, "call", call)
+    monkeypatch.setattr(
+        child_executor, "_executor", child_executor.ChildExecutor(qps=0)
+    )
+    monkeypatch.setattr(componentOperator, "cache", resource_cache.ResourceCache())
+    return api
+
+
+@pytest.fixture
+def labelled_api(custom_objects_api, monkeypatch):
+    api = FakeLabelledResourceApi()
+    monkeypatch.setattr(
+        componentOperator.k8s_client,
+        "api",
+        lambda api_class: (
+            custom_objects_api
+            if api_class is kubernetes.client.CustomObjectsApi
+            else api
+        ),
+    )
+    return api
+
+
+def component(spec, status=None):
+    return {
+        "apiVersion": "oda.tmforum.org/v1",
+        "kind": "Component",
+        "metadata": {
+            "name": COMPONENT,
+            "namespace": NAMESPACE,
+            "uid": "component-uid",
+            "labels": {LABEL: "productcatalog"},
+        },
+        "spec": spec,
+        "status": status or {},
+    }
+
+
+def invoke(handler, body, reason="update"):
+    """Invokes a Component handler as kopf does, returns its result and its patch."""
+
+    async def run():
+        patch = kopf.Patch()
+        # kopf.adopt() takes the owner of the children from the cause of the handler
+        execution.cause_var.set(
+            causes.ResourceCause(
+                logger=logging.getLogger("test"),
+                indices={},
+                memo=kopf.Memo(),
+                resource=kopf.Resource("oda.tmforum.org", "v1", "components"),
+                patch=patch,
+                body=kopf.Body(body),
+            )
+        )
+        result = await handler(
+            meta=body["metadata"],
+            spec=body["spec"],
+            status=body["status"],
+            body=body,
+            namespace=NAMESPACE,
+            labels=body["metadata"]["labels"],
+            name=COMPONENT,
+            patch=patch,
+            reason=reason,
+        )
+        return result, patch
+
+    return asyncio.run(run())
+
+
+def exposed_api(name, path):
+    return {"name": name, "specification": [], "implementation": name, "path": path}
+
+
+def counted(metric, handler):
+    return (
+        prometheus_client.REGISTRY.get_sample_value(metric, {"handler": handler}) or 0
+    )
+
+
+def test_consolidated_reconcile_writes_children_and_one_status_patch(
+    custom_objects_api,
+):
+    kept = exposed_api("productcatalogmanagement", "/v5")
+    custom_objects_api.objects[("exposedapis", f"{COMPONENT}-{kept['name']}")] = {
+        "metadata": {"name": f"{COMPONENT}-{kept['name']}", "uid": "api-uid"},
+        "spec": {**kept, "path": "/v4"},
+        "status": {"implementation": {"ready": True}},
+    }
+    spec = {
+        "coreFunction": {
+            "exposedAPIs": [kept, exposed_api("promotion", "/promotion")],
+            "dependentAPIs": [{"name": "party", "specification": "party.json"}],
+        },
+        "managementFunction": {"exposedAPIs": []},
+        "securityFunction": {"exposedAPIs": []},
+    }
+    status = {
+        "coreAPIs": [{"name": f"{COMPONENT}-{kept['name']}"}],
+        "managementAPIs": [{"name": f"{COMPONENT}-metrics"}],
+    }
+    writes_before = counted("oda_operator_child_writes_total", "reconcileComponent")
+    patches_before = counted("oda_operator_status_patches_total", "reconcileComponent")
+
+    result, patch = invoke(
+        componentOperator.reconcileComponent, component(spec, status)
+    )
+
+    assert result is None
+    assert sorted(custom_objects_api.writes) == [
+        ("create", "dependentapis", f"{COMPONENT}-party"),
+        ("create", "exposedapis", f"{COMPONENT}-promotion"),
+        ("delete", "exposedapis", f"{COMPONENT}-metrics"),
+        ("patch", "exposedapis", f"{COMPONENT}-productcatalogmanagement"),
+    ]
+    # every part of the Component lands in the one status patch of the handler
+    assert [api["name"] for api in patch.status["coreAPIs"]] == [
+        f"{COMPONENT}-productcatalogmanagement",
+        f"{COMPONENT}-promotion",
+    ]
+    assert patch.status["managementAPIs"] == []
+    assert patch.status["securityAPIs"] == []
+    assert [dapi["name"] for dapi in patch.status["coreDependentAPIs"]] == [
+        f"{COMPONENT}-party"
+    ]
+    assert patch.status["securitySecretsManagement"] == {}
+    assert (
+        counted("oda_operator_child_writes_total", "reconcileComponent") - writes_before
+        == 4
+    )
+    assert (
+        counted("oda_operator_status_patches_total", "reconcileComponent")
+        - patches_before
+        == 1
+    )
+
+
+def test_consolidated_reconcile_without_changes_writes_nothing(custom_objects_api):
+    spec = {
+        "coreFunction": {"exposedAPIs": []},
+        "managementFunction": {"exposedAPIs": []},
+        "securityFunction": {"exposedAPIs": []},
+    }
+    writes_before = counted("oda_operator_child_writes_total", "reconcileComponent")
+
+    result, patch = invoke(componentOperator.reconcileComponent, component(spec))
+
+    assert custom_objects_api.writes == []
+    assert patch.status["coreAPIs"] == []
+    assert (
+        counted("oda_operator_child_writes_total", "reconcileComponent")
+        == writes_before
+    )
+
+
+def test_patched_child_is_read_back_from_the_cache(custom_objects_api):
+    name = f"{COMPONENT}-productcatalogmanagement"
+    watched = {
+        "metadata": {
+            "name": name,
+            "namespace": NAMESPACE,
+            "uid": "api-uid",
+            "resourceVersion": "5",
+        },
+        "spec": exposed_api("productcatalogmanagement", "/v4"),
+        "status": {"implementation": {"ready": True}},
+    }
+    custom_objects_api.objects[("exposedapis", name)] = copy.deepcopy(watched)
+    componentOperator.cache.apply_event(
+        "exposedapis", {"type": "ADDED", "object": copy.deepcopy(watched)}
+    )
+    status = {"coreAPIs": [{"name": name}]}
+
+    def reconcile(path):
+        spec = {
+            "coreFunction": {
+                "exposedAPIs": [exposed_api("productcatalogmanagement", path)]
+            }
+        }
+        return invoke(componentOperator.coreAPIs, component(spec, status))
+
+    reconcile("/v5")
+    # the watch event of the ADDED object arrives again after the patch, e.g. from a re-list
+    componentOperator.cache.apply_event(
+        "exposedapis", {"type": "MODIFIED", "object": copy.deepcopy(watched)}
+    )
+    # the spec is changed back before the watch event of the patch has arrived
+    reconcile("/v4")
+    reconcile("/v4")
+
+    assert custom_objects_api.writes == [
+        ("patch", "exposedapis", name),
+        ("patch", "exposedapis", name),
+    ]
+    assert custom_objects_api.objects[("exposedapis", name)]["spec"]["path"] == "/v4"
+
+
+def owner_of(body):
+    return [
+        {"kind": owner["kind"], "name": owner["name"], "uid": owner["uid"]}
+        for owner in body["metadata"]["ownerReferences"]
+    ]
+
+
+def test_adoption_patches_only_the_owner_reference(custom_objects_api, labelled_api):
+    parent = component({})
+    custom_objects_api.objects[("components", "productcatalog")] = {
+        **parent,
+        "metadata": {**parent["metadata"], "name": "productcatalog"},
+    }
+    labelled_api.add("service", "productcatalog-api", "productcatalog")
+    labelled_api.add(
+        "deployment",
+        "productcatalog-db",
+        "productcatalog",
+        owners=[{"kind": "Component", "name": "productcatalog", "uid": "other"}],
+    )
+
+    async def adopt(kind, resourceType):
+        body = labelled_api.resources[kind]
+        metadata = body["metadata"]
+        await componentOperator.adopt_kubernetesResource(
+            metadata,
+            body["spec"],
+            body,
+            NAMESPACE,
+            metadata["labels"],
+            metadata["name"],
+            resourceType,
+        )
+
+    asyncio.run(adopt(("service", "productcatalog-api"), "service"))
+    asyncio.run(adopt(("deployment", "productcatalog-db"), "deployment"))
+
+    # the resource already owned by a Component is not patched
+    assert len(labelled_api.patches) == 1
+    kind, name, body = labelled_api.patches[0]
+    assert (kind, name) == ("service", "productcatalog-api")
+    # neither the spec nor the rest of the metadata is sent back
+    assert list(body) == ["metadata"]
+    assert list(body["metadata"]) == ["ownerReferences"]
+    assert owner_of(body) == [
+        {"kind": "Component", "name": "productcatalog", "uid": "component-uid"}
+    ]
+
+
+def test_adoption_sweep_bounds_the_patches_and_counts_the_failures(
+    custom_objects_api, labelled_api, monkeypatch
+):
+    parent = component({})
+    custom_objects_api.objects[("components", "productcatalog")] = {
+        **parent,
+        "metadata": {**parent["metadata"], "name": "productcatalog"},
+    }
+    for index in range(12):
+        labelled_api.add("service", f"productcatalog-{index}", "productcatalog")
+    labelled_api.add(
+        "service",
+        "productcatalog-owned",
+        "productcatalog",
+        owners=[{"kind": "Component", "name": "productcatalog", "uid": "c"}],
+    )
+    # conflicts on its first patch, adopted in the second round
+    labelled_api.add("config_map", "productcatalog-config", "productcatalog")
+    labelled_api.errors["productcatalog-config"] = [409]
+    # the Component never exists, fails in every round
+    labelled_api.add("deployment", "missing-db", "missing")
+
+    monkeypatch.setattr(componentOperator.k8s_client, "load_config", lambda: None)
+    monkeypatch.setattr(componentOperator, "ADOPTION_SWEEP_CONCURRENCY", 3)
+    monkeypatch.setattr(componentOperator, "ADOPTION_SWEEP_RETRY_DELAY", 0)
+    monkeypatch.setattr(child_executor, "CHILD_QPS", 0)
+    in_flight = {"now": 0, "max": 0}
+
+    async def call(func, *args, **kwargs):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            await asyncio.sleep(0.001)
+            return func(*args, **kwargs)
+        finally:
+            in_flight["now"] -= 1
+
+    monkeypatch.setattr(componentOperator.k8s_client, "call", call)
+
+    stats = asyncio.run(componentOperator.sweepAdoption())
+
+    assert stats == {"listed": 15, "adopted": 13, "failed": 1}
+    assert in_flight["max"] == 3
+    patched = [name for _, name, _ in labelled_api.patches]
+    assert len(patched) == 14
+    assert patched.count("productcatalog-config") == 2
+    assert "missing-db" not in patched
+    assert "productcatalog-owned" not in patched
+
+
+def test_adoption_sweep_adopts_only_the_resources_of_the_owned_shards(
+    custom_objects_api, labelled_api, monkeypatch
+):
+    for name in ["productcatalog", "partyrole"]:
+        parent = component({})
+        custom_objects_api.objects[("components", name)] = {
+            **parent,
+            "metadata": {**parent["metadata"], "name": name},
+        }
+        labelled_api.add("service", f"{name}-api", name)
+        labelled_api.add("deployment", f"{name}-db", name)
+    shards = componentOperator.sharding.ShardOwnership(LABEL, shards=2)
+    # productcatalog is in shard 1, partyrole in shard 0
+    shards.owned = frozenset({1})
+    monkeypatch.setattr(componentOperator, "shards", shards)
+    monkeypatch.setattr(componentOperator.k8s_client, "load_config", lambda: None)
+    monkeypatch.setattr(componentOperator, "ADOPTION_SWEEP_RETRY_DELAY", 0)
+    monkeypatch.setattr(child_executor, "CHILD_QPS", 0)
+
+    stats = asyncio.run(componentOperator.sweepAdoption())
+
+    assert stats == {"listed": 4, "adopted": 2, "failed": 0}
+    patched = sorted(name for _, name, _ in labelled_api.patches)
+    assert patched == ["productcatalog-api", "productcatalog-db"]
+
+
+def test_deleted_components_are_forgotten(monkeypatch):
+    summarizer = componentOperator.status_summary.StatusSummarizer()
+    monkeypatch.setattr(componentOperator, "summarizer", summarizer)
+    summarizer.summarize((NAMESPACE, COMPONENT), {})
+    summarizer.summarize((NAMESPACE, "ctk-partyrole"), {})
+    timings = componentOperator.deployment_timings.DeploymentTimings()
+    monkeypatch.setattr(componentOperator, "deploymentTimings", timings)
+    timings.elapsed((NAMESPACE, COMPONENT), "2024-01-01T10:00:00Z")
+    timings.elapsed((NAMESPACE, "ctk-partyrole"), "2024-01-01T10:00:00Z")
+
+    for event_type in ["ADDED", "MODIFIED", "DELETED"]:
+        componentOperator.componentDeleted(
+            event={"type": event_type}, namespace=NAMESPACE, name=COMPONENT
+        )
+    assert {key for key, _ in summarizer._sections} == {(NAMESPACE, "ctk-partyrole")}
+    assert set(timings._anchors) == {(NAMESPACE, "ctk-partyrole")}
+
+
+def test_identity_config_has_one_handler():
+    handlers = [
+        handler
+        for handler in kopf.get_default_registry()._changing.get_all_handlers()
+        if handler.fn is componentOperator.identityConfig
+    ]
+    assert [handler.id for handler in handlers] == ["identityConfig/stage"]
+
+    started = {"summary/status": {"stages": {"identityConfig": {"started": "t"}}}}
+    security = {"canvasSystemRole": "Admin"}
+
+    def due(old_status, new_status, old_security=security, new_security=security):
+        return componentOperator.identity_config_due(
+            old={"spec": {"securityFunction": old_security}, "status": old_status},
+            new={"spec": {"securityFunction": new_security}, "status": new_status},
+            status=new_status,
+        )
+
+    assert not due({}, {})
+    assert due({}, started)
+    assert not due(started, started)
+    assert due(started, started, new_security={"canvasSystemRole": "Viewer"})
+
+
+def test_spec_is_checkpointed_only_after_a_clean_success(
+    custom_objects_api, monkeypatch
+):
+    spec = {"coreFunction": {"exposedAPIs": [exposed_api("promotion", "/promotion")]}}
+    create = custom_objects_api.create_namespaced_custom_object
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("API server unreachable")
+
+    monkeypatch.setattr(
+        custom_objects_api, "create_namespaced_custom_object", unreachable
+    )
+    # coreAPIs logs the error and returns the children it has, without the new ExposedAPI
+    result, patch = invoke(componentOperator.coreAPIs, component(spec))
+    assert result == []
+    assert "reconciledSpec" not in patch.get("status", {})
+
+    monkeypatch.setattr(custom_objects_api, "create_namespaced_custom_object", create)
+    result, patch = invoke(componentOperator.coreAPIs, component(spec))
+    assert [api["name"] for api in result] == [f"{COMPONENT}-promotion"]
+    assert list(patch.status["reconciledSpec"]) == ["coreAPIs"]
+
+
+def test_sharding_starts_with_the_loaded_credentials(monkeypatch):
+    k8s_client = componentOperator.k8s_client
+    monkeypatch.setattr(kubernetes.client.Configuration, "_default", None)
+
+    def load_incluster_config():
+        configuration = kubernetes.client.Configuration()
+        configuration.host = "https://10.96.0.1:443"
+        kubernetes.client.Configuration.set_default(configuration)
+
+    monkeypatch.setattr(
+        kubernetes.config, "load_incluster_config", load_incluster_config
+    )
+    shards = componentOperator.sharding.ShardOwnership(LABEL, shards=2)
+    monkeypatch.setattr(componentOperator, "shards", shards)
+    hosts = []
+
+    async def reconcile():
+        coordination_api = k8s_client.api(kubernetes.client.CoordinationV1Api)
+        hosts.append(coordination_api.api_client.configuration.host)
+
+    async def run():
+        pass
+
+    monkeypatch.setattr(shards, "reconcile", reconcile)
+    monkeypatch.setattr(shards, "run", run)
+    # kopf has not logged in yet when the startup handlers run
+    k8s_client.shutdown()
+    try:
+        asyncio.run(componentOperator.startSharding())
+    finally:
+        k8s_client.shutdown()
+    assert hosts == ["https://10.96.0.1:443"]
@@ -0,0 +1,73 @@
+import os
+import sys
+
+try:
+    import deployment_stages
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import deployment_stages
+
+CREATED = "2024-01-01T10:00:00Z"
+
+
+def test_identity_config_starts_with_the_party_role_api():
+    ready = {"partyRoleAPI": False, "secretsManagement": True, "dependentAPIs": True}
+    status, stages = deployment_stages.evaluate(
+        ready, None, CREATED, "2024-01-01T10:00:05Z"
+    )
+    assert status == "In-Progress-CompCon"
+    assert stages["exposedAPIs"] == {"started": CREATED}
+    assert "identityConfig" not in stages
+    assert stages["secretsManagement"] == {
+        "started": CREATED,
+        "ready": "2024-01-01T10:00:05Z",
+    }
+
+    # the partyRole API is ready before the other ExposedAPIs
+    ready["partyRoleAPI"] = True
+    status, stages = deployment_stages.evaluate(
+        ready, stages, CREATED, "2024-01-01T10:00:10Z"
+    )
+    assert status == "In-Progress-CompCon"
+    assert stages["identityConfig"] == {"started": "2024-01-01T10:00:10Z"}
+    assert deployment_stages.started(stages, "identityConfig")
+
+    ready["identityConfig"] = True
+    status, stages = deployment_stages.evaluate(
+        ready, stages, CREATED, "2024-01-01T10:00:20Z"
+    )
+    assert status == "In-Progress-CompCon"
+
+    ready["exposedAPIs"] = True
+    status, stages = deployment_stages.evaluate(
+        ready, stages, CREATED, "2024-01-01T10:00:30Z"
+    )
+    assert status == "Complete"
+    assert stages["identityConfig"] == {
+        "started": "2024-01-01T10:00:10Z",
+        "ready": "2024-01-01T10:00:20Z",
+    }
+    assert stages["exposedAPIs"]["ready"] == "2024-01-01T10:00:30Z"
+    assert stages["secretsManagement"]["ready"] == "2024-01-01T10:00:05Z"
+
+
+def test_deployment_status_names_the_first_stage_not_ready():
+    ready = {"partyRoleAPI": True, "exposedAPIs": True, "identityConfig": True}
+    status, _ = deployment_stages.evaluate(ready, None, CREATED)
+    assert status == "In-Progress-SecretMan"
+    ready["secretsManagement"] = True
+    status, _ = deployment_stages.evaluate(ready, None, CREATED)
+    assert status == "In-Progress-DepApi"
+
+
+def test_party_role_api():
+    spec = {
+        "securityFunction": {
+            "exposedAPIs": [{"name": "partyrole"}, {"name": "other"}],
+        }
+    }
+    assert deployment_stages.party_role_api(spec) == {"name": "partyrole"}
+    assert deployment_stages.party_role_api({"securityFunction": {}}) is None
@@ -0,0 +1,103 @@
+import os
+import sys
+
+try:
+    import deployment_timings
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import deployment_timings
+
+
+def sample_count(histogram, label):
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and label in sample.labels.values():
+                return sample.value
+    return 0
+
+
+def test_timings_are_recorded_once(monkeypatch):
+    clock = {
+        "wall": deployment_timings.parse_timestamp("2024-01-01T10:00:00Z") + 5,
+        "monotonic": 100.0,
+    }
+    monkeypatch.setattr(deployment_timings.time, "time", lambda: clock["wall"])
+    monkeypatch.setattr(
+        deployment_timings.time, "monotonic", lambda: clock["monotonic"]
+    )
+    timings = deployment_timings.DeploymentTimings()
+    created = "2024-01-01T10:00:00Z"
+    status = {
+        "coreAPIs": [
+            {"name": "c-api", "ready": True},
+            {"name": "c-other", "ready": False},
+        ],
+        "identityConfig": {"identityProvider": "Not set"},
+    }
+    observed = sample_count(deployment_timings.child_ready_seconds, "exposedAPIs")
+
+    recorded = timings.record(
+        "c",
+        created,
+        None,
+        "In-Progress-CompCon",
+        deployment_timings.ready_children(status, "Not set"),
+    )
+    assert recorded == {
+        "deployment": {"In-Progress-CompCon": 5.0},
+        "exposedAPIs": {"c-api": 5.0},
+    }
+
+    # the wall clock jumps, the elapsed time follows the monotonic clock
+    clock["wall"] += 3600
+    clock["monotonic"] += 2.5
+    status["coreAPIs"][1]["ready"] = True
+    status["identityConfig"]["identityProvider"] = "Keycloak"
+    recorded = timings.record(
+        "c",
+        created,
+        recorded,
+        "In-Progress-SecretMan",
+        deployment_timings.ready_children(status, "Not set"),
+    )
+    assert recorded == {
+        "deployment": {"In-Progress-CompCon": 5.0, "In-Progress-SecretMan": 7.5},
+        "exposedAPIs": {"c-api": 5.0, "c-other": 7.5},
+        "identityConfig": 7.5,
+    }
+    again = timings.record(
+        "c",
+        created,
+        recorded,
+        "In-Progress-SecretMan",
+        deployment_timings.ready_children(status, "Not set"),
+    )
+    assert again == recorded
+    assert (
+        sample_count(deployment_timings.child_ready_seconds, "exposedAPIs")
+        == observed + 2
+    )
+
+
+def test_deleted_components_are_forgotten(monkeypatch):
+    clock = {"monotonic": 100.0}
+    monkeypatch.setattr(
+        deployment_timings.time, "monotonic", lambda: clock["monotonic"]
+    )
+    monkeypatch.setattr(
+        deployment_timings.time,
+        "time",
+        lambda: deployment_timings.parse_timestamp("2024-01-01T10:00:00Z") + 5,
+    )
+    timings = deployment_timings.DeploymentTimings()
+    created = "2024-01-01T10:00:00Z"
+    assert timings.elapsed("c", created) == 5.0
+    clock["monotonic"] += 10
+    timings.forget("c")
+    timings.forget("other")
+    assert timings._anchors == {}
+    # a Component created again with the same name is measured from its own creation
+    assert timings.elapsed("c", created) == 5.0
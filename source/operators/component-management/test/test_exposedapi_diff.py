@@ -0,0 +1,61 @@
+import os
+import sys
+
+try:
+    import exposedapi_diff
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import exposedapi_diff
+
+
+def spec_apis(*names):
+    return [{"name": name, "path": f"/{name}"} for name in names]
+
+
+def status_apis(component_name, *names):
+    return [{"name": f"{component_name}-{name.lower()}"} for name in names]
+
+
+def test_new_component_creates_all_apis():
+    diff = exposedapi_diff.diff_exposed_apis(
+        "prodcat", [], spec_apis("productCatalog", "metrics")
+    )
+    assert [api["name"] for api in diff.create] == ["productCatalog", "metrics"]
+    assert diff.patch == []
+    assert diff.delete == []
+
+
+def test_updated_component_patches_creates_and_deletes():
+    diff = exposedapi_diff.diff_exposed_apis(
+        "prodcat",
+        status_apis("prodcat", "productCatalog", "promotion"),
+        spec_apis("productCatalog", "productInventory"),
+    )
+    assert [api["name"] for api in diff.patch] == ["productCatalog"]
+    assert [api["name"] for api in diff.create] == ["productInventory"]
+    assert diff.delete == ["prodcat-promotion"]
+
+
+def test_duplicate_apis_are_processed_once():
+    diff = exposedapi_diff.diff_exposed_apis(
+        "prodcat",
+        status_apis("prodcat", "metrics", "metrics"),
+        spec_apis("metrics", "Metrics", "events", "events"),
+    )
+    assert [api["name"] for api in diff.patch] == ["metrics"]
+    assert [api["name"] for api in diff.create] == ["events"]
+    assert diff.delete == []
+
+
+def test_diff_is_linear():
+    # the nested loop diff made about 1000 x 1000 comparisons for this case
+    count = 1000
+    old_apis = status_apis("big", *[f"api{i}" for i in range(0, count)])
+    new_apis = spec_apis(*[f"API{i}" for i in range(count // 2, count + count // 2)])
+    diff = exposedapi_diff.diff_exposed_apis("big", old_apis, new_apis)
+    assert len(diff.patch) == count // 2
+    assert len(diff.create) == count // 2
+    assert len(diff.delete) == count // 2
@@ -0,0 +1,168 @@
+import asyncio
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+import kubernetes.client
+import kubernetes.config
+
+try:
+    import k8s_client
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import k8s_client
+
+
+def blocking_call(duration, result):
+    time.sleep(duration)
+    return (result, threading.current_thread().name)
+
+
+def test_call_runs_on_thread_pool():
+    result, thread_name = asyncio.run(k8s_client.call(blocking_call, 0, "ok"))
+    assert result == "ok"
+    assert thread_name.startswith("k8s-client")
+
+
+def test_call_does_not_block_event_loop():
+    async def run():
+        start = time.monotonic()
+        results = await asyncio.gather(
+            *[k8s_client.call(blocking_call, 0.2, i) for i in range(8)]
+        )
+        return time.monotonic() - start, [r[0] for r in results]
+
+    elapsed, results = asyncio.run(run())
+    assert results == list(range(8))
+    # 8 calls of 0.2s each run concurrently rather than one after the other
+    assert elapsed < 0.2 * 8 / 2
+
+
+def test_call_propagates_exceptions():
+    def failing_call():
+        raise ValueError("boom")
+
+    try:
+        asyncio.run(k8s_client.call(failing_call))
+        assert False, "exception expected"
+    except ValueError as e:
+        assert str(e) == "boom"
+
+
+def test_pooled_api_client_reuses_connections():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = json.dumps({"kind": "NamespaceList", "items": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        configuration = kubernetes.client.Configuration()
+        configuration.host = f"http://127.0.0.1:{server.server_address[1]}"
+        kubernetes.client.Configuration.set_default(configuration)
+        k8s_client.shutdown()
+
+        before = k8s_client.stats()
+        for _ in range(5):
+            k8s_client.api(kubernetes.client.CoreV1Api).list_namespace()
+        after = k8s_client.stats()
+
+        assert after["requests"] - before["requests"] == 5
+        assert after["connections_opened"] - before["connections_opened"] == 1
+    finally:
+        k8s_client.shutdown()
+        server.shutdown()
+
+
+def test_apply_namespaced_custom_object():
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_PATCH(self):
+            length = int(self.headers["Content-Length"])
+            requests.append(
+                (self.path, self.headers["Content-Type"], self.rfile.read(length))
+            )
+            body = json.dumps({"metadata": {"name": "prodcat-tmf620", "uid": "1"}})
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        configuration = kubernetes.client.Configuration()
+        configuration.host = f"http://127.0.0.1:{server.server_address[1]}"
+        kubernetes.client.Configuration.set_default(configuration)
+        k8s_client.shutdown()
+
+        intent = {"apiVersion": "oda.tmforum.org/v1", "kind": "ExposedAPI"}
+        result = k8s_client.apply_namespaced_custom_object(
+            "oda.tmforum.org",
+            "v1",
+            "components",
+            "exposedapis",
+            "prodcat-tmf620",
+            intent,
+            "componentOperator",
+        )
+
+        assert result["metadata"]["uid"] == "1"
+        path, content_type, body = requests[0]
+        assert path == (
+            "/apis/oda.tmforum.org/v1/namespaces/components/exposedapis/prodcat-tmf620"
+            "?fieldManager=componentOperator&force=true"
+        )
+        assert content_type == "application/apply-patch+yaml"
+        assert json.loads(body) == intent
+    finally:
+        k8s_client.shutdown()
+        server.shutdown()
+
+
+def test_client_created_before_the_credentials_is_created_again(monkeypatch):
+    monkeypatch.setattr(kubernetes.client.Configuration, "_default", None)
+
+    def load_incluster_config():
+        configuration = kubernetes.client.Configuration()
+        configuration.host = "https://10.96.0.1:443"
+        kubernetes.client.Configuration.set_default(configuration)
+
+    monkeypatch.setattr(
+        kubernetes.config, "load_incluster_config", load_incluster_config
+    )
+    k8s_client.shutdown()
+    try:
+        # e.g. used by a startup handler, before kopf has logged in
+        assert k8s_client.get_api_client().configuration.host == "http://localhost"
+        k8s_client.load_config()
+        loaded = k8s_client.get_api_client()
+        assert loaded.configuration.host == "https://10.96.0.1:443"
+        k8s_client.load_config()
+        assert k8s_client.get_api_client() is loaded
+    finally:
+        k8s_client.shutdown()
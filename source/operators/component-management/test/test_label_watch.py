@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+import sys
+
+try:
+    import label_watch
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import label_watch
+
+
+def obj(name, rv):
+    return {"metadata": {"name": name, "resourceVersion": rv}}
+
+
+class FakeResponse:
+    def __init__(self, data=None, events=None):
+        self.data = data
+        self.events = events or []
+
+    def stream(self, amt=None, decode_content=False):
+        # split the events over chunks that do not end on a line boundary
+        payload = b"".join(json.dumps(event).encode() + b"\n" for event in self.events)
+        for i in range(0, len(payload), 7):
+            yield payload[i : i + 7]
+
+    def release_conn(self):
+        pass
+
+
+class FakeApi:
+    """Serves a list, a watch that expires, a second list and a watch with events."""
+
+    def __init__(self):
+        self.calls = []
+        self.watches = [
+            [{"type": "ERROR", "object": {"code": 410, "message": "too old"}}],
+            [
+                {"type": "ADDED", "object": obj("svc-b", "12")},
+                {"type": "DELETED", "object": obj("svc-a", "13")},
+            ],
+        ]
+        self.lists = [
+            {"metadata": {"resourceVersion": "10"}, "items": [obj("svc-a", "5")]},
+            {"metadata": {"resourceVersion": "11"}, "items": [obj("svc-a", "5")]},
+        ]
+
+    def list_namespaced_service(self, namespace, **kwargs):
+        self.calls.append((namespace, kwargs))
+        if kwargs.get("watch"):
+            return FakeResponse(events=self.watches.pop(0))
+        return FakeResponse(data=json.dumps(self.lists.pop(0)))
+
+
+def test_list_then_watch_with_label_selector_and_relist_on_expiry():
+    api = FakeApi()
+    events = []
+
+    async def run():
+        done = asyncio.Event()
+
+        async def on_event(event):
+            events.append((event["type"], event["object"]["metadata"]["name"]))
+            if event["type"] == "DELETED":
+                watch.stop()
+                done.set()
+
+        watch = label_watch.LabelWatch(
+            "services",
+            api.list_namespaced_service,
+            on_event,
+            label_selector="oda.tmforum.org/componentName",
+            namespace="components",
+        )
+        task = asyncio.ensure_future(watch.run())
+        await asyncio.wait_for(done.wait(), 5)
+        task.cancel()
+
+    asyncio.run(run())
+    assert events == [
+        ("LISTED", "svc-a"),
+        ("LISTED", "svc-a"),
+        ("ADDED", "svc-b"),
+        ("DELETED", "svc-a"),
+    ]
+    assert all(ns == "components" for ns, _ in api.calls)
+    assert all(
+        kwargs["label_selector"] == "oda.tmforum.org/componentName"
+        for _, kwargs in api.calls
+    )
+    # the second watch continues from the resourceVersion of the second list
+    assert api.calls[3][1]["resource_version"] == "11"
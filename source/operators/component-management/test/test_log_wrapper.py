@@ -0,0 +1,200 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import sys
+import urllib.error
+import urllib.request
+
+try:
+    import log_wrapper
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import log_wrapper
+from log_wrapper import LogWrapper, logwrapper
+
+
+class Resource:
+    """An object that counts how often it is converted to text."""
+
+    def __init__(self):
+        self.rendered = 0
+
+    def __str__(self):
+        self.rendered += 1
+        return "{'kind': 'Component'}"
+
+
+def make_logger(caplog, level):
+    logger = logging.getLogger("test_log_wrapper")
+    logger.setLevel(level)
+    caplog.set_level(level, logger="test_log_wrapper")
+    return LogWrapper(
+        logger,
+        function_name="fn",
+        handler_name="hn",
+        resource_name="rn",
+        component_name="cn",
+    )
+
+
+def test_message_is_not_rendered_if_level_is_disabled(caplog):
+    logw = make_logger(caplog, logging.INFO)
+    resource = Resource()
+    called = []
+
+    logw.debug("Component", resource)
+    logw.debug(lambda: called.append("subject"), lambda: called.append("message"))
+
+    assert resource.rendered == 0
+    assert called == []
+    assert caplog.records == []
+
+
+def test_deferred_message_is_rendered_if_level_is_enabled(caplog):
+    logw = make_logger(caplog, logging.DEBUG)
+    resource = Resource()
+
+    logw.debug("Component", resource)
+    logw.debug(lambda: "Deferred: subject", lambda: resource)
+
+    assert resource.rendered == 2
+    assert [r.getMessage() for r in caplog.records] == [
+        "[cn|rn|hn|fn] Component: {'kind': 'Component'}",
+        "[cn|rn|hn|fn] Deferred; subject: {'kind': 'Component'}",
+    ]
+
+
+def test_debug_info_logs_once(caplog):
+    resource = Resource()
+
+    logw = make_logger(caplog, logging.INFO)
+    logw.debugInfo("handler called", resource)
+    assert [(r.levelno, r.getMessage()) for r in caplog.records] == [
+        (logging.INFO, "[cn|rn|hn|fn] handler called: ")
+    ]
+    assert resource.rendered == 0
+
+    caplog.clear()
+    logw = make_logger(caplog, logging.DEBUG)
+    logw.debugInfo("handler called", resource)
+    assert [(r.levelno, r.getMessage()) for r in caplog.records] == [
+        (logging.DEBUG, "[cn|rn|hn|fn] handler called: {'kind': 'Component'}")
+    ]
+
+
+def test_logwrapper_passes_child_logger():
+    @logwrapper
+    def helper(logw, name):
+        return logw, name
+
+    @logwrapper(handler_name="decorated")
+    def keyword_helper(name, logw=None):
+        return logw, name
+
+    parent = LogWrapper(handler_name="handler", component_name="component")
+    logw, name = helper(parent, "api")
+    assert name == "api"
+    assert logw is not parent
+    assert (logw.function_name, logw.handler_name, logw.component_name) == (
+        "helper",
+        "handler",
+        "component",
+    )
+
+    logw, name = keyword_helper("api", logw=parent)
+    assert (logw.function_name, logw.handler_name) == ("keyword_helper", "decorated")
+    logw, name = keyword_helper("api")
+    assert (logw.function_name, logw.handler_name) == ("keyword_helper", "decorated")
+
+
+def test_logwrapper_keeps_coroutine_functions():
+    @logwrapper
+    async def helper(logw: LogWrapper, name):
+        """Creates something."""
+        return logw.function_name, name
+
+    assert inspect.iscoroutinefunction(helper)
+    assert helper.__name__ == "helper"
+    assert helper.__doc__ == "Creates something."
+    assert asyncio.run(helper(LogWrapper(), "api")) == ("helper", "api")
+
+
+def test_logwrapper_without_logw_argument_returns_function():
+    def helper(name):
+        return name
+
+    assert logwrapper(helper) is helper
+
+
+def test_recent_logs_are_kept_per_component(caplog, monkeypatch):
+    recent = log_wrapper.RecentLogs(size=2, components=2, level=logging.DEBUG)
+    monkeypatch.setattr(log_wrapper, "recent_logs", recent)
+    logw = make_logger(caplog, logging.INFO)
+
+    logw.debug("first", lambda: "details")
+    logw.info("second")
+    logw.warning("third")
+    logw.childLogger(component_name="other").info("other")
+    LogWrapper(logw.logger).info("no component")
+
+    # DEBUG is kept even though the logger only logs INFO
+    assert [r.getMessage() for r in caplog.records][0] == "[cn|rn|hn|fn] second: "
+    entries = recent.entries("cn")
+    assert [(e["level"], e["message"]) for e in entries] == [
+        ("INFO", "second: "),
+        ("WARNING", "third: "),
+    ]
+    assert entries[0]["handler"] == "hn"
+    assert recent.component_names() == ["cn", "other"]
+
+    logw.childLogger(component_name="third").info("third component")
+    # the least recently logged component is dropped
+    assert recent.component_names() == ["other", "third"]
+    assert recent.entries("cn") is None
+
+
+def test_recent_logs_endpoint(caplog, monkeypatch):
+    recent = log_wrapper.RecentLogs(size=10, components=10, level=logging.DEBUG)
+    monkeypatch.setattr(log_wrapper, "recent_logs", recent)
+    make_logger(caplog, logging.INFO).debug("Component", Resource())
+
+    assert log_wrapper.serve_recent_logs(port=0) is None
+    server = log_wrapper.serve_recent_logs(port=free_port())
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/logs") as response:
+            assert json.load(response) == ["cn"]
+        with urllib.request.urlopen(f"{base}/logs/cn") as response:
+            (entry,) = json.load(response)
+        assert entry["message"] == "Component: {'kind': 'Component'}"
+        assert entry["level"] == "DEBUG"
+        try:
+            urllib.request.urlopen(f"{base}/logs/unknown")
+            assert False, "exception expected"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_unknown_recent_logs_level_falls_back_to_debug(caplog):
+    assert log_wrapper.level_of("warning") == logging.WARNING
+    assert not caplog.records
+    assert log_wrapper.level_of("verbose") == logging.DEBUG
+    assert "Unknown log level verbose, using DEBUG" in caplog.text
+    # the fallback is a level RecentLogs can compare with
+    recent = log_wrapper.RecentLogs(size=1, level=log_wrapper.level_of("verbose"))
+    assert recent.isEnabledFor(logging.INFO, "cn")
@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+import os
+import sys
+import threading
+
+try:
+    import operator_logging
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import operator_logging
+from log_wrapper import LogWrapper
+
+
+def make_logger(name):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    logger.handlers[:] = [handler]
+    return logger, stream
+
+
+def test_json_format_has_log_wrapper_fields():
+    logger, stream = make_logger("test_operator_logging.json")
+    operator_logging.setup(log_queue=False, log_format="json", logger=logger)
+
+    logw = LogWrapper(
+        logger,
+        function_name="createAPIResource",
+        handler_name="coreAPIs",
+        resource_name="r1-productcatalogmanagement",
+        component_name="r1-productcatalogmanagement",
+    )
+    logw.info("API Resource created", "r1-productcatalogmanagement-tmf620")
+    logger.warning("plain %s", "message", extra={"subject": "listener"})
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["level"] == "INFO"
+    assert first["logger"] == "test_operator_logging.json"
+    assert (
+        first["message"] == "API Resource created: r1-productcatalogmanagement-tmf620"
+    )
+    assert first["component"] == "r1-productcatalogmanagement"
+    assert first["resource"] == "r1-productcatalogmanagement"
+    assert first["handler"] == "coreAPIs"
+    assert first["function"] == "createAPIResource"
+    assert "time" in first
+    assert second["message"] == "plain message"
+    assert second["subject"] == "listener"
+    assert "component" not in second
+
+
+def test_queue_writes_from_background_thread():
+    logger, stream = make_logger("test_operator_logging.queue")
+    threads = []
+
+    class RecordingHandler(logging.Handler):
+        def emit(self, record):
+            threads.append(threading.current_thread())
+
+    logger.addHandler(RecordingHandler())
+    listener = operator_logging.setup(log_queue=True, log_format="text", logger=logger)
+    try:
+        assert [type(h) for h in logger.handlers] == [
+            operator_logging.PreparedQueueHandler
+        ]
+        values = {"ready": False}
+        logger.info("status %s", values)
+        # the message is merged when logging, not when it is written
+        values["ready"] = True
+    finally:
+        listener.stop()
+
+    assert stream.getvalue() == "INFO status {'ready': False}\n"
+    assert threads and threads[0] is not threading.current_thread()
@@ -0,0 +1,152 @@
+import asyncio
+import http.server
+import json
+import os
+import sys
+import threading
+
+import kopf
+import kubernetes.client
+from kubernetes.client.rest import ApiException
+
+try:
+    import operator_metrics
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import operator_metrics
+import k8s_client
+
+
+def sample(metric, suffix, **labels):
+    for family in metric.collect():
+        for s in family.samples:
+            if s.name.endswith(suffix) and all(
+                s.labels.get(k) == v for k, v in labels.items()
+            ):
+                return s.value
+    return 0
+
+
+def test_resource_of():
+    assert operator_metrics.resource_of("/api/v1/namespaces") == "namespaces"
+    assert (
+        operator_metrics.resource_of(
+            "https://10.0.0.1:443/api/v1/namespaces/components/services/svc"
+        )
+        == "services"
+    )
+    assert (
+        operator_metrics.resource_of(
+            "http://localhost/apis/oda.tmforum.org/v1/namespaces/components/exposedapis/api/status?dryRun=All"
+        )
+        == "exposedapis"
+    )
+    assert (
+        operator_metrics.resource_of("/apis/oda.tmforum.org/v1/components?watch=1")
+        == "components"
+    )
+    assert operator_metrics.resource_of("/version") == "other"
+
+
+def test_instrument_counts_invocations_and_retries():
+    registry = kopf.OperatorRegistry()
+    calls = []
+
+    @kopf.on.create(
+        "oda.tmforum.org", "v1", "testmetrics", id="testMetricsSync", registry=registry
+    )
+    @kopf.on.update(
+        "oda.tmforum.org", "v1", "testmetrics", id="testMetricsSync", registry=registry
+    )
+    def testMetricsSync(**_):
+        calls.append("sync")
+        if len(calls) == 2:
+            raise kopf.TemporaryError("not ready", delay=1)
+        return "done"
+
+    @kopf.on.update(
+        "oda.tmforum.org", "v1", "testmetrics", id="testMetricsAsync", registry=registry
+    )
+    async def testMetricsAsync(**_):
+        calls.append("async")
+
+    operator_metrics.instrument(registry)
+    handlers = registry._changing.get_all_handlers()
+    sync_handlers = [h for h in handlers if h.id == "testMetricsSync"]
+    # registered for create and update, wrapped once
+    assert len(sync_handlers) == 2
+    assert sync_handlers[0].fn is sync_handlers[1].fn
+    assert sync_handlers[0].fn.__name__ == "testMetricsSync"
+
+    assert sync_handlers[0].fn() == "done"
+    try:
+        sync_handlers[1].fn()
+        assert False, "exception expected"
+    except kopf.TemporaryError:
+        pass
+    async_handler = [h for h in handlers if h.id == "testMetricsAsync"][0]
+    asyncio.run(async_handler.fn())
+
+    assert calls == ["sync", "sync", "async"]
+    invocations = operator_metrics.handler_invocations
+    assert sample(invocations, "_total", handler="testMetricsSync") == 2
+    assert sample(invocations, "_total", handler="testMetricsAsync") == 1
+    retries = operator_metrics.handler_retries
+    assert sample(retries, "_total", handler="testMetricsSync") == 1
+    assert sample(retries, "_total", handler="testMetricsAsync") == 0
+    duration = operator_metrics.handler_duration
+    assert sample(duration, "_count", handler="testMetricsSync") == 2
+    in_flight = operator_metrics.handlers_in_flight
+    assert sample(in_flight, "", handler="testMetricsSync") == 0
+
+
+def test_requests_are_counted_by_verb_resource_and_code():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path.endswith("/missing"):
+                self.send_response(404)
+                body = b"{}"
+            else:
+                self.send_response(200)
+                body = json.dumps({"kind": "ServiceList", "items": []}).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    k8s_client.add_request_listener(operator_metrics.observe_request)
+    try:
+        configuration = kubernetes.client.Configuration()
+        configuration.host = f"http://127.0.0.1:{server.server_address[1]}"
+        kubernetes.client.Configuration.set_default(configuration)
+        k8s_client.shutdown()
+
+        requests = operator_metrics.kubernetes_requests
+        labels = {"verb": "GET", "resource": "services"}
+        ok_before = sample(requests, "_total", code="200", **labels)
+        missing_before = sample(requests, "_total", code="404", **labels)
+
+        core_v1_api = k8s_client.api(kubernetes.client.CoreV1Api)
+        core_v1_api.list_namespaced_service("components")
+        try:
+            core_v1_api.read_namespaced_service("missing", "components")
+            assert False, "exception expected"
+        except ApiException as e:
+            assert e.status == 404
+
+        assert sample(requests, "_total", code="200", **labels) == ok_before + 1
+        assert sample(requests, "_total", code="404", **labels) == missing_before + 1
+    finally:
+        k8s_client._request_listeners.remove(operator_metrics.observe_request)
+        k8s_client.shutdown()
+        server.shutdown()
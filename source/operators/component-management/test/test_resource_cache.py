@@ -0,0 +1,158 @@
+import os
+import sys
+
+try:
+    import resource_cache
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import resource_cache
+
+LABEL = "oda.tmforum.org/componentName"
+
+
+def exposedapi(name, owner_uid, component, spec=None):
+    return {
+        "metadata": {
+            "name": name,
+            "namespace": "components",
+            "labels": {LABEL: component},
+            "ownerReferences": [{"kind": "Component", "uid": owner_uid}],
+        },
+        "spec": spec or {},
+    }
+
+
+def test_get_returns_copy_of_latest_version():
+    cache = resource_cache.ResourceCache()
+    assert cache.get("exposedapis", "components", "prodcat-tmf620") is None
+    cache.apply_event(
+        "exposedapis",
+        {"type": None, "object": exposedapi("prodcat-tmf620", "u1", "prodcat")},
+    )
+    cache.apply_event(
+        "exposedapis",
+        {
+            "type": "MODIFIED",
+            "object": exposedapi("prodcat-tmf620", "u1", "prodcat", {"path": "/v5"}),
+        },
+    )
+
+    obj = cache.get("exposedapis", "components", "prodcat-tmf620")
+    assert obj["spec"] == {"path": "/v5"}
+    obj["spec"]["path"] = "/changed"
+    assert cache.get("exposedapis", "components", "prodcat-tmf620")["spec"] == {
+        "path": "/v5"
+    }
+    assert cache.stats() == {
+        "objects": 1,
+        "tombstones": 0,
+        "hits": 2,
+        "misses": 1,
+        "stale": 0,
+    }
+
+
+def test_stale_events_are_ignored():
+    cache = resource_cache.ResourceCache()
+    written = exposedapi("prodcat-tmf620", "u1", "prodcat", {"path": "/v5"})
+    written["metadata"]["resourceVersion"] = "12"
+    # the response of a patch is stored before the watch events that were already on their way
+    cache.apply_event("exposedapis", {"type": "MODIFIED", "object": written})
+    older = exposedapi("prodcat-tmf620", "u1", "prodcat", {"path": "/v4"})
+    older["metadata"]["resourceVersion"] = "9"
+    cache.apply_event("exposedapis", {"type": "MODIFIED", "object": older})
+    assert cache.get("exposedapis", "components", "prodcat-tmf620")["spec"] == {
+        "path": "/v5"
+    }
+
+    newer = exposedapi("prodcat-tmf620", "u1", "prodcat", {"path": "/v6"})
+    newer["metadata"]["resourceVersion"] = "13"
+    cache.apply_event("exposedapis", {"type": "MODIFIED", "object": newer})
+    assert cache.get("exposedapis", "components", "prodcat-tmf620")["spec"] == {
+        "path": "/v6"
+    }
+    assert cache.stats()["stale"] == 1
+
+
+def test_deletes_remove_the_resource():
+    cache = resource_cache.ResourceCache()
+    for name in ["prodcat-tmf620", "prodcat-tmf671"]:
+        cache.apply_event(
+            "exposedapis",
+            {"type": "ADDED", "object": exposedapi(name, "u1", "prodcat")},
+        )
+    # a delete of the operator, without a resourceVersion
+    cache.apply_event(
+        "exposedapis",
+        {
+            "type": "DELETED",
+            "object": {
+                "metadata": {"namespace": "components", "name": "prodcat-tmf620"}
+            },
+        },
+    )
+    assert cache.get("exposedapis", "components", "prodcat-tmf620") is None
+    assert cache.get("exposedapis", "components", "prodcat-tmf671") is not None
+    assert cache.stats()["objects"] == 1
+
+
+def versioned(name, resource_version, spec=None):
+    body = exposedapi(name, "u1", "prodcat", spec)
+    body["metadata"]["resourceVersion"] = resource_version
+    return body
+
+
+def test_older_events_do_not_bring_back_a_deleted_resource():
+    cache = resource_cache.ResourceCache(max_tombstones=2)
+    cache.apply_event(
+        "exposedapis", {"type": "ADDED", "object": versioned("prodcat-tmf620", "10")}
+    )
+    cache.apply_event(
+        "exposedapis",
+        {"type": "DELETED", "object": versioned("prodcat-tmf620", "14")},
+    )
+    # the event of a change before the delete arrives late
+    cache.apply_event(
+        "exposedapis",
+        {"type": "MODIFIED", "object": versioned("prodcat-tmf620", "12")},
+    )
+    assert cache.get("exposedapis", "components", "prodcat-tmf620") is None
+    assert cache.stats()["stale"] == 1
+
+    # created again after the delete
+    cache.apply_event(
+        "exposedapis", {"type": "ADDED", "object": versioned("prodcat-tmf620", "15")}
+    )
+    assert cache.get("exposedapis", "components", "prodcat-tmf620") is not None
+    assert cache.stats()["tombstones"] == 0
+
+    # a delete of the operator, without a resourceVersion, keeps the cached one
+    cache.apply_event(
+        "exposedapis",
+        {
+            "type": "DELETED",
+            "object": {
+                "metadata": {"namespace": "components", "name": "prodcat-tmf620"}
+            },
+        },
+    )
+    cache.apply_event(
+        "exposedapis",
+        {"type": "MODIFIED", "object": versioned("prodcat-tmf620", "15")},
+    )
+    assert cache.get("exposedapis", "components", "prodcat-tmf620") is None
+
+    # the oldest tombstones are forgotten
+    for name in ["prodcat-tmf671", "prodcat-tmf688"]:
+        cache.apply_event(
+            "exposedapis", {"type": "DELETED", "object": versioned(name, "20")}
+        )
+    assert cache.stats()["tombstones"] == 2
+    cache.apply_event(
+        "exposedapis",
+        {"type": "MODIFIED", "object": versioned("prodcat-tmf620", "15")},
+    )
+    assert cache.get("exposedapis", "components", "prodcat-tmf620") is not None
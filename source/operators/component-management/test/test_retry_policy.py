@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+
+import kopf
+import pytest
+from kubernetes.client.rest import ApiException
+
+try:
+    import retry_policy
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import retry_policy
+
+
+def raise_while_handling(status, message):
+    try:
+        raise ApiException(status=status)
+    except ApiException:
+        raise kopf.TemporaryError(message)
+
+
+def test_error_class_of_wrapped_errors():
+    assert retry_policy.error_class(ApiException(status=409)) == retry_policy.CONFLICT
+    assert (
+        retry_policy.error_class(kopf.TemporaryError(ApiException(status=503)))
+        == retry_policy.SERVER
+    )
+    with pytest.raises(kopf.TemporaryError) as e:
+        raise_while_handling(404, "Cannot find parent component r1")
+    assert retry_policy.error_class(e.value) == retry_policy.NOT_FOUND
+    assert (
+        retry_policy.error_class(kopf.TemporaryError(ConnectionRefusedError()))
+        == retry_policy.SERVER
+    )
+    assert retry_policy.error_class(kopf.TemporaryError("no status")) == (
+        retry_policy.OTHER
+    )
+
+
+def test_backoff_is_exponential_with_jitter_and_capped():
+    base, maximum = retry_policy.DELAYS[retry_policy.NOT_FOUND]
+    for retry in range(4):
+        delay = retry_policy.backoff(retry_policy.NOT_FOUND, retry)
+        assert base * 2**retry / 2 <= delay <= base * 2**retry
+    assert maximum / 2 <= retry_policy.backoff(retry_policy.NOT_FOUND, 50) <= maximum
+    assert retry_policy.backoff(retry_policy.CONFLICT, 0, exhausted=True) >= (
+        retry_policy.DELAYS[retry_policy.CONFLICT][1] / 2
+    )
+
+
+def test_budget_limits_retries_to_a_share_of_calls():
+    budget = retry_policy.RetryBudget(ratio=0.5, minimum=2, window=60)
+    assert budget.try_retry() and budget.try_retry()
+    assert not budget.try_retry()
+    for _ in range(10):
+        budget.record_call()
+    assert [budget.try_retry() for _ in range(4)] == [True, True, True, False]
+    assert budget.stats["exhausted"] == 2
+
+
+def test_adapted_handler_sets_the_delay(monkeypatch):
+    monkeypatch.setattr(retry_policy, "budget", retry_policy.RetryBudget(minimum=100))
+
+    @retry_policy.adapt_handler
+    async def conflicting(**_):
+        raise kopf.TemporaryError(ApiException(status=409))
+
+    @retry_policy.adapt_handler
+    def explicit(**_):
+        raise kopf.TemporaryError("wait", delay=7)
+
+    @retry_policy.adapt_handler
+    def explicit_default(**_):
+        raise kopf.TemporaryError("wait", delay=60)
+
+    with pytest.raises(kopf.TemporaryError) as e:
+        asyncio.run(conflicting(retry=2))
+    assert 2 <= e.value.delay <= 4
+    with pytest.raises(kopf.TemporaryError) as e:
+        explicit(retry=0)
+    assert e.value.delay == 7
+    # the same value as the default delay of kopf, but explicit
+    with pytest.raises(kopf.TemporaryError) as e:
+        explicit_default(retry=0)
+    assert e.value.delay == 60
+    assert retry_policy.budget.stats == {"calls": 3, "retries": 3, "exhausted": 0}
+
+
+def test_default_delay_is_marked_once():
+    assert kopf.TemporaryError("wait").delay == retry_policy.DEFAULT_DELAY == 60
+    assert retry_policy.DEFAULT_DELAY.is_default_delay
+    retry_policy.mark_default_delay()
+    assert kopf.TemporaryError.__init__.__defaults__[-1] is retry_policy.DEFAULT_DELAY
+    assert not getattr(kopf.TemporaryError("wait", 60).delay, "is_default_delay", False)
@@ -0,0 +1,277 @@
+import asyncio
+import datetime
+import os
+import sys
+import types
+
+import urllib3
+from kubernetes.client.rest import ApiException
+
+try:
+    import sharding
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import sharding
+
+COMPONENT_LABEL = "oda.tmforum.org/componentName"
+
+
+class FakeCoordinationApi:
+    def __init__(self):
+        self.leases = {}
+        self.version = 0
+
+    def _store(self, body):
+        self.version += 1
+        body.metadata.resource_version = str(self.version)
+        self.leases[body.metadata.name] = body
+
+    def list_namespaced_lease(self, namespace, label_selector):
+        return types.SimpleNamespace(items=list(self.leases.values()))
+
+    def read_namespaced_lease(self, name, namespace):
+        if name not in self.leases:
+            raise ApiException(status=404)
+        return self.leases[name]
+
+    def create_namespaced_lease(self, namespace, body):
+        if body.metadata.name in self.leases:
+            raise ApiException(status=409)
+        self._store(body)
+
+    def replace_namespaced_lease(self, name, namespace, body):
+        if name not in self.leases:
+            raise ApiException(status=404)
+        if (
+            self.leases[name].metadata.resource_version
+            != body.metadata.resource_version
+        ):
+            raise ApiException(status=409)
+        self._store(body)
+
+    def delete_namespaced_lease(self, name, namespace):
+        if self.leases.pop(name, None) is None:
+            raise ApiException(status=404)
+
+
+class UnreachableCoordinationApi(FakeCoordinationApi):
+    """Fails the next ``failures`` lists with a connection error, advancing a clock by ``step`` per list."""
+
+    def __init__(self, clock, step):
+        super().__init__()
+        self.clock = clock
+        self.step = step
+        self.failures = 0
+
+    def list_namespaced_lease(self, namespace, label_selector):
+        self.clock["now"] += self.step
+        if self.failures:
+            self.failures -= 1
+            raise urllib3.exceptions.MaxRetryError(None, "/leases", "unreachable")
+        return super().list_namespaced_lease(namespace, label_selector)
+
+
+def fake_coordination_api(monkeypatch, coordination_api=None):
+    coordination_api = coordination_api or FakeCoordinationApi()
+    monkeypatch.setattr(sharding.k8s_client, "api", lambda api_class: coordination_api)
+
+    async def call(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(sharding.k8s_client, "call", call)
+    return coordination_api
+
+
+def holders(coordination_api):
+    return {
+        name: lease.spec.holder_identity
+        for name, lease in coordination_api.leases.items()
+        if lease.metadata.labels[sharding.ROLE_LABEL] == sharding.ROLE_SHARD
+    }
+
+
+def test_sharding_keys():
+    assert sharding.shard_of("ctk-productcatalog", 8) == sharding.shard_of(
+        "ctk-productcatalog", 8
+    )
+    assert {sharding.shard_of(f"component-{i}", 4) for i in range(40)} == {0, 1, 2, 3}
+
+    shards = sharding.ShardOwnership(COMPONENT_LABEL, shards=4)
+    component = {"metadata": {"name": "ctk-productcatalog", "namespace": "components"}}
+    labelled = {
+        "metadata": {
+            "name": "ctk-productcatalog-partyrole",
+            "labels": {COMPONENT_LABEL: "ctk-productcatalog"},
+        }
+    }
+    owned = {
+        "metadata": {
+            "name": "ctk-productcatalog-metrics",
+            "ownerReferences": [{"kind": "Component", "name": "ctk-productcatalog"}],
+        }
+    }
+    assert shards.key_of(component, "components") == "ctk-productcatalog"
+    assert shards.key_of(labelled, "exposedapis") == "ctk-productcatalog"
+    assert shards.key_of(owned, "services") == "ctk-productcatalog"
+
+    by_namespace = sharding.ShardOwnership(
+        COMPONENT_LABEL, shards=4, key=sharding.KEY_NAMESPACE
+    )
+    assert by_namespace.key_of(component, "components") == "components"
+
+    assert sharding.ShardOwnership(COMPONENT_LABEL, shards=1).owns(component, "x")
+    assert not shards.owns(component, "components")
+
+
+def test_shards_are_shared_when_a_replica_joins_and_taken_when_it_leaves(
+    monkeypatch,
+):
+    coordination_api = fake_coordination_api(monkeypatch)
+
+    async def run():
+        first = sharding.ShardOwnership(
+            COMPONENT_LABEL, shards=4, identity="operator-a", namespace="canvas"
+        )
+        second = sharding.ShardOwnership(
+            COMPONENT_LABEL, shards=4, identity="operator-b", namespace="canvas"
+        )
+        assert await first.reconcile()
+        alone = first.owned
+
+        # the second replica joins: nothing is free until the first one releases its surplus
+        assert not await second.reconcile()
+        assert await first.reconcile()
+        assert await second.reconcile()
+        shared = (first.owned, second.owned)
+        assert not await first.reconcile()
+        assert not await second.reconcile()
+
+        # the second replica leaves
+        await second.release()
+        assert await first.reconcile()
+        return alone, shared, first.owned
+
+    alone, (first_owned, second_owned), rejoined = asyncio.run(run())
+    assert alone == {0, 1, 2, 3}
+    assert len(first_owned) == len(second_owned) == 2
+    assert first_owned | second_owned == {0, 1, 2, 3}
+    assert rejoined == {0, 1, 2, 3}
+    assert set(holders(coordination_api).values()) == {"operator-a"}
+    assert "component-operator-shard-member-operator-b" not in coordination_api.leases
+
+
+def test_watch_stream_drops_the_objects_of_other_shards():
+    shards = sharding.ShardOwnership(COMPONENT_LABEL, shards=4)
+    names = [f"component-{i}" for i in range(12)]
+    shards.owned = frozenset({sharding.shard_of(names[0], 4)})
+
+    async def infinite_watch(*, resource, **_):
+        for name in names:
+            yield {"type": "ADDED", "object": {"metadata": {"name": name}}}
+
+    async def run():
+        watch = shards._filtered_watch(infinite_watch)
+        return [
+            raw_event["object"]["metadata"]["name"]
+            async for raw_event in watch(
+                resource=types.SimpleNamespace(plural="components")
+            )
+        ]
+
+    seen = asyncio.run(run())
+    assert seen[0] == names[0]
+    assert seen == [
+        name
+        for name in names
+        if shards.owns({"metadata": {"name": name}}, "components")
+    ]
+    assert len(seen) < len(names)
+
+
+def run_until(shards, done):
+    """Runs the renewals of ``shards`` until ``done()``, then cancels them."""
+
+    async def run():
+        task = asyncio.get_running_loop().create_task(shards.run())
+        for _ in range(5000):
+            if done():
+                break
+            if task.done():
+                task.result()  # the renewals have stopped: raise their error
+            await asyncio.sleep(0.001)
+        else:
+            raise AssertionError("timed out")
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+
+
+LEASE_DURATION = 0.1
+RENEW_INTERVAL = 0.03
+
+
+def unreachable_shards(monkeypatch):
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    clock = {"now": 0.0}
+    monkeypatch.setattr(
+        sharding, "_now", lambda: start + datetime.timedelta(seconds=clock["now"])
+    )
+    coordination_api = UnreachableCoordinationApi(clock, step=RENEW_INTERVAL)
+    fake_coordination_api(monkeypatch, coordination_api)
+    shards = sharding.ShardOwnership(
+        COMPONENT_LABEL,
+        shards=2,
+        identity="operator-a",
+        namespace="canvas",
+        lease_duration=LEASE_DURATION,
+        renew_interval=RENEW_INTERVAL,
+    )
+    relists = []
+
+    async def relist():
+        relists.append((clock["now"], shards.owned))
+
+    shards._relist = relist
+    return shards, coordination_api, relists
+
+
+def test_renewals_survive_connection_errors(monkeypatch):
+    shards, coordination_api, relists = unreachable_shards(monkeypatch)
+    assert asyncio.run(shards.reconcile())
+    coordination_api.failures = 2
+    renewed = []
+
+    def renewed_after_the_errors():
+        if coordination_api.failures == 0 and shards._renewed == sharding._now():
+            renewed.append(shards.owned)
+        return renewed
+
+    # shorter than the lease: the shards are kept, and renewed again once the API server is back
+    run_until(shards, renewed_after_the_errors)
+    assert renewed == [{0, 1}]
+    assert relists == []
+    # released when the renewals are cancelled
+    assert set(holders(coordination_api).values()) == {None}
+
+
+def test_shards_are_dropped_before_their_leases_expire_and_taken_again(
+    monkeypatch,
+):
+    shards, coordination_api, relists = unreachable_shards(monkeypatch)
+    assert asyncio.run(shards.reconcile())
+    renewed = coordination_api.clock["now"]
+
+    coordination_api.failures = 5
+    run_until(shards, lambda: len(relists) == 2)
+    (dropped_at, dropped), (_, rejoined) = relists
+    assert dropped == frozenset()
+    # dropped at the last renewal before the Leases expire, the other replicas can take them after
+    assert LEASE_DURATION - RENEW_INTERVAL < dropped_at - renewed < LEASE_DURATION
+    assert rejoined == {0, 1}
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import kopf
+
+try:
+    import spec_checkpoint
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import spec_checkpoint
+
+
+SPEC = {
+    "coreFunction": {"exposedAPIs": [{"name": "productcatalogmanagement"}]},
+    "securityFunction": {"canvasSystemRole": "Admin"},
+}
+
+
+def test_hash_ignores_key_order_and_includes_version():
+    reordered = {
+        "securityFunction": {"canvasSystemRole": "Admin"},
+        "coreFunction": {"exposedAPIs": [{"name": "productcatalogmanagement"}]},
+    }
+    assert spec_checkpoint.spec_hash(SPEC) == spec_checkpoint.spec_hash(reordered)
+    assert spec_checkpoint.spec_hash(SPEC, "v1") != spec_checkpoint.spec_hash(
+        SPEC, "v2"
+    )
+    changed = {**SPEC, "securityFunction": {"canvasSystemRole": "Reader"}}
+    assert spec_checkpoint.spec_hash(SPEC) != spec_checkpoint.spec_hash(changed)
+
+
+def test_record_and_is_reconciled():
+    patch = kopf.Patch()
+    spec_checkpoint.record(patch, "coreAPIs", SPEC)
+    spec_checkpoint.record(patch, "managementAPIs", SPEC)
+    status = {"coreAPIs": [], **patch["status"]}
+
+    assert set(status[spec_checkpoint.STATUS_FIELD]) == {"coreAPIs", "managementAPIs"}
+    assert spec_checkpoint.is_reconciled(status, "coreAPIs", SPEC)
+    assert not spec_checkpoint.is_reconciled(status, "securityAPIs", SPEC)
+    changed = {**SPEC, "coreFunction": {"exposedAPIs": []}}
+    assert not spec_checkpoint.is_reconciled(status, "coreAPIs", changed)
+    assert not spec_checkpoint.is_reconciled(None, "coreAPIs", SPEC)
+
+
+def test_spec_is_recorded_only_after_a_clean_success():
+    patch = kopf.Patch()
+    with spec_checkpoint.reconciling(patch, "coreAPIs", SPEC):
+        spec_checkpoint.mark_failed()
+    try:
+        with spec_checkpoint.reconciling(patch, "managementAPIs", SPEC):
+            raise kopf.TemporaryError("retry")
+    except kopf.TemporaryError:
+        pass
+    assert spec_checkpoint.STATUS_FIELD not in patch.get("status", {})
+
+    # the failure of one handler does not leak into the next one
+    with spec_checkpoint.reconciling(patch, "securityAPIs", SPEC):
+        pass
+    assert set(patch.status[spec_checkpoint.STATUS_FIELD]) == {"securityAPIs"}
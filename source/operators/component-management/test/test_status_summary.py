@@ -0,0 +1,119 @@
+import os
+import sys
+import unittest
+
+try:
+    import status_summary
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+    import status_summary
+
+
+def api(url, ready, developerUI=None):
+    entry = {"url": url, "ready": ready}
+    if developerUI:
+        entry["developerUI"] = developerUI
+    return entry
+
+
+class TestStatusSummarizer(unittest.TestCase):
+    def status(self):
+        return {
+            "coreAPIs": [
+                api("http://core/a", True, "http://core/a/ui"),
+                api("http://core/b", True),
+            ],
+            "managementAPIs": [api("http://mgmt", True, "http://mgmt/ui")],
+            "securityAPIs": [api("http://sec", True)],
+            "coreDependentAPIs": [api("http://dep", True)],
+            "securitySecretsManagement": {"ready": True},
+            "identityConfig": {"identityProvider": "Keycloak"},
+        }
+
+    def test_summary_format(self):
+        summary, complete, desired = status_summary.StatusSummarizer().summarize(
+            ("ns", "comp"), self.status()
+        )
+        self.assertEqual(summary["coreAPIsummary"], "http://core/a http://core/b ")
+        self.assertEqual(summary["coreDependentAPIsummary"], "http://dep ")
+        self.assertEqual(
+            summary["developerUIsummary"], "http://core/a/ui http://mgmt/ui "
+        )
+        self.assertEqual(summary["securitySecretsManagementSummary"], "ready")
+        self.assertEqual(summary["deployment_status"], "Complete")
+        self.assertEqual((complete, desired), (4, 4))
+
+    def test_deployment_status_progression(self):
+        summarizer = status_summary.StatusSummarizer()
+        status = self.status()
+        status["coreDependentAPIs"][0]["ready"] = False
+        self.assertEqual(
+            summarizer.summarize("c", status)[0]["deployment_status"],
+            "In-Progress-DepApi",
+        )
+        status["securitySecretsManagement"] = {"ready": False}
+        self.assertEqual(
+            summarizer.summarize("c", status)[0]["deployment_status"],
+            "In-Progress-SecretMan",
+        )
+        status["identityConfig"]["identityProvider"] = "Not set"
+        self.assertEqual(
+            summarizer.summarize("c", status)[0]["deployment_status"],
+            "In-Progress-IDConfOp",
+        )
+        status["coreAPIs"][1]["ready"] = False
+        self.assertEqual(
+            summarizer.summarize("c", status)[0]["deployment_status"],
+            "In-Progress-CompCon",
+        )
+
+    def test_only_changed_sections_are_recomputed(self):
+        summarizer = status_summary.StatusSummarizer()
+        status = self.status()
+        summarizer.summarize("c", status)
+        self.assertEqual((summarizer.computed, summarizer.reused), (4, 0))
+        summarizer.summarize("c", status)
+        self.assertEqual((summarizer.computed, summarizer.reused), (4, 4))
+        status["managementAPIs"][0]["ready"] = False
+        summary, complete, _ = summarizer.summarize("c", status)
+        self.assertEqual((summarizer.computed, summarizer.reused), (5, 7))
+        self.assertEqual(complete, 3)
+        self.assertEqual(summary["deployment_status"], "In-Progress-CompCon")
+
+    def test_deleted_components_are_forgotten(self):
+        summarizer = status_summary.StatusSummarizer()
+        summarizer.summarize(("ns", "a"), self.status())
+        summarizer.summarize(("ns", "b"), self.status())
+        summarizer.forget(("ns", "a"))
+        summarizer.summarize(("ns", "a"), self.status())
+        summarizer.summarize(("ns", "b"), self.status())
+        self.assertEqual((summarizer.computed, summarizer.reused), (12, 4))
+        self.assertEqual(len(summarizer._sections), 8)
+        summarizer.forget(("ns", "a"))
+        summarizer.forget(("ns", "b"))
+        self.assertEqual(summarizer._sections, {})
+
+    def test_summary_with_stages_is_stable(self):
+        summarizer = status_summary.StatusSummarizer()
+        status = self.status()
+        status["securityAPIs"][0]["name"] = "comp-partyrole"
+        first, _, _ = summarizer.summarize(
+            "c", status, party_role_api="comp-partyrole", created="2024-01-01T10:00:00Z"
+        )
+        self.assertEqual(
+            first["stages"]["exposedAPIs"]["started"], "2024-01-01T10:00:00Z"
+        )
+        self.assertIn("started", first["stages"]["identityConfig"])
+        second, _, _ = summarizer.summarize(
+            "c", status, previous=first, party_role_api="comp-partyrole"
+        )
+        self.assertEqual(first, second)
+
+        status["securityAPIs"][0]["ready"] = False
+        status.pop("identityConfig")
+        third, _, _ = summarizer.summarize("c", status, party_role_api="comp-partyrole")
+        self.assertNotIn("identityConfig", third["stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+import types
+
+from kubernetes.client.rest import ApiException
+
+try:
+    import watch_checkpoint
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import watch_checkpoint
+
+
+class FakeCoreApi:
+    def __init__(self):
+        self.configmaps = {}
+        self.writes = []
+
+    def read_namespaced_config_map(self, name, namespace):
+        if (namespace, name) not in self.configmaps:
+            raise ApiException(status=404)
+        return types.SimpleNamespace(data=dict(self.configmaps[(namespace, name)]))
+
+    def create_namespaced_config_map(self, namespace, body):
+        self.writes.append("create")
+        self.configmaps[(namespace, body["metadata"]["name"])] = dict(body["data"])
+
+    def patch_namespaced_config_map(self, name, namespace, body):
+        self.writes.append("patch")
+        self.configmaps[(namespace, name)].update(body["data"])
+
+
+def test_checkpoint_is_only_written_when_changed(monkeypatch):
+    core_api = FakeCoreApi()
+    monkeypatch.setattr(watch_checkpoint.k8s_client, "api", lambda api_class: core_api)
+
+    async def call(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(watch_checkpoint.k8s_client, "call", call)
+
+    async def run():
+        checkpoint = watch_checkpoint.ConfigMapCheckpoint("adoption", "components")
+        assert await checkpoint.load() == {}
+        checkpoint.update({"services": "100", "secret": None})
+        await checkpoint.save()
+        await checkpoint.save()
+        checkpoint.update({"services": "100"})
+        await checkpoint.save()
+        checkpoint.update({"services": "120", "secret": "7"})
+        await checkpoint.save()
+
+        restarted = watch_checkpoint.ConfigMapCheckpoint("adoption", "components")
+        return checkpoint.writes, await restarted.load()
+
+    writes, loaded = asyncio.run(run())
+    assert writes == 2
+    assert core_api.writes == ["create", "patch"]
+    assert loaded == {"services": "120", "secret": "7"}
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import inspect
+import os
+import sys
+from urllib.parse import parse_qs, urlparse
+
+import kopf
+from kopf._cogs.clients import api, fetching, watching
+from kopf._cogs.clients.watching import Bookmark
+from kopf._cogs.structs import references
+
+try:
+    import watch_continuation
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import watch_continuation
+
+
+# the watching module of kopf 1.37.2, which continuous_watch replaces a function of
+KOPF_WATCHING_SHA256 = (
+    "8797e6182bad035238b8103b1c7f599d9a256e6f1b154e408ad931c131fb224a"
+)
+
+RESOURCE = references.Resource("oda.tmforum.org", "v1", "components", namespaced=True)
+
+
+def obj(name, resource_version):
+    return {"metadata": {"name": name, "resourceVersion": resource_version}}
+
+
+class FakeApiServer:
+    """Answers the list with one object and each WATCH request with the next scripted response."""
+
+    def __init__(self, watches):
+        self.watches = list(watches)
+        self.lists = 0
+        self.params = []
+
+    async def list_objs(self, **_):
+        self.lists += 1
+        return [obj("c1", "10")], "10"
+
+    async def stream(self, url, **_):
+        self.params.append({k: v[0] for k, v in parse_qs(urlparse(url).query).items()})
+        events = self.watches.pop(0) if self.watches else None
+        if events is None:
+            # a stream that hangs without sending anything
+            await asyncio.sleep(3600)
+        for event in events:
+            yield event
+
+
+def run_watch(monkeypatch, server, max_events=10):
+    monkeypatch.setattr(watch_continuation.fetching, "list_objs", server.list_objs)
+    monkeypatch.setattr(watch_continuation.api, "stream", server.stream)
+    settings = kopf.OperatorSettings()
+    watch_continuation.setup(settings)
+
+    async def collect():
+        stopper = asyncio.get_running_loop().create_future()
+        events = []
+        async for event in watch_continuation.continuous_watch(
+            settings=settings,
+            resource=RESOURCE,
+            namespace="components",
+            operator_pause_waiter=stopper,
+        ):
+            events.append(event)
+            if len(events) >= max_events:
+                break
+        return events
+
+    return asyncio.run(collect())
+
+
+def test_bookmarks_continue_the_watch_without_listing(monkeypatch):
+    server = FakeApiServer(
+        [
+            [{"type": "BOOKMARK", "object": obj("", "15")}],
+            # the first WATCH request has timed out, the second continues from the bookmark
+            [{"type": "MODIFIED", "object": obj("c1", "20")}],
+            [{"type": "ERROR", "object": {"code": 410, "reason": "Expired"}}],
+        ]
+    )
+    events = run_watch(monkeypatch, server)
+
+    assert events[0]["type"] is None
+    assert events[1] is Bookmark.LISTED
+    assert [event["type"] for event in events[2:]] == ["MODIFIED"]
+    assert server.lists == 1
+    assert [p["resourceVersion"] for p in server.params] == ["10", "15", "20"]
+    assert all(p["allowWatchBookmarks"] == "true" for p in server.params)
+    assert server.params[0]["timeoutSeconds"] == str(
+        watch_continuation.WATCH_SERVER_TIMEOUT
+    )
+
+
+def test_stalled_stream_is_listed_again(monkeypatch):
+    monkeypatch.setattr(watch_continuation, "WATCH_STALL_TIMEOUT", 0.05)
+    stalls = watch_continuation.stats["stalls"]
+    server = FakeApiServer([[{"type": "ADDED", "object": obj("c2", "11")}], None])
+    events = run_watch(monkeypatch, server)
+
+    # the watch-stream returns, kopf then lists the objects again
+    assert [event["type"] for event in events[2:]] == ["ADDED"]
+    assert watch_continuation.stats["stalls"] == stalls + 1
+    assert [p["resourceVersion"] for p in server.params] == ["10", "11"]
+
+
+def test_setup_can_keep_the_legacy_server_timeout():
+    settings = kopf.OperatorSettings()
+    assert not watch_continuation.setup(settings, enabled=False)
+    assert settings.watching.server_timeout == 60
+
+
+def parameters(func):
+    return list(inspect.signature(func).parameters)
+
+
+def test_replaced_kopf_internals_are_unchanged():
+    """Fails on a kopf upgrade that changes the watch-stream, review continuous_watch before updating the pin."""
+    source = inspect.getsource(watching)  # read from the file, not affected by setup()
+    assert hashlib.sha256(source.encode()).hexdigest() == KOPF_WATCHING_SHA256
+    assert "stream = continuous_watch(" in inspect.getsource(watching.infinite_watch)
+    assert parameters(watch_continuation.continuous_watch) == [
+        "settings",
+        "resource",
+        "namespace",
+        "operator_pause_waiter",
+    ]
+    assert parameters(fetching.list_objs) == [
+        "settings",
+        "resource",
+        "namespace",
+        "logger",
+    ]
+    assert parameters(api.stream) == [
+        "url",
+        "settings",
+        "payload",
+        "headers",
+        "timeout",
+        "stopper",
+        "logger",
+    ]
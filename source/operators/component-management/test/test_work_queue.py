@@ -0,0 +1,210 @@
+import asyncio
+import dataclasses
+import hashlib
+import inspect
+import os
+import sys
+import threading
+
+import kopf
+import prometheus_client
+import pytest
+from kopf._core.intents import handlers as kopf_handlers
+from kopf._core.intents import registries
+from kubernetes.client.rest import ApiException
+
+try:
+    import work_queue
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import work_queue
+
+
+# the registries and handlers modules of kopf 1.37.2, whose handlers work_queue, operator_metrics and retry_policy wrap
+KOPF_REGISTRIES_SHA256 = (
+    "3b2a252f602649c7480b65af36f345bc70926bad2c554333d3442e6e977b6ab4"
+)
+KOPF_HANDLERS_SHA256 = (
+    "da8b8ca19d0e7bed60dcab91db5176430ad1d028f516ab920ec315580d0f31c5"
+)
+
+
+def test_waiting_work_starts_by_priority():
+    async def scenario():
+        work = work_queue.WorkQueue(concurrency=1)
+        started = []
+
+        async def run(cls, name):
+            async with work.slot(cls):
+                started.append(name)
+                await asyncio.sleep(0)
+
+        await work.acquire(work_queue.RESUME)
+        tasks = [
+            asyncio.create_task(run(work_queue.RESUME, "resume")),
+            asyncio.create_task(run(work_queue.STATUS, "status")),
+            asyncio.create_task(run(work_queue.CHANGE, "create")),
+            asyncio.create_task(run(work_queue.CHANGE, "update")),
+        ]
+        await asyncio.sleep(0)
+        assert work.depth(work_queue.CHANGE) == 2
+        work.release(work_queue.RESUME)
+        await asyncio.gather(*tasks)
+        return started
+
+    assert asyncio.run(scenario()) == ["create", "update", "status", "resume"]
+
+
+def test_class_limit_leaves_slots_to_other_classes():
+    async def scenario():
+        work = work_queue.WorkQueue(concurrency=3, limits={work_queue.RESUME: 1})
+        await work.acquire(work_queue.RESUME)
+        waiting_resume = asyncio.create_task(work.acquire(work_queue.RESUME))
+        await asyncio.sleep(0)
+        # the second resume waits for the resume slot, a change starts at once
+        await asyncio.wait_for(work.acquire(work_queue.CHANGE), 1)
+        assert not waiting_resume.done()
+        waiting_resume.cancel()
+        await asyncio.sleep(0)
+        assert work.depth(work_queue.RESUME) == 0
+        return dict(work.in_flight)
+
+    assert asyncio.run(scenario()) == {"change": 1, "status": 0, "resume": 1}
+
+
+def test_queued_handlers_by_reason_and_field():
+    registry = kopf.OperatorRegistry()
+    threads = []
+
+    @kopf.on.create(
+        "oda.tmforum.org", "v1", "components", id="syncHandler", registry=registry
+    )
+    @kopf.on.resume(
+        "oda.tmforum.org", "v1", "components", id="syncHandler", registry=registry
+    )
+    def syncHandler(reason, **_):
+        threads.append(threading.current_thread())
+        return reason
+
+    @kopf.on.field(
+        "oda.tmforum.org",
+        "v1",
+        "components",
+        field="status",
+        id="statusHandler",
+        registry=registry,
+    )
+    async def statusHandler(**_):
+        return "status"
+
+    work = work_queue.setup(concurrency=2, registry=registry)
+    handlers = {
+        (handler.id, handler.reason): handler
+        for handler in registry._changing.get_all_handlers()
+    }
+    queued = handlers[("syncHandler", "create")].fn
+    assert queued is handlers[("syncHandler", None)].fn
+    # kopf awaits the wrapper of a sync handler, which runs it in a thread
+    assert kopf._core.actions.invocation.is_async_fn(queued)
+
+    status_handler = handlers[("statusHandler/status", None)]
+    assert work_queue.work_class(status_handler, "update") == work_queue.STATUS
+    assert work_queue.work_class(status_handler, "resume") == work_queue.RESUME
+
+    async def invoke():
+        return [
+            await queued(reason="resume"),
+            await status_handler.fn(reason="update"),
+        ]
+
+    assert asyncio.run(invoke()) == ["resume", "status"]
+    assert threads and threads[0] is not threading.current_thread()
+    assert work.in_flight == {"change": 0, "status": 0, "resume": 0}
+
+
+def test_wrappers_compose_in_order(monkeypatch):
+    registry = kopf.OperatorRegistry()
+    monkeypatch.setattr(
+        work_queue.retry_policy, "budget", work_queue.retry_policy.RetryBudget(100)
+    )
+    monkeypatch.setattr(
+        work_queue.operator_metrics.prometheus_client,
+        "start_http_server",
+        lambda port: None,
+    )
+    monkeypatch.setattr(
+        work_queue.operator_metrics.k8s_client, "add_request_listener", lambda _: None
+    )
+    during = []
+
+    def sample(name):
+        return (
+            prometheus_client.REGISTRY.get_sample_value(
+                name, {"handler": "composedHandler"}
+            )
+            or 0
+        )
+
+    @kopf.on.create(
+        "oda.tmforum.org", "v1", "components", id="composedHandler", registry=registry
+    )
+    @kopf.on.update(
+        "oda.tmforum.org", "v1", "components", id="composedHandler", registry=registry
+    )
+    async def composedHandler(retry, **_):
+        during.append((dict(work.in_flight), sample("oda_operator_handlers_in_flight")))
+        if not retry:
+            raise kopf.TemporaryError(ApiException(status=409))
+        return "done"
+
+    invocations = sample("oda_operator_handler_invocations_total")
+    retries = sample("oda_operator_handler_retries_total")
+    work = work_queue.wrap_handlers(concurrency=1, metrics_port=9, registry=registry)
+    handlers = registry._changing.get_all_handlers()
+    # one wrapper for the create and the update, so kopf still invokes the function once per cause
+    assert len(handlers) == 2 and handlers[0].fn is handlers[1].fn
+    composed = handlers[0].fn
+
+    with pytest.raises(kopf.TemporaryError) as e:
+        asyncio.run(composed(retry=0, reason="create"))
+    assert e.value.delay is not None  # set by the retry policy
+    assert asyncio.run(composed(retry=1, reason="update")) == "done"
+
+    # the handler ran holding a slot, inside the metrics
+    assert during == [({"change": 1, "status": 0, "resume": 0}, 1)] * 2
+    assert work.in_flight == {"change": 0, "status": 0, "resume": 0}
+    assert sample("oda_operator_handler_invocations_total") - invocations == 2
+    assert sample("oda_operator_handler_retries_total") - retries == 1
+    assert work_queue.retry_policy.budget.stats["retries"] == 1
+
+
+def test_wrapped_kopf_internals_are_unchanged():
+    """Fails on a kopf upgrade that changes the registries or the handlers, review the wrappers before updating the pin."""
+    for module, digest in [
+        (registries, KOPF_REGISTRIES_SHA256),
+        (kopf_handlers, KOPF_HANDLERS_SHA256),
+    ]:
+        source = inspect.getsource(module)
+        assert hashlib.sha256(source.encode()).hexdigest() == digest
+    registry = kopf.OperatorRegistry()
+    names = set(work_queue.operator_metrics.REGISTRIES) | set(
+        work_queue.retry_policy.REGISTRIES
+    )
+    for name in names:
+        assert callable(getattr(registry, name).get_all_handlers)
+    for cls in [
+        kopf_handlers.ChangingHandler,
+        kopf_handlers.SpawningHandler,
+        kopf_handlers.WatchingHandler,
+        kopf_handlers.WebhookHandler,
+        kopf_handlers.IndexingHandler,
+    ]:
+        assert cls.__dataclass_params__.frozen
+        assert {"id", "fn"} <= {field.name for field in dataclasses.fields(cls)}
+    # the wrappers are shared by function and id, as kopf deduplicates the handlers
+    assert "key = (id(handler.fn), handler.id)" in inspect.getsource(
+        registries._deduplicated
+    )
@@ -0,0 +1,102 @@
+"""Checkpoint of watch progress in a single ConfigMap.
+
+kopf keeps the state of its handlers in annotations on every object it handles
+(``kopf.zalando.org/last-handled-configuration`` and progress annotations), so handling an
+object costs extra writes to that object. The label-selected adoption watches keep their state
+in memory instead, and optionally save the resourceVersion reached by each watch in one
+ConfigMap. After a restart the watches continue from there instead of listing all objects again.
+The ConfigMap is written at most once per interval, whatever the number of objects handled.
+"""
+
+import asyncio
+import logging
+
+import kubernetes.client
+from kubernetes.client.rest import ApiException
+
+import k8s_client
+
+logger = logging.getLogger("WatchCheckpoint")
+
+HTTP_NOT_FOUND = 404
+
+
+class ConfigMapCheckpoint:
+    """Key/value checkpoint saved in the ``data`` of one ConfigMap.
+
+    Args:
+        * name (String): The name of the ConfigMap
+        * namespace (String): The namespace of the ConfigMap
+        * interval (Float): Seconds between two saves of a changed checkpoint
+    """
+
+    def __init__(self, name, namespace, interval=60):
+        self.name = name
+        self.namespace = namespace
+        self.interval = interval
+        self.data = {}
+        self._saved = {}
+        self._exists = False
+        self.writes = 0
+
+    async def load(self):
+        """Reads the checkpoint.
+
+        Returns:
+            Dict: The saved keys and values, empty if there is no checkpoint yet.
+        """
+        core_api = k8s_client.api(kubernetes.client.CoreV1Api)
+        try:
+            configmap = await k8s_client.call(
+                core_api.read_namespaced_config_map, self.name, self.namespace
+            )
+            self._exists = True
+            self.data = dict(configmap.data or {})
+            self._saved = dict(self.data)
+        except ApiException as e:
+            if e.status != HTTP_NOT_FOUND:
+                raise
+        return dict(self.data)
+
+    def update(self, values):
+        """Updates keys of the checkpoint in memory, they are saved by ``save()``."""
+        for key, value in values.items():
+            if value is not None:
+                self.data[key] = value
+
+    async def save(self):
+        """Writes the checkpoint if it has changed since it was last saved or loaded."""
+        if self.data == self._saved:
+            return
+        core_api = k8s_client.api(kubernetes.client.CoreV1Api)
+        data = dict(self.data)
+        if self._exists:
+            await k8s_client.call(
+                core_api.patch_namespaced_config_map,
+                self.name,
+                self.namespace,
+                {"data": data},
+            )
+        else:
+            await k8s_client.call(
+                core_api.create_namespaced_config_map,
+                self.namespace,
+                {"metadata": {"name": self.name}, "data": data},
+            )
+            self._exists = True
+        self._saved = data
+        self.writes += 1
+
+    async def run(self, snapshot):
+        """Saves the checkpoint every ``interval`` seconds until cancelled.
+
+        Args:
+            * snapshot (Callable): Returns the current values to save
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.update(snapshot())
+                await self.save()
+            except ApiException as e:
+                logger.warning(f"Saving checkpoint %s failed: %s", self.name, e)
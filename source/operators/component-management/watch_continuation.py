@@ -0,0 +1,228 @@
+"""Watch continuation with bookmarks and a stall detector for the kopf watch-streams.
+
+The operators used to set ``settings.watching.server_timeout = 60`` to recover from watch-streams
+that hang without an error (https://github.com/nolar/kopf/issues/1036). kopf continues a watch from
+the last resourceVersion it has seen, but a resource without changes for a few minutes has an
+expired resourceVersion (410 Gone), so the quiet kinds (Secrets, ConfigMaps, Deployments, ...)
+were listed again every few minutes.
+
+``setup()`` replaces the watch-stream of kopf with one that:
+
+* requests bookmark events (``allowWatchBookmarks``), so the resourceVersion of a quiet resource
+  is kept current by the API server and a WATCH request that times out is continued from it
+  instead of listing all the objects again;
+* detects a stalled stream: if neither an event nor a bookmark arrives for ``WATCH_STALL_TIMEOUT``
+  seconds (the API server sends a bookmark about every minute), the stream is closed and the
+  objects are listed again. Only then is there a new LIST.
+
+Usage, in the ``configure`` startup handler::
+
+    @kopf.on.startup()
+    def configure(settings: kopf.OperatorSettings, **_):
+        watch_continuation.setup(settings)
+
+With ``WATCH_CONTINUATION=false`` the previous 60 seconds server timeout is kept.
+
+The module is shared by all ODA operators; keep the copies in the operator folders identical.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+
+import aiohttp
+import kopf
+
+logger = logging.getLogger("WatchContinuation")
+
+# use the bookmarks and the stall detector, false for the previous server timeout of 60 seconds
+WATCH_CONTINUATION = os.getenv("WATCH_CONTINUATION", "true").lower() == "true"
+# server side timeout of one WATCH request, the watch is then continued from the last resourceVersion
+WATCH_SERVER_TIMEOUT = int(os.getenv("WATCH_SERVER_TIMEOUT", str(10 * 60)))
+# seconds without events or bookmarks after which a watch-stream is stalled, 0 disables the detector
+WATCH_STALL_TIMEOUT = float(os.getenv("WATCH_STALL_TIMEOUT", str(5 * 60)))
+# server timeout without the continuation, see https://github.com/nolar/kopf/issues/1036
+LEGACY_SERVER_TIMEOUT = 1 * 60
+
+HTTP_GONE = 410
+
+# counters of the watch-streams of the operator, e.g. to compare the number of lists
+stats = {"lists": 0, "watches": 0, "bookmarks": 0, "expired": 0, "stalls": 0}
+
+try:
+    from kopf._cogs.clients import api, fetching, watching
+except ImportError:  # another version of kopf, keep its watch-stream
+    api = fetching = watching = None
+
+
+class WatchStalled(Exception):
+    """Raised when a watch-stream has received nothing for the stall timeout."""
+
+
+def setup(settings, enabled=WATCH_CONTINUATION):
+    """Configures the watch-streams of kopf.
+
+    Args:
+        * settings (kopf.OperatorSettings): The settings of the operator
+        * enabled (Boolean): Use the bookmarks and the stall detector
+
+    Returns:
+        Boolean: True if the kopf watch-stream is replaced, False if the legacy server timeout is used.
+    """
+    if not enabled or watching is None or not hasattr(watching, "continuous_watch"):
+        if enabled:
+            logger.warning(
+                "kopf %s has no known watch-stream, using a server timeout of %s seconds",
+                getattr(kopf, "__version__", ""),
+                LEGACY_SERVER_TIMEOUT,
+            )
+        settings.watching.server_timeout = LEGACY_SERVER_TIMEOUT
+        return False
+    settings.watching.server_timeout = WATCH_SERVER_TIMEOUT
+    if watching.continuous_watch is not continuous_watch:
+        watching.continuous_watch = continuous_watch
+        logger.info(
+            "Watching with bookmarks, server timeout %s seconds, stall timeout %s seconds",
+            WATCH_SERVER_TIMEOUT,
+            WATCH_STALL_TIMEOUT,
+        )
+    return True
+
+
+async def continuous_watch(*, settings, resource, namespace, operator_pause_waiter):
+    """Lists the objects, then watches them from the resourceVersion of the list.
+
+    Replaces ``kopf._cogs.clients.watching.continuous_watch``. The WATCH requests are continued from
+    the resourceVersion of the last event or bookmark. It returns (and kopf lists the objects again)
+    only when the resourceVersion has expired or the stream has stalled.
+    """
+    where = f"in {namespace!r}" if namespace is not None else "cluster-wide"
+    try:
+        objs, resource_version = await fetching.list_objs(
+            logger=watching.logger,
+            settings=settings,
+            resource=resource,
+            namespace=namespace,
+        )
+        stats["lists"] += 1
+        for obj in objs:
+            yield {"type": None, "object": obj}
+    except (
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        asyncio.TimeoutError,
+    ):
+        return
+
+    yield watching.Bookmark.LISTED
+
+    while not operator_pause_waiter.done():
+        stream = watch_objs(
+            settings=settings,
+            resource=resource,
+            namespace=namespace,
+            since=resource_version,
+            operator_pause_waiter=operator_pause_waiter,
+        )
+        try:
+            async for raw_input in stream:
+                raw_type = raw_input["type"]
+                raw_object = raw_input["object"]
+
+                # the resourceVersion is older than the ones kept by the API server, list again
+                if raw_type == "ERROR" and raw_object.get("code") == HTTP_GONE:
+                    stats["expired"] += 1
+                    logger.debug(
+                        "Restarting the watch-stream for %s %s", resource, where
+                    )
+                    return
+                if raw_type == "ERROR":
+                    raise watching.WatchingError(
+                        f"Error in the watch-stream: {raw_object}"
+                    )
+
+                # continue from the latest resourceVersion, of an event or a bookmark
+                resource_version = raw_object.get("metadata", {}).get(
+                    "resourceVersion", resource_version
+                )
+                if raw_type == "BOOKMARK":
+                    stats["bookmarks"] += 1
+                    continue
+                if raw_type not in ["ADDED", "MODIFIED", "DELETED"]:
+                    logger.warning("Ignoring an unsupported event type: %r", raw_input)
+                    continue
+                yield raw_input
+        except WatchStalled:
+            stats["stalls"] += 1
+            logger.warning(
+                "The watch-stream for %s %s received nothing for %s seconds, listing again",
+                resource,
+                where,
+                WATCH_STALL_TIMEOUT,
+            )
+            return
+        finally:
+            await stream.aclose()
+
+
+async def watch_objs(*, settings, resource, namespace, since, operator_pause_waiter):
+    """Streams the events of one WATCH request, with bookmarks.
+
+    Raises:
+        WatchStalled: Nothing (not even a bookmark) has been received for ``WATCH_STALL_TIMEOUT`` seconds.
+    """
+    params = {"watch": "true", "allowWatchBookmarks": "true"}
+    if since is not None:
+        params["resourceVersion"] = since
+    if settings.watching.server_timeout is not None:
+        params["timeoutSeconds"] = str(settings.watching.server_timeout)
+
+    connect_timeout = (
+        settings.watching.connect_timeout
+        if settings.watching.connect_timeout is not None
+        else (
+            settings.networking.connect_timeout
+            if settings.networking.connect_timeout is not None
+            else settings.networking.request_timeout
+        )
+    )
+
+    stats["watches"] += 1
+    events = api.stream(
+        url=resource.get_url(namespace=namespace, params=params),
+        logger=watching.logger,
+        settings=settings,
+        stopper=operator_pause_waiter,
+        timeout=aiohttp.ClientTimeout(
+            total=settings.watching.client_timeout,
+            sock_connect=connect_timeout,
+        ),
+    ).__aiter__()
+    next_event = None
+    try:
+        while True:
+            next_event = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait(
+                {next_event}, timeout=WATCH_STALL_TIMEOUT or None
+            )
+            if not done:
+                raise WatchStalled()
+            try:
+                raw_input = next_event.result()
+            except StopAsyncIteration:
+                return
+            yield raw_input
+    except (
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        asyncio.TimeoutError,
+    ):
+        pass
+    finally:
+        # the response is closed by cancelling the pending read of the stream
+        if next_event is not None and not next_event.done():
+            next_event.cancel()
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await next_event
+        await events.aclose()
@@ -7,8 +7,13 @@ from kubernetes.client.rest import ApiException
 
 from service_inventory_client import ServiceInventoryAPI
 
-from log_wrapper import LogWrapper, logwrapper
-
+from log_wrapper import LogWrapper, logwrapper, serve_recent_logs
+import k8s_client
+import status_writer
+import operator_metrics
+import operator_logging
+import watch_continuation
+import retry_policy
 
 DEPAPI_GROUP = "oda.tmforum.org"
 DEPAPI_VERSION = "v1"
@@ -32,6 +37,7 @@ root_logger = logging.getLogger()
 root_logger.setLevel(logging.INFO)
 logger = logging.getLogger("depapiop")
 logger.setLevel(int(logging_level))
+operator_logging.setup()
 logger.info("Logging set to %s", logging_level)
 logger.debug("debug logging is on")
 
@@ -60,7 +66,27 @@ INSTANCES = {}
 def configure(settings: kopf.OperatorSettings, **_):
     settings.peering.priority = 110
     settings.peering.name = "dependentapi"
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
+
+
+@kopf.on.startup()
+def startRetryPolicy(**_):
+    retry_policy.setup()
+
+
+@kopf.on.startup()
+def startMetrics(**_):
+    operator_metrics.setup()
+
+
+@kopf.on.startup()
+def startRecentLogs(**_):
+    serve_recent_logs()
+
+
+@kopf.on.cleanup()
+def cleanup(**_):
+    logger.info(f"Status writer statistics %s", status_writer.stats())
 
 
 def implementationReady(depapiBody):
@@ -69,7 +95,7 @@ def implementationReady(depapiBody):
 
 @logwrapper
 def get_depapi_spec(logw: LogWrapper, depapi_name, depapi_namespace):
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
         depapi = api_instance.get_namespaced_custom_object(
             DEPAPI_GROUP, DEPAPI_VERSION, depapi_namespace, DEPAPI_PLURAL, depapi_name
@@ -89,7 +115,7 @@ def get_depapi_spec(logw: LogWrapper, depapi_name, depapi_namespace):
 
 @logwrapper
 def get_expapi(logw: LogWrapper):
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
         exp_apis = api_instance.list_cluster_custom_object(
             DEPAPI_GROUP, DEPAPI_VERSION, API_PLURAL, pretty="true"
@@ -237,7 +263,7 @@ def setDependentAPIStatus(logw: LogWrapper, namespace, name, url):
     logw.info(
         f"setting implementation status to ready for dependent api {name}.{namespace}"
     )
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
         depapi = api_instance.get_namespaced_custom_object(
             DEPAPI_GROUP, DEPAPI_VERSION, namespace, DEPAPI_PLURAL, name
@@ -323,15 +349,20 @@ async def updateDepedentAPIReady(
             depapi_url = safe_get(None, status, "depapiStatus", "url")
             if "ownerReferences" in meta.keys():
                 parent_component_name = meta["ownerReferences"][0]["name"]
-                logw.info(f"reading component {parent_component_name}")
+                logw.info(
+                    f"patching coreDependentAPI in component {parent_component_name}"
+                )
                 try:
-                    api_instance = kubernetes.client.CustomObjectsApi()
-                    parent_component = api_instance.get_namespaced_custom_object(
-                        COMP_GROUP,
-                        COMP_VERSION,
+                    await status_writer.get_writer(
+                        COMP_GROUP, COMP_VERSION, COMP_PLURAL
+                    ).update(
                         namespace,
-                        COMP_PLURAL,
                         parent_component_name,
+                        status_writer.update_entries(
+                            ["coreDependentAPIs"],
+                            meta["uid"],
+                            {"ready": True, "url": depapi_url},
+                        ),
                     )
                 except ApiException as e:
                     # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
@@ -339,45 +370,6 @@ async def updateDepedentAPIReady(
                         raise kopf.TemporaryError(
                             "Cannot find parent component " + parent_component_name
                         )
-                    logw.exception(
-                        f"Exception when calling api_instance.get_namespaced_custom_object {parent_component_name}",
-                        e.body,
-                    )
                     raise kopf.TemporaryError(
-                        f"Exception when calling api_instance.get_namespaced_custom_object {parent_component_name}: {e.body}"
+                        f"updateDepedentAPIReady: Exception in patch_namespaced_custom_object: {e.body}"
                     )
-                # find the correct array entry to update either in coreDependentAPIs, managementAPIs or securityAPIs
-                for key in range(len(parent_component["status"]["coreDependentAPIs"])):
-                    if (
-                        parent_component["status"]["coreDependentAPIs"][key]["uid"]
-                        == meta["uid"]
-                    ):
-                        if (
-                            parent_component["status"]["coreDependentAPIs"][key][
-                                "ready"
-                            ]
-                            != True
-                        ):  # avoid recursion
-                            logw.info(
-                                f"patching coreDependentAPI {key} in component {parent_component_name}"
-                            )
-                            parent_component["status"]["coreDependentAPIs"][key][
-                                "ready"
-                            ] = True
-                            parent_component["status"]["coreDependentAPIs"][key][
-                                "url"
-                            ] = depapi_url
-                            try:
-                                _ = api_instance.patch_namespaced_custom_object(
-                                    COMP_GROUP,
-                                    COMP_VERSION,
-                                    namespace,
-                                    COMP_PLURAL,
-                                    parent_component_name,
-                                    parent_component,
-                                )
-                            except ApiException as e:
-                                raise kopf.TemporaryError(
-                                    f"updateDepedentAPIReady: Exception in patch_namespaced_custom_object: {e.body}"
-                                )
-                        return
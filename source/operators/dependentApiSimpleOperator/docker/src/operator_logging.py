@@ -0,0 +1,132 @@
+"""Non-blocking and structured logging for the ODA operators.
+
+Opt-in, configured with environment variables and applied by ``setup()`` to the handlers of the
+root logger (the ones ``kopf run`` sets up):
+
+* ``LOG_QUEUE=true``: the log records are put on a queue and written by a background thread, so
+  the formatting and the I/O of the log lines never run on the event loop of the operator.
+* ``LOG_FORMAT=json``: every log line is a JSON object. The component, resource, handler and
+  function of a ``LogWrapper`` are separate fields instead of the ``[c|r|h|f]`` text prefix, and
+  the Kubernetes object of the kopf handler logs is in ``object``.
+
+Usage, right after the loggers of the operator are configured::
+
+    operator_logging.setup()
+
+The module is shared by all ODA operators; keep the copies in the operator folders identical.
+"""
+
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_JSON = "json"
+
+# write the log lines from a background thread
+LOG_QUEUE = os.getenv("LOG_QUEUE", "false").lower() == "true"
+# text (the format set up by kopf) or json
+LOG_FORMAT = os.getenv("LOG_FORMAT", LOG_FORMAT_TEXT).lower()
+
+# attributes a LogWrapper adds to its records, as (record attribute, JSON field)
+LOGW_FIELDS = [
+    ("component", "component"),
+    ("resource", "resource"),
+    ("handler", "handler"),
+    ("function", "function"),
+]
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats log records as one JSON object per line.
+
+    The fields are ``time``, ``level``, ``logger`` and ``message``, the fields of a ``LogWrapper``
+    record (``component``, ``resource``, ``handler``, ``function``), the Kubernetes object of a
+    kopf record (``object``), any ``subject`` passed in ``extra`` and the ``exception``.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            # a LogWrapper record without the [c|r|h|f] prefix
+            "message": getattr(record, "logw_message", None) or record.getMessage(),
+        }
+        for attribute, field in LOGW_FIELDS:
+            value = getattr(record, attribute, None)
+            if value:
+                entry[field] = value
+        k8s_ref = getattr(record, "k8s_ref", None)
+        if k8s_ref:
+            entry["object"] = k8s_ref
+        subject = getattr(record, "subject", None)
+        if subject:
+            entry["subject"] = subject
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class PreparedQueueHandler(logging.handlers.QueueHandler):
+    """Puts the log records on a queue with only their message merged.
+
+    ``logging.handlers.QueueHandler`` formats the whole record before queueing it; this handler
+    leaves the formatting to the handlers of the ``QueueListener`` in the background thread. The
+    message is merged here, as the arguments may change after the call.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class QueueListener(logging.handlers.QueueListener):
+    """A QueueListener that can be stopped more than once, e.g. by the operator and at exit."""
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+def setup(log_queue=LOG_QUEUE, log_format=LOG_FORMAT, logger=None):
+    """Applies the log format and the queue to the handlers of a logger.
+
+    Args:
+        * log_queue (Boolean): Write the log lines from a background thread
+        * log_format (String): ``text`` to keep the formatters of the handlers, ``json`` for the JsonFormatter
+        * logger (logging.Logger): The logger, by default the root logger
+
+    Returns:
+        logging.handlers.QueueListener: The started listener writing the queued records, or None if the records
+        are not queued. It is stopped (and the queue flushed) at exit.
+    """
+    logger = logger or logging.getLogger()
+    handlers = list(logger.handlers)
+    if not handlers and (log_queue or log_format == LOG_FORMAT_JSON):
+        handlers = [logging.StreamHandler()]
+        logger.addHandler(handlers[0])
+    if log_format == LOG_FORMAT_JSON:
+        for handler in handlers:
+            handler.setFormatter(JsonFormatter())
+    if not log_queue:
+        return None
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(PreparedQueueHandler(records))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,251 @@
+"""Adaptive retry delays of the kopf handlers, with a retry budget.
+
+A handler that raises ``kopf.TemporaryError`` is retried by kopf after a fixed delay (60 seconds
+unless the error sets another one), so during a brownout of the API server or of a gateway all
+the failing handlers retry in lockstep, and each retry adds to the load. ``setup()`` wraps the
+kopf handlers so that a ``TemporaryError`` without an explicit delay is retried after an
+exponential delay with jitter, depending on the class of the error. To tell an explicit delay from
+the default, the default delay of ``TemporaryError`` is replaced by a ``DefaultDelay`` on import.
+
+* ``conflict`` (409): another writer changed the object, retry soon
+* ``not_found`` (404): e.g. the parent Component is not created yet
+* ``server`` (429, 5xx, connection errors): the API server or gateway is overloaded or down
+* ``other``: everything else
+
+The retries of all the handlers of the operator share a retry budget: within a sliding window
+the retries may be at most ``RETRY_BUDGET_RATIO`` of the handler invocations (and at least
+``RETRY_BUDGET_MIN``). Beyond the budget the retries are delayed by the maximum delay of their
+class, so a failing dependency slows the operator down instead of being retried ever faster.
+
+Usage::
+
+    @kopf.on.startup()
+    def startRetryPolicy(**_):
+        retry_policy.setup()
+
+The module is shared by all ODA operators; keep the copies in the operator folders identical.
+"""
+
+import asyncio
+import collections
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+
+import kopf
+
+logger = logging.getLogger("RetryPolicy")
+
+CONFLICT = "conflict"
+NOT_FOUND = "not_found"
+SERVER = "server"
+OTHER = "other"
+
+# (base delay, maximum delay) in seconds of the retries of each class of errors
+DELAYS = {
+    CONFLICT: (1, 30),
+    NOT_FOUND: (5, 120),
+    SERVER: (10, 600),
+    OTHER: (10, 300),
+}
+
+# maximum share of retries among the handler invocations in the window
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+# retries always allowed in the window, e.g. when the operator has just started
+RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "10"))
+# length in seconds of the sliding window of the budget
+RETRY_BUDGET_WINDOW = float(os.getenv("RETRY_BUDGET_WINDOW", "60"))
+
+
+class DefaultDelay(float):
+    """The delay of a ``kopf.TemporaryError`` raised without one, equal to the delay of kopf.
+
+    An explicit delay of the same value (e.g. ``delay=60``) is a plain float, so it is kept.
+    """
+
+    is_default_delay = True
+
+
+def mark_default_delay():
+    """Makes ``kopf.TemporaryError`` default to a ``DefaultDelay``, once for all the copies of the module."""
+    init = kopf.TemporaryError.__init__
+    delay = inspect.signature(init).parameters["delay"].default
+    if not getattr(delay, "is_default_delay", False):
+        # the delay is the last parameter with a default
+        init.__defaults__ = init.__defaults__[:-1] + (DefaultDelay(delay),)
+
+
+# the delay of a TemporaryError raised without one
+mark_default_delay()
+DEFAULT_DELAY = inspect.signature(kopf.TemporaryError).parameters["delay"].default
+
+# the kopf registries with handlers retried on a TemporaryError
+REGISTRIES = ["_changing", "_spawning"]
+
+
+def error_class(error):
+    """Returns the class of an error, from the HTTP status of the error or of the errors it wraps.
+
+    The operators raise ``kopf.TemporaryError(e)`` or a ``kopf.TemporaryError`` while handling an
+    ``ApiException``, so the wrapped exception (first argument) and the context are searched too.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status", None)
+        if isinstance(status, int):
+            if status == 409:
+                return CONFLICT
+            if status == 404:
+                return NOT_FOUND
+            if status == 429 or status >= 500:
+                return SERVER
+            return OTHER
+        if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+            return SERVER
+        if error.args and isinstance(error.args[0], BaseException):
+            error = error.args[0]
+        else:
+            error = error.__cause__ or error.__context__
+    return OTHER
+
+
+def backoff(error_cls, retry, exhausted=False):
+    """Returns the delay of a retry: exponential in the number of retries, with jitter.
+
+    Args:
+        * error_cls (String): The class of the error, see ``error_class``
+        * retry (Integer): The number of retries so far (the kopf ``retry`` argument)
+        * exhausted (Boolean): The retry budget is exhausted, use the maximum delay
+
+    Returns:
+        Float: The delay in seconds, between half of the exponential delay and the full delay.
+    """
+    base, maximum = DELAYS.get(error_cls, DELAYS[OTHER])
+    delay = maximum if exhausted else min(maximum, base * 2 ** min(retry, 30))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RetryBudget:
+    """Limits the retries to a share of the invocations within a sliding window.
+
+    Args:
+        * ratio (Float): Maximum share of retries among the invocations
+        * minimum (Integer): Retries always allowed in the window
+        * window (Float): Length of the window in seconds
+    """
+
+    def __init__(
+        self,
+        ratio=RETRY_BUDGET_RATIO,
+        minimum=RETRY_BUDGET_MIN,
+        window=RETRY_BUDGET_WINDOW,
+    ):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self._calls = collections.deque()
+        self._retries = collections.deque()
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "exhausted": 0}
+
+    def _expire(self, now):
+        for times in (self._calls, self._retries):
+            while times and times[0] <= now - self.window:
+                times.popleft()
+
+    def record_call(self):
+        """Records an invocation of a handler."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._calls.append(now)
+            self.stats["calls"] += 1
+
+    def try_retry(self):
+        """Records a retry. Returns False if the retries exceed the budget."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            allowed = len(self._retries) < max(
+                self.minimum, self.ratio * len(self._calls)
+            )
+            if allowed:
+                self._retries.append(now)
+                self.stats["retries"] += 1
+            else:
+                self.stats["exhausted"] += 1
+            return allowed
+
+
+# the retry budget shared by all the handlers of the operator
+budget = RetryBudget()
+
+
+def adapt_delay(error, retry):
+    """Sets the delay of a ``kopf.TemporaryError`` raised without an explicit delay."""
+    if not getattr(error.delay, "is_default_delay", False):
+        budget.try_retry()
+        return
+    error_cls = error_class(error)
+    exhausted = not budget.try_retry()
+    error.delay = backoff(error_cls, retry, exhausted)
+    logger.debug(
+        "Retry %s of a %s error in %.1f seconds%s",
+        retry + 1,
+        error_cls,
+        error.delay,
+        " (retry budget exhausted)" if exhausted else "",
+    )
+
+
+def adapt_handler(fn):
+    """Returns ``fn`` wrapped to set the delay of the TemporaryErrors it raises."""
+    if asyncio.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def adapted(*args, **kwargs):
+            budget.record_call()
+            try:
+                return await fn(*args, **kwargs)
+            except kopf.TemporaryError as e:
+                adapt_delay(e, kwargs.get("retry") or 0)
+                raise
+
+    else:
+
+        @functools.wraps(fn)
+        def adapted(*args, **kwargs):
+            budget.record_call()
+            try:
+                return fn(*args, **kwargs)
+            except kopf.TemporaryError as e:
+                adapt_delay(e, kwargs.get("retry") or 0)
+                raise
+
+    return adapted
+
+
+def setup(registry=None):
+    """Applies the retry policy to all the handlers of a kopf registry.
+
+    A function registered with several decorators (e.g. create, update and resume) is wrapped once.
+
+    Args:
+        * registry (kopf.OperatorRegistry): The registry, by default the kopf default registry
+    """
+    registry = registry or kopf.get_default_registry()
+    wrapped = {}
+    count = 0
+    for name in REGISTRIES:
+        for handler in getattr(registry, name).get_all_handlers():
+            if id(handler.fn) not in wrapped:
+                wrapped[id(handler.fn)] = adapt_handler(handler.fn)
+            # the kopf handlers are frozen dataclasses
+            object.__setattr__(handler, "fn", wrapped[id(handler.fn)])
+            count += 1
+    logger.info(f"Applied the retry policy to %s kopf handlers", count)
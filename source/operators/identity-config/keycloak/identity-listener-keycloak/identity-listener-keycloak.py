@@ -12,6 +12,7 @@ import uuid
 import datetime
 
 from keycloakUtils import Keycloak
+import operator_logging
 
 from cloudevents.http import CloudEvent, to_structured
 
@@ -40,6 +41,19 @@ def format_cloud_event(message: str, subject: str) -> str:
     return body
 
 
+def log_event(level, message: str, subject: str):
+    """
+    Logs a message as a CloudEvents compliant event, or with the subject as a field with LOG_FORMAT=json.
+    The event is only formatted if the level is enabled.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if operator_logging.LOG_FORMAT == operator_logging.LOG_FORMAT_JSON:
+        logger.log(level, message, extra={"subject": subject})
+    else:
+        logger.log(level, format_cloud_event(message, subject))
+
+
 # Initial setup ----------------------------------------------------------
 
 logging_level = os.environ.get("LOGGING", 10)
@@ -49,6 +63,7 @@ kcBaseURL = os.environ.get("KEYCLOAK_BASE")
 kcRealm = os.environ.get("KEYCLOAK_REALM")
 logger = logging.getLogger()
 logger.setLevel(int(logging_level))  # Logging level default = INFO
+operator_logging.setup()
 logger.info("Logging set to %s", logging_level)
 
 PARTY_ROLE_CREATION = "PartyRoleCreationNotification"
@@ -77,20 +92,20 @@ def party_role_listener():
         try:  # to authenticate and get a token
             token = kc.get_token(username, password)
         except RuntimeError as e:
-            logger.error(
-                format_cloud_event(
-                    str(e), "security-APIListener could not GET Keycloak token"
-                )
+            log_event(
+                logging.ERROR,
+                str(e),
+                "security-APIListener could not GET Keycloak token",
             )
             raise
 
         try:  # to get the list of existing clients
             client_list = kc.get_client_list(token, kcRealm)
         except RuntimeError as e:
-            logger.error(
-                format_cloud_event(
-                    str(e), f"security-APIListener could not GET clients for {kcRealm}"
-                )
+            log_event(
+                logging.ERROR,
+                str(e),
+                f"security-APIListener could not GET clients for {kcRealm}",
             )
         else:
             client = client_list[component]
@@ -100,59 +115,52 @@ def party_role_listener():
                 try:  # to add the role to the client in Keycloak
                     kc.add_role(party_role["name"], client, token, kcRealm)
                 except RuntimeError as e:
-                    logger.error(
-                        format_cloud_event(
-                            f'Keycloak role create failed for {party_role["name"]} in {component}',
-                            "security-APIListener event listener error",
-                        )
+                    log_event(
+                        logging.ERROR,
+                        f'Keycloak role create failed for {party_role["name"]} in {component}',
+                        "security-APIListener event listener error",
                     )
                 else:
-                    logger.info(
-                        format_cloud_event(
-                            f'Keycloak role {party_role["name"]} added to {component}',
-                            "security-APIListener event listener success",
-                        )
+                    log_event(
+                        logging.INFO,
+                        f'Keycloak role {party_role["name"]} added to {component}',
+                        "security-APIListener event listener success",
                     )
             elif event_type == PARTY_ROLE_DELETION:
                 try:  # to add the role to the client in Keycloak
                     kc.del_role(party_role["name"], client, token, kcRealm)
                 except RuntimeError:
-                    logger.error(
-                        format_cloud_event(
-                            f'Keycloak role delete failed for {party_role["name"]} in {component}',
-                            "security-APIListener event listener error",
-                        )
+                    log_event(
+                        logging.ERROR,
+                        f'Keycloak role delete failed for {party_role["name"]} in {component}',
+                        "security-APIListener event listener error",
                     )
                 else:
-                    logger.info(
-                        format_cloud_event(
-                            f'Keycloak role {party_role["name"]} removed from {component}',
-                            "security-APIListener event listener success",
-                        )
+                    log_event(
+                        logging.INFO,
+                        f'Keycloak role {party_role["name"]} removed from {component}',
+                        "security-APIListener event listener success",
                     )
             elif event_type == PARTY_ROLE_UPDATE:
                 pass  # because we do not need to do anything for updates
                 logger.debug("Update Keycloak for UPDATE")
             else:
-                logger.warning(
-                    format_cloud_event(
-                        f"eventType was {event_type} - not processed",
-                        "security-APIListener called with invalid eventType",
-                    )
+                log_event(
+                    logging.WARNING,
+                    f"eventType was {event_type} - not processed",
+                    "security-APIListener called with invalid eventType",
                 )
         else:
-            logger.error(
-                format_cloud_event(
-                    f'No client found in Keycloak for {party_role["name"]}',
-                    "security-APIListener called for non-existent client",
-                )
+            log_event(
+                logging.ERROR,
+                f'No client found in Keycloak for {party_role["name"]}',
+                "security-APIListener called for non-existent client",
             )
     else:
-        logger.warning(
-            format_cloud_event(
-                f'@baseType was {party_role["@baseType"]} - not processed',
-                "security-APIListener called with invalid @baseType",
-            )
+        log_event(
+            logging.WARNING,
+            f'@baseType was {party_role["@baseType"]} - not processed',
+            "security-APIListener called with invalid @baseType",
         )
 
     return ""
@@ -1,11 +1,16 @@
+import asyncio
 import kopf
 import logging
 import os
 import requests
 from keycloakUtils import Keycloak
-from log_wrapper import LogWrapper, logwrapper
+from log_wrapper import LogWrapper, logwrapper, serve_recent_logs
 from kubernetes.client.rest import ApiException
-import kubernetes.client
+import status_writer
+import operator_metrics
+import operator_logging
+import watch_continuation
+import retry_policy
 
 # Setup logging
 logging_level = os.environ.get("LOGGING", logging.INFO)
@@ -13,6 +18,7 @@ root_logger = logging.getLogger()
 root_logger.setLevel(logging.WARNING)
 logger = logging.getLogger("IdentityConfig")
 logger.setLevel(int(logging_level))
+operator_logging.setup()
 logger.info("Logging set to %s", logging_level)
 logger.debug("debug logging active")
 LogWrapper.set_defaultLogger(logger)
@@ -68,6 +74,7 @@ kc = Keycloak(kcBaseURL)
 GROUP = "oda.tmforum.org"
 VERSION = "v1"
 COMPONENTS_PLURAL = "components"
+HTTP_NOT_FOUND = 404
 
 IDENTITYCONFIG_GROUP = "oda.tmforum.org"
 IDENTITYCONFIG_VERSION = "v1"
@@ -77,10 +84,30 @@ IDENTITYCONFIG_KIND = "IdentityConfig"
 
 # Kopf handlers -------------
 
-# try to recover from broken watchers https://github.com/nolar/kopf/issues/1036
+# watch with bookmarks, recover from broken watchers https://github.com/nolar/kopf/issues/1036
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_):
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
+
+
+@kopf.on.startup()
+def startRetryPolicy(**_):
+    retry_policy.setup()
+
+
+@kopf.on.startup()
+def startMetrics(**_):
+    operator_metrics.setup()
+
+
+@kopf.on.startup()
+def startRecentLogs(**_):
+    serve_recent_logs()
+
+
+@kopf.on.cleanup()
+def cleanup(**_):
+    logger.info(f"Status writer statistics %s", status_writer.stats())
 
 
 # @kopf.on.update(
@@ -94,7 +121,7 @@ def configure(settings: kopf.OperatorSettings, **_):
 @kopf.on.resume(GROUP, IDENTITYCONFIG_VERSION, IDENTITYCONFIG_PLURAL, retries=5)
 @kopf.on.create(GROUP, IDENTITYCONFIG_VERSION, IDENTITYCONFIG_PLURAL, retries=5)
 @kopf.on.update(GROUP, IDENTITYCONFIG_VERSION, IDENTITYCONFIG_PLURAL, retries=5)
-def identityConfig(
+async def identityConfig(
     meta, spec, status, body, namespace, labels, name, old, new, **kwargs
 ):
     """
@@ -110,10 +137,57 @@ def identityConfig(
         component_name=quick_get_comp_name(body),
         resource_name=quick_get_comp_name(body),  # f"POD/{get_pod_name(body)}",
     )
-    rooturl = ""
 
     logw.debugInfo("security_client_add called", body)
 
+    # the Keycloak client is blocking, keep the event loop free for the status writer
+    status_value = await asyncio.to_thread(
+        configureKeycloakClient, logw, spec, namespace, name
+    )
+
+    # update the status value to the parent component object
+    if "ownerReferences" in meta.keys():
+        # str | the custom object's name
+        parent_component_name = meta["ownerReferences"][0]["name"]
+
+        try:
+            await status_writer.get_writer(GROUP, VERSION, COMPONENTS_PLURAL).update(
+                namespace,
+                parent_component_name,
+                status_writer.set_field("identityConfig", status_value),
+            )
+        except ApiException as e:
+            # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
+            if e.status == HTTP_NOT_FOUND:
+                raise kopf.TemporaryError(
+                    "Cannot find parent component " + parent_component_name
+                )
+            logw.warning(
+                f"Exception when calling api_instance.patch_namespaced_custom_object for component {name}"
+            )
+            raise kopf.TemporaryError(
+                "Exception when calling api_instance.patch_namespaced_custom_object for component "
+                + name
+            )
+
+    # the return value is added to the status field of the k8s object
+    # under securityRoles parameter (corresponds to function name)
+    return status_value
+
+
+def configureKeycloakClient(logw: LogWrapper, spec, namespace, name):
+    """Creates the Keycloak client and roles of a component and registers the partyRoleManagement listener.
+
+    Args:
+        * spec (Dict): The spec of the IdentityConfig resource
+        * namespace (String): The namespace of the IdentityConfig resource
+        * name (String): The name of the IdentityConfig resource
+
+    Returns:
+        Dict: The identityConfig status for the parent Component.
+    """
+    rooturl = ""
+
     try:  # to authenticate and get a token
         token = kc.get_token(username, password)
     except RuntimeError as e:
@@ -122,7 +196,7 @@ def identityConfig(
     try:  # to create the client in Keycloak
         logw.debugInfo(
             "Creating client in Keycloak",
-            f"name: {name}, rooturl: {rooturl}, token: {token}, kcRealm: {kcRealm}",
+            lambda: f"name: {name}, rooturl: {rooturl}, token: {token}, kcRealm: {kcRealm}",
         )
         kc.create_client(name, rooturl, token, kcRealm)
     except RuntimeError as e:
@@ -215,54 +289,6 @@ def identityConfig(
     else:
         status_value = {"identityProvider": "Keycloak", "listenerRegistered": False}
 
-    # update the status value to the parent component object
-    if "ownerReferences" in meta.keys():
-        # str | the custom object's name
-        parent_component_name = meta["ownerReferences"][0]["name"]
-
-        try:
-            custom_objects_api = kubernetes.client.CustomObjectsApi()
-            parent_component = custom_objects_api.get_namespaced_custom_object(
-                GROUP,
-                VERSION,
-                namespace,
-                COMPONENTS_PLURAL,
-                parent_component_name,
-            )
-        except ApiException as e:
-            # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
-            if e.status == HTTP_NOT_FOUND:
-                raise kopf.TemporaryError(
-                    "Cannot find parent component " + parent_component_name
-                )
-            else:
-                logw.error(
-                    f"Exception when calling custom_objects_api.get_namespaced_custom_object: {e}"
-                )
-
-        parent_component["status"]["identityConfig"] = status_value
-
-        try:
-            api_response = custom_objects_api.patch_namespaced_custom_object(
-                GROUP,
-                VERSION,
-                namespace,
-                COMPONENTS_PLURAL,
-                parent_component_name,
-                parent_component,
-            )
-            logw.debug(f"patchComponent: {api_response}")
-        except ApiException as e:
-            logw.warning(
-                f"Exception when calling api_instance.patch_namespaced_custom_object for component {name}"
-            )
-            raise kopf.TemporaryError(
-                "Exception when calling api_instance.patch_namespaced_custom_object for component "
-                + name
-            )
-
-    # the return value is added to the status field of the k8s object
-    # under securityRoles parameter (corresponds to function name)
     return status_value
 
 
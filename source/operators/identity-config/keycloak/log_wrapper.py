@@ -1,12 +1,102 @@
+import collections
+import datetime
+import functools
+import http.server
+import json
 import logging
+import os
+import threading
 import traceback
 import inspect
+import urllib.parse
+
+
+def level_of(name, default=logging.DEBUG):
+    """Returns the number of a log level name, or the default with a warning if the name is not a level.
+
+    Args:
+        * name (String): The name of the level, e.g. INFO
+        * default (Number): The level used for an unknown name
+    """
+    level = logging.getLevelName(name.upper())
+    if isinstance(level, int):
+        return level
+    logging.getLogger(__name__).warning(
+        "Unknown log level %s, using %s", name, logging.getLevelName(default)
+    )
+    return default
+
+
+# number of recent log entries kept per component, 0 disables the history
+RECENT_LOGS_SIZE = int(os.getenv("RECENT_LOGS_SIZE", "0"))
+# number of components with a history, the history of the least recently logged component is dropped
+RECENT_LOGS_COMPONENTS = int(os.getenv("RECENT_LOGS_COMPONENTS", "100"))
+# the lowest level kept in the history, independent of the level of the logger
+RECENT_LOGS_LEVEL = level_of(os.getenv("RECENT_LOGS_LEVEL", "DEBUG"))
+# serve the history on this port of RECENT_LOGS_HOST, 0 disables the endpoint
+RECENT_LOGS_PORT = int(os.getenv("RECENT_LOGS_PORT", "0"))
+RECENT_LOGS_HOST = os.getenv("RECENT_LOGS_HOST", "127.0.0.1")
 
 
 def tostr(value):
     return "" if value is None else str(value)
 
 
+def render(value):
+    """Returns the text of a subject or message, calling it first if it is deferred (a callable)."""
+    if callable(value):
+        value = value()
+    return tostr(value)
+
+
+class RecentLogs:
+    """Bounded in-memory history of the recent log entries of each component.
+
+    Args:
+        * size (Integer): The number of entries kept per component, 0 disables the history
+        * components (Integer): The number of components with a history
+        * level (Number): The lowest level kept e.g. logging.DEBUG
+    """
+
+    def __init__(
+        self,
+        size=RECENT_LOGS_SIZE,
+        components=RECENT_LOGS_COMPONENTS,
+        level=RECENT_LOGS_LEVEL,
+    ):
+        self.size = size
+        self.components = components
+        self.level = level
+        self._lock = threading.Lock()
+        self._logs = collections.OrderedDict()  # component name -> deque of entries
+
+    def isEnabledFor(self, logLevel, component_name):
+        return self.size > 0 and logLevel >= self.level and bool(component_name)
+
+    def append(self, component_name, entry):
+        with self._lock:
+            entries = self._logs.pop(component_name, None)
+            if entries is None:
+                entries = collections.deque(maxlen=self.size)
+            self._logs[component_name] = entries
+            entries.append(entry)
+            while len(self._logs) > self.components:
+                self._logs.popitem(last=False)
+
+    def component_names(self):
+        with self._lock:
+            return list(self._logs)
+
+    def entries(self, component_name):
+        """Returns the recent entries of a component, oldest first, or None if it has no history."""
+        with self._lock:
+            entries = self._logs.get(component_name)
+            return None if entries is None else list(entries)
+
+
+recent_logs = RecentLogs()
+
+
 class LogWrapper:
     """Helper class to standardize logging output.
 
@@ -19,8 +109,20 @@ class LogWrapper:
     * subject (String): The subject of the log message
     * message (String | Object): The message / object to be logged
                                  - can contain relevant data
+
+    The subject and the message are only converted to text if the level is enabled, so pass objects
+    (e.g. a Kubernetes resource) as the message instead of formatting them into an f-string. Either can
+    also be a callable (e.g. a lambda) that is only called if the level is enabled.
     """
 
+    __slots__ = (
+        "logger",
+        "function_name",
+        "handler_name",
+        "resource_name",
+        "component_name",
+    )
+
     _default_logger = None
 
     @classmethod
@@ -102,9 +204,16 @@ class LogWrapper:
             component_name if component_name is not None else self.component_name
         )
 
+    def isEnabledFor(self, logLevel):
+        return self.logger.isEnabledFor(logLevel)
+
     def debugInfo(self, info_message, debug_info):
-        self.info(info_message)
-        self.debug(info_message, debug_info)
+        """Logs the info_message with the debug_info at DEBUG level, or only the info_message at INFO level if DEBUG
+        is not enabled."""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.debug(info_message, debug_info)
+        else:
+            self.info(info_message)
 
     def debug(self, subject, message=None):
         self.log(logging.DEBUG, subject, message)
@@ -126,29 +235,97 @@ class LogWrapper:
 
         Args:
             * logLevel (Number): The level to log e.g. logging.INFO
-            * subject (String): The subject of the log message
-            * message (String | Object): The message / object to be logged - can contain relevant data
+            * subject (String | Callable): The subject of the log message
+            * message (String | Object | Callable): The message / object to be logged - can contain relevant data
 
         Returns:
             No return value.
         """
-        if self.logger.isEnabledFor(logLevel):
+        enabled = self.logger.isEnabledFor(logLevel)
+        recent = recent_logs.isEnabledFor(logLevel, self.component_name)
+        if enabled or recent:
             cn = tostr(self.component_name).replace("|", "/")
             rn = tostr(self.resource_name).replace("|", "/")
             hn = tostr(self.handler_name).replace("|", "/")
             fn = tostr(self.function_name).replace("]", ")")
-            sub = tostr(subject).replace(":", ";")
-            moo = tostr(message_or_object)
+            sub = render(subject).replace(":", ";")
+            moo = render(message_or_object)
+            text = f"{sub}: {moo}"
+            if recent:
+                recent_logs.append(
+                    self.component_name,
+                    {
+                        "time": datetime.datetime.now(
+                            datetime.timezone.utc
+                        ).isoformat(),
+                        "level": logging.getLevelName(logLevel),
+                        "resource": rn,
+                        "handler": hn,
+                        "function": fn,
+                        "message": text,
+                    },
+                )
+        if enabled:
+            # the fields are also passed separately for structured output (see operator_logging)
             self.logger.log(
                 logLevel,
-                f"[{cn}|{rn}|{hn}|{fn}] {sub}: {moo}",
+                f"[{cn}|{rn}|{hn}|{fn}] {text}",
+                extra={
+                    "component": cn,
+                    "resource": rn,
+                    "handler": hn,
+                    "function": fn,
+                    "logw_message": text,
+                },
             )
         return
 
 
-def create_child_log(logw: LogWrapper, func_name, lw_kwargs):
-    if "function_name" not in lw_kwargs:
-        lw_kwargs["function_name"] = func_name
+class RecentLogsHandler(http.server.BaseHTTPRequestHandler):
+    """Serves ``/logs`` (the components with a history) and ``/logs/<component name>`` (its recent entries) as
+    JSON."""
+
+    def do_GET(self):
+        path = urllib.parse.urlparse(self.path).path.rstrip("/")
+        if path == "/logs":
+            body = recent_logs.component_names()
+        elif path.startswith("/logs/"):
+            body = recent_logs.entries(urllib.parse.unquote(path[len("/logs/") :]))
+        else:
+            body = None
+        if body is None:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_recent_logs(port=RECENT_LOGS_PORT, host=RECENT_LOGS_HOST):
+    """Serves the recent log entries of the components from a background thread, if ``port`` is set.
+
+    The endpoint listens on localhost by default (use ``kubectl port-forward``), as the entries can contain
+    details of the resources.
+
+    Returns:
+        http.server.ThreadingHTTPServer: The server, or None if ``port`` is not set.
+    """
+    if not port:
+        return None
+    server = http.server.ThreadingHTTPServer((host, port), RecentLogsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="recent-logs", daemon=True
+    ).start()
+    return server
+
+
+def create_child_log(logw: LogWrapper, lw_kwargs):
     if logw is None:
         return LogWrapper(**lw_kwargs)
     if isinstance(logw, str):
@@ -156,44 +333,64 @@ def create_child_log(logw: LogWrapper, func_name, lw_kwargs):
     return logw.childLogger(**lw_kwargs)
 
 
-def inject_logw_args(func, args, kwargs, lw_kwargs):
-    func_name = func.__name__
+def logw_index(func):
+    """Returns the position of the ``logw`` argument of ``func``, or None if it has no ``logw`` argument."""
     arg_names = inspect.getfullargspec(func).args
     if "logw" in arg_names:
-        logw_idx = arg_names.index("logw")
-        if len(args) > logw_idx:
-            logw = args[logw_idx]
-            args2 = list(args)
-            args2[logw_idx] = create_child_log(logw, func_name, lw_kwargs)
-            args = tuple(args2)
-        else:
-            if "logw" in kwargs:
-                logw = kwargs["logw"]
-            else:
-                logw = None
-            kwargs["logw"] = create_child_log(logw, func_name, lw_kwargs)
+        return arg_names.index("logw")
+    return None
+
+
+def inject_logw_args(logw_idx, args, kwargs, lw_kwargs):
+    if len(args) > logw_idx:
+        args = (
+            *args[:logw_idx],
+            create_child_log(args[logw_idx], lw_kwargs),
+            *args[logw_idx + 1 :],
+        )
+    else:
+        kwargs["logw"] = create_child_log(kwargs.get("logw"), lw_kwargs)
     return (args, kwargs)
 
 
+def wrap_logw(func, lw_kwargs):
+    """Wraps ``func`` to pass a child LogWrapper with its function_name as its ``logw`` argument.
+
+    The position of the ``logw`` argument is looked up once when the function is decorated, not on every call. A
+    coroutine function is wrapped in a coroutine function, so ``inspect.iscoroutinefunction()`` still holds.
+
+    :meta private:
+    """
+    logw_idx = logw_index(func)
+    if logw_idx is None:
+        return func
+    lw_kwargs = {"function_name": func.__name__, **lw_kwargs}
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def inject_logw(*args, **kwargs):
+            args, kwargs = inject_logw_args(logw_idx, args, kwargs, lw_kwargs)
+            return await func(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(func)
+        def inject_logw(*args, **kwargs):
+            args, kwargs = inject_logw_args(logw_idx, args, kwargs, lw_kwargs)
+            return func(*args, **kwargs)
+
+    return inject_logw
+
+
 def logwrapper(*lw_args, **lw_kwargs):
     if len(lw_args) == 1 and len(lw_kwargs) == 0 and callable(lw_args[0]):
         # called as @decorator
-        def inject_logw(*args, **kwargs):
-            func = lw_args[0]
-            (args, kwargs) = inject_logw_args(func, args, kwargs, {})
-            result = func(*args, **kwargs)
-            return result
-
-        return inject_logw
+        return wrap_logw(lw_args[0], {})
 
     else:
         # called as @decorator(*args, **kwargs)
         def outer_inject_logw(func):
-            def inject_logw(*args, **kwargs):
-                (args, kwargs) = inject_logw_args(func, args, kwargs, lw_kwargs)
-                result = func(*args, **kwargs)
-                return result
-
-            return inject_logw
+            return wrap_logw(func, lw_kwargs)
 
         return outer_inject_logw
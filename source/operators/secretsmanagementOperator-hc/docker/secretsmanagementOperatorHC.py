@@ -11,9 +11,14 @@ from typing import AsyncIterator
 from kubernetes.client.models.v1_replica_set import V1ReplicaSet
 from kubernetes.client.models.v1_deployment import V1Deployment
 from hvac.exceptions import InvalidPath
-import asyncio
 
-from log_wrapper import LogWrapper, logwrapper
+from log_wrapper import LogWrapper, logwrapper, serve_recent_logs
+import k8s_client
+import status_writer
+import operator_metrics
+import operator_logging
+import watch_continuation
+import retry_policy
 
 SMAN_GROUP = "oda.tmforum.org"
 SMAN_VERSION = "v1"
@@ -34,6 +39,7 @@ root_logger = logging.getLogger()
 root_logger.setLevel(logging.WARNING)
 logger = logging.getLogger("SManOP")
 logger.setLevel(int(logging_level))
+operator_logging.setup()
 logger.info("Logging set to %s", logging_level)
 logger.debug("debug logging active")
 
@@ -125,7 +131,27 @@ def configure(settings: kopf.OperatorSettings, **_):
     settings.peering.name = "secretsmanagement"
     settings.admission.server = ServiceTunnel()
     settings.admission.managed = "sman.sidecar.kopf"
-    settings.watching.server_timeout = 1 * 60
+    watch_continuation.setup(settings)
+
+
+@kopf.on.startup()
+def startRetryPolicy(**_):
+    retry_policy.setup()
+
+
+@kopf.on.startup()
+def startMetrics(**_):
+    operator_metrics.setup()
+
+
+@kopf.on.startup()
+def startRecentLogs(**_):
+    serve_recent_logs()
+
+
+@kopf.on.cleanup()
+def cleanup(**_):
+    logger.info(f"Status writer statistics %s", status_writer.stats())
 
 
 def entryExists(dictionary, key, value):
@@ -146,7 +172,7 @@ def safe_get(default_value, dictionary, *paths):
 
 
 def get_sman_spec(sman_name, sman_namespace):
-    coa = kubernetes.client.CustomObjectsApi()
+    coa = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
         sman_cr = coa.get_namespaced_custom_object(
             SMAN_GROUP, SMAN_VERSION, sman_namespace, SMAN_PLURAL, sman_name
@@ -188,7 +214,7 @@ def get_comp_name(body):
         if kind and kind == "ReplicaSet":
             rs_name = safe_get(None, owner, "name")
             rs_uid = safe_get(None, owner, "uid")
-            aV1 = kubernetes.client.AppsV1Api()
+            aV1 = k8s_client.api(kubernetes.client.AppsV1Api)
             replica_set: V1ReplicaSet = aV1.read_namespaced_replica_set(
                 rs_name, namespace
             )
@@ -677,7 +703,7 @@ def restart_pods_with_missing_sidecar(
     logw.info(
         f"searching for PODs to restart in namespace {namespace} with label {label_selector}"
     )
-    v1 = kubernetes.client.CoreV1Api()
+    v1 = k8s_client.api(kubernetes.client.CoreV1Api)
     pod_list = v1.list_namespaced_pod(namespace, label_selector=label_selector)
     for pod in pod_list.items:
         pod_namespace = pod.metadata.namespace
@@ -781,7 +807,7 @@ def setSecretsManagementReady(logw: LogWrapper, namespace, name):
         "setting implementation status to ready for dependent api",
         f"{namespace}:{name}",
     )
-    api_instance = kubernetes.client.CustomObjectsApi()
+    api_instance = k8s_client.api(kubernetes.client.CustomObjectsApi)
     try:
         sman = api_instance.get_namespaced_custom_object(
             SMAN_GROUP, SMAN_VERSION, namespace, SMAN_PLURAL, name
@@ -848,70 +874,46 @@ async def updateSecretsManagementReady(
             if "ownerReferences" in meta.keys():
                 parent_component_name = meta["ownerReferences"][0]["name"]
                 await patch_securitySecretsManagement_ready(
-                    logw, namespace, parent_component_name, retry=5, delay=1
+                    logw, namespace, parent_component_name
                 )
 
 
 @logwrapper
 async def patch_securitySecretsManagement_ready(
-    logw: LogWrapper, namespace, parent_component_name, retry=5, delay=1
+    logw: LogWrapper, namespace, parent_component_name
 ):
-    try_cnt = 0
-    while True:
-        try_cnt = try_cnt + 1
-        if try_cnt > 1:
-            logw.info(f"retrying failed patch in {delay} seconds, try number", try_cnt)
-            await asyncio.sleep(delay)
-        logw.info("reading component", parent_component_name)
-        try:
-            api_instance = kubernetes.client.CustomObjectsApi()
-            parent_component = api_instance.get_namespaced_custom_object(
-                COMP_GROUP,
-                COMP_VERSION,
-                namespace,
-                COMP_PLURAL,
-                parent_component_name,
-            )
-        except ApiException as e:
-            # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
-            if e.status == HTTP_NOT_FOUND:
-                raise kopf.TemporaryError(
-                    "Cannot find parent component " + parent_component_name
-                )
-            logw.exception(
-                f"Exception when calling api_instance.get_namespaced_custom_object {parent_component_name}",
-                e,
-            )
-            raise kopf.TemporaryError(
-                f"Exception when calling api_instance.get_namespaced_custom_object {parent_component_name}: {e.body}"
-            )
-        # find the entry to update in securitySecretsManagement status
-        sman_status = parent_component["status"]["securitySecretsManagement"]
-        ready = sman_status["ready"]
-        if ready is True:  # avoid recursion
-            return
-        logw.info(
-            "patching securitySecretsManagement in component",
+    """Helper function to set the securitySecretsManagement ready in the status of the parent Component.
+
+    The update is coalesced with the other status updates of the Component by the status writer, which also retries
+    it when the Component was changed meanwhile.
+
+    Args:
+        * namespace (String): namespace of the Component
+        * parent_component_name (String): name of the Component
+
+    Returns:
+        No return value.
+    """
+    logw.info(
+        "patching securitySecretsManagement in component",
+        parent_component_name,
+    )
+    try:
+        await status_writer.get_writer(COMP_GROUP, COMP_VERSION, COMP_PLURAL).update(
+            namespace,
             parent_component_name,
+            status_writer.update_field("securitySecretsManagement", {"ready": True}),
         )
-        sman_status["ready"] = True
-        try:
-            _ = api_instance.patch_namespaced_custom_object(
-                COMP_GROUP,
-                COMP_VERSION,
-                namespace,
-                COMP_PLURAL,
-                parent_component_name,
-                parent_component,
-            )
-            return
-        except ApiException as e:
-            logw.error(
-                f"updateSecretsManagementReady: Exception in patch_namespaced_custom_object {parent_component_name}",
-                e.body,
+    except ApiException as e:
+        # Cant find parent component (if component in same chart as other kubernetes resources it may not be created yet)
+        if e.status == HTTP_NOT_FOUND:
+            raise kopf.TemporaryError(
+                "Cannot find parent component " + parent_component_name
             )
-            # TODO[FH] check for "the object has been modified"
-            if try_cnt >= retry:
-                raise kopf.TemporaryError(
-                    f"updateSecretsManagementReady: Exception in patch_namespaced_custom_object {parent_component_name}: {e.body}"
-                )
+        logw.error(
+            f"updateSecretsManagementReady: Exception in patch_namespaced_custom_object {parent_component_name}",
+            e.body,
+        )
+        raise kopf.TemporaryError(
+            f"updateSecretsManagementReady: Exception in patch_namespaced_custom_object {parent_component_name}: {e.body}"
+        )
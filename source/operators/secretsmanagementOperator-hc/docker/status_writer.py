@@ -0,0 +1,227 @@
+"""Coalesced writes of Component status fields for the ODA operators.
+
+Several operators update one nested field of the parent Component status when one of its children
+changes: the API operator sets the url and ready flag of an ExposedAPI entry, the secrets
+management operator the ready flag of the SecretsManagement, the identity config operator the
+identityConfig and the dependent API operator the DependentAPI entries. Reading the whole
+Component and patching it back for every change makes concurrent updates overwrite or conflict
+with each other, and a Component with many children is written once per child.
+
+A ``StatusWriter`` collects the targeted updates for each Component for a short debounce window,
+applies all of them to one fresh read of the Component and sends a single JSON merge patch with
+the changed status fields. The patch carries the resourceVersion of the read as a precondition,
+so a concurrent write makes it fail with a conflict and the updates are applied again to a new
+read instead of overwriting the other write. Nothing is written if the updates change nothing.
+
+Usage::
+
+    writer = status_writer.get_writer(GROUP, VERSION, COMPONENTS_PLURAL)
+    await writer.update(
+        namespace, component_name,
+        status_writer.update_entries(["coreAPIs"], uid, {"ready": True}),
+    )
+
+The module is shared by all ODA operators; keep the copies in the operator folders identical.
+"""
+
+import asyncio
+import copy
+import logging
+import os
+
+import kubernetes.client
+from kubernetes.client.rest import ApiException
+
+import k8s_client
+
+logger = logging.getLogger("StatusWriter")
+
+HTTP_CONFLICT = 409
+
+# seconds to wait for more updates of the same Component before writing
+STATUS_WRITE_DEBOUNCE = float(os.getenv("STATUS_WRITE_DEBOUNCE", "0.1"))
+# number of times the updates are applied again after a resourceVersion conflict
+STATUS_WRITE_RETRIES = int(os.getenv("STATUS_WRITE_RETRIES", "5"))
+
+
+def set_field(field, value):
+    """Returns an update that sets ``status[field]`` to ``value``."""
+
+    def update(status):
+        status[field] = copy.deepcopy(value)
+
+    return update
+
+
+def update_field(field, values):
+    """Returns an update that sets the keys of ``values`` in the dict ``status[field]``.
+
+    Nothing is changed if ``status[field]`` does not exist.
+    """
+
+    def update(status):
+        if isinstance(status.get(field), dict):
+            status[field].update(copy.deepcopy(values))
+
+    return update
+
+
+def update_entries(fields, uid, values):
+    """Returns an update that sets the keys of ``values`` in the entries with ``uid`` of the lists ``status[field]``.
+
+    Args:
+        * fields (List): The status lists to search, e.g. ``["coreAPIs", "managementAPIs"]``
+        * uid (String): The uid of the child the entry belongs to
+        * values (Dict): The keys and values to set in the entry
+    """
+
+    def update(status):
+        for field in fields:
+            for entry in status.get(field) or []:
+                if entry.get("uid") == uid:
+                    entry.update(copy.deepcopy(values))
+
+    return update
+
+
+def merge_patch(old, new):
+    """Returns the JSON merge patch of the top level keys that differ between ``old`` and ``new``."""
+    patch = {key: value for key, value in new.items() if old.get(key) != value}
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+class StatusWriter:
+    """Coalesces the status updates of the custom objects of one kind.
+
+    Args:
+        * group, version, plural (String): The kind of the custom objects, e.g. the Components
+        * debounce (Float): Seconds to collect updates of an object before writing them
+        * retries (Integer): Number of times the updates are applied again after a conflict
+    """
+
+    def __init__(
+        self,
+        group,
+        version,
+        plural,
+        debounce=STATUS_WRITE_DEBOUNCE,
+        retries=STATUS_WRITE_RETRIES,
+    ):
+        self.group = group
+        self.version = version
+        self.plural = plural
+        self.debounce = debounce
+        self.retries = retries
+        self._pending = {}  # (namespace, name) -> list of (update, future)
+        self._flushers = {}  # (namespace, name) -> task writing the pending updates
+        self.stats = {
+            "updates": 0,
+            "writes": 0,
+            "merged": 0,
+            "unchanged": 0,
+            "conflicts": 0,
+        }
+
+    async def update(self, namespace, name, update):
+        """Queues an update of the status of an object and waits until it is written.
+
+        Args:
+            * namespace (String): The namespace of the object
+            * name (String): The name of the object
+            * update (Callable): Changes the status dict in place, e.g. from ``update_entries()``. It can be applied
+              more than once (to a new read after a conflict), so it must only depend on its argument.
+
+        Returns:
+            No return value. The ``ApiException`` of a failed read or write is raised to every caller whose update
+            was part of it.
+        """
+        key = (namespace, name)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(key, []).append((update, future))
+        self.stats["updates"] += 1
+        if key not in self._flushers:
+            self._flushers[key] = asyncio.ensure_future(self._flush(key))
+        await future
+
+    async def _flush(self, key):
+        try:
+            while self._pending.get(key):
+                await asyncio.sleep(self.debounce)
+                batch = self._pending.pop(key)
+                try:
+                    await self._write(key, [update for update, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_result(None)
+        finally:
+            del self._flushers[key]
+
+    async def _write(self, key, updates):
+        namespace, name = key
+        custom_objects_api = k8s_client.api(kubernetes.client.CustomObjectsApi)
+        attempt = 0
+        while True:
+            obj = await k8s_client.call(
+                custom_objects_api.get_namespaced_custom_object,
+                self.group,
+                self.version,
+                namespace,
+                self.plural,
+                name,
+            )
+            status = obj.get("status") or {}
+            new_status = copy.deepcopy(status)
+            for update in updates:
+                update(new_status)
+            patch = merge_patch(status, new_status)
+            if not patch:
+                self.stats["unchanged"] += 1
+                return
+            body = {
+                "metadata": {"resourceVersion": obj["metadata"]["resourceVersion"]},
+                "status": patch,
+            }
+            try:
+                await k8s_client.call(
+                    custom_objects_api.patch_namespaced_custom_object,
+                    self.group,
+                    self.version,
+                    namespace,
+                    self.plural,
+                    name,
+                    body,
+                )
+            except ApiException as e:
+                if e.status != HTTP_CONFLICT or attempt >= self.retries:
+                    raise
+                attempt += 1
+                self.stats["conflicts"] += 1
+                logger.debug(f"Status of %s/%s changed meanwhile, retrying", *key)
+                continue
+            self.stats["writes"] += 1
+            self.stats["merged"] += len(updates) - 1
+            return
+
+
+_writers = {}
+
+
+def get_writer(group, version, plural):
+    """Returns the writer shared by all handlers of the operator for a kind of custom objects."""
+    key = (group, version, plural)
+    if key not in _writers:
+        _writers[key] = StatusWriter(group, version, plural)
+    return _writers[key]
+
+
+def stats():
+    """Returns the statistics of all the writers, e.g. to log them from a kopf cleanup handler."""
+    return {"/".join(key): writer.stats for key, writer in _writers.items()}
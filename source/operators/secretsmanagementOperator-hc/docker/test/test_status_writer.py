@@ -0,0 +1,137 @@
+import asyncio
+import copy
+import os
+import sys
+
+from kubernetes.client.rest import ApiException
+
+try:
+    import status_writer
+except ModuleNotFoundError:
+    # allow running tests locally without setting PYTHONPATH
+    sys.path.append(
+        os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    )
+    import status_writer
+
+
+class FakeCustomObjectsApi:
+    def __init__(self, status):
+        self.component = {"metadata": {"resourceVersion": "1"}, "status": status}
+        self.patches = []
+        # changes made by another process right before the next patch
+        self.concurrent_changes = []
+
+    def get_namespaced_custom_object(self, group, version, namespace, plural, name):
+        return copy.deepcopy(self.component)
+
+    def patch_namespaced_custom_object(
+        self, group, version, namespace, plural, name, body
+    ):
+        if self.concurrent_changes:
+            self.concurrent_changes.pop(0)(self.component["status"])
+            self.component["metadata"]["resourceVersion"] += "1"
+        if (
+            body["metadata"]["resourceVersion"]
+            != self.component["metadata"]["resourceVersion"]
+        ):
+            raise ApiException(status=409)
+        self.patches.append(body)
+        self.component["status"].update(body["status"])
+        self.component["metadata"]["resourceVersion"] += "1"
+
+
+def use_fake_api(monkeypatch, custom_objects_api):
+    monkeypatch.setattr(
+        status_writer.k8s_client, "api", lambda api_class: custom_objects_api
+    )
+
+    async def call(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(status_writer.k8s_client, "call", call)
+
+
+def component_status():
+    return {
+        "coreAPIs": [{"uid": "a", "ready": False}, {"uid": "b", "ready": False}],
+        "securitySecretsManagement": {"ready": False},
+    }
+
+
+def test_updates_are_merged_into_one_patch(monkeypatch):
+    custom_objects_api = FakeCustomObjectsApi(component_status())
+    use_fake_api(monkeypatch, custom_objects_api)
+    writer = status_writer.StatusWriter("oda.tmforum.org", "v1", "components", 0.01)
+
+    async def run():
+        await asyncio.gather(
+            writer.update(
+                "ns",
+                "c",
+                status_writer.update_entries(["coreAPIs"], "a", {"ready": True}),
+            ),
+            writer.update(
+                "ns", "c", status_writer.update_entries(["coreAPIs"], "b", {"url": "u"})
+            ),
+            writer.update(
+                "ns",
+                "c",
+                status_writer.update_field(
+                    "securitySecretsManagement", {"ready": True}
+                ),
+            ),
+        )
+
+    asyncio.run(run())
+    assert len(custom_objects_api.patches) == 1
+    patch = custom_objects_api.patches[0]
+    assert patch["metadata"] == {"resourceVersion": "1"}
+    assert patch["status"] == {
+        "coreAPIs": [
+            {"uid": "a", "ready": True},
+            {"uid": "b", "ready": False, "url": "u"},
+        ],
+        "securitySecretsManagement": {"ready": True},
+    }
+    assert writer.stats["updates"] == 3
+    assert writer.stats["writes"] == 1
+    assert writer.stats["merged"] == 2
+
+
+def test_conflict_is_retried_on_a_new_read(monkeypatch):
+    custom_objects_api = FakeCustomObjectsApi(component_status())
+    custom_objects_api.concurrent_changes.append(
+        lambda status: status.update(
+            {"identityConfig": {"identityProvider": "Keycloak"}}
+        )
+    )
+    use_fake_api(monkeypatch, custom_objects_api)
+    writer = status_writer.StatusWriter("oda.tmforum.org", "v1", "components", 0)
+
+    asyncio.run(
+        writer.update(
+            "ns", "c", status_writer.update_entries(["coreAPIs"], "a", {"ready": True})
+        )
+    )
+    assert writer.stats["conflicts"] == 1
+    assert writer.stats["writes"] == 1
+    status = custom_objects_api.component["status"]
+    assert status["identityConfig"] == {"identityProvider": "Keycloak"}
+    assert status["coreAPIs"][0]["ready"] is True
+
+
+def test_unchanged_status_is_not_written(monkeypatch):
+    custom_objects_api = FakeCustomObjectsApi(component_status())
+    use_fake_api(monkeypatch, custom_objects_api)
+    writer = status_writer.StatusWriter("oda.tmforum.org", "v1", "components", 0)
+
+    asyncio.run(
+        writer.update(
+            "ns",
+            "c",
+            status_writer.update_field("securitySecretsManagement", {"ready": False}),
+        )
+    )
+    assert custom_objects_api.patches == []
+    assert writer.stats["unchanged"] == 1